@@ -0,0 +1,51 @@
+import csv
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Error reported for a record the input ended in the middle of (a quoted field never closed)
+INCOMPLETE_RECORD = "unterminated quoted field at end of input"
+
+
+class _TrackedLines:
+    """Line iterator that remembers whether the reader asked past the last line."""
+
+    def __init__(self, lines: Iterable[str]):
+        self._lines = iter(lines)
+        self.exhausted = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        try:
+            return next(self._lines)
+        except StopIteration:
+            self.exhausted = True
+            raise
+
+
+def iter_csv_rows(lines: Iterable[str]) -> Iterator[Tuple[Optional[List[str]], Optional[str]]]:
+    """
+    Parse lines (line endings included) with one csv.reader, yielding
+    (values, None) per record or (None, error) for a record the reader
+    rejects; parsing carries on with the next record. Quoted fields may span
+    lines. The reader pulls exactly the lines of each record, so callers can
+    track how much input the records so far consumed. A record cut off by the
+    end of input comes last, as (None, INCOMPLETE_RECORD). Blank lines are
+    skipped.
+    """
+    tracked = _TrackedLines(lines)
+    reader = csv.reader(tracked)
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield None, str(e)
+            continue
+        if tracked.exhausted:
+            # The reader ran out of lines inside a quoted field and returned what it had
+            yield None, INCOMPLETE_RECORD
+            return
+        if values:
+            yield values, None
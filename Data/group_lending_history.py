@@ -1,4 +1,25 @@
-from typing import Dict, List
+import argparse
+import csv
+import hashlib
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from Data.csv_records import INCOMPLETE_RECORD, iter_csv_rows
+
+# Records parsed and written per columnar chunk
+CHUNK_ROWS = 250_000
+
+# Bytes of the source file hashed to detect that it was rewritten, not appended to
+HEAD_BYTES = 4096
+
+# 2: loan amounts stored as float64 (sums over millions of rows kept their cents)
+CACHE_FORMAT = 2
+
+# Values of the repaid column that count as a successful repayment
+REPAID_VALUES = {"yes", "y", "true", "1"}
 
 def summarize_group_history(group_data: List[Dict]) -> Dict:
     """Summarize repayment rates and risk signals from group lending data."""
@@ -11,3 +32,361 @@ def summarize_group_history(group_data: List[Dict]) -> Dict:
         "successful_repayments": successful_repayments,
         "default_rate": defaulted / total_loans if total_loans else 0
     }
+
+
+def parse_period(value: Optional[str]) -> int:
+    """Month index (year * 12 + month - 1) of a YYYY-MM[-DD] date, or -1 if unusable."""
+    try:
+        year, month = int(value[:4]), int(value[5:7])
+    except (TypeError, ValueError):
+        return -1
+    return year * 12 + month - 1 if 1 <= month <= 12 else -1
+
+
+def format_period(period: int) -> str:
+    return f"{period // 12:04d}-{period % 12 + 1:02d}"
+
+
+class GroupHistoryCache:
+    """
+    Columnar on-disk cache of group lending history records.
+
+    Each sync reads the source file from where the previous sync stopped,
+    encodes group and region names as integer codes and appends the parsed
+    records as a chunk of numpy arrays. Sources may be CSV (with a header) or
+    NDJSON with group_id, region, repaid, date and optional loan_amount fields.
+    A trailing line without a newline, or a CSV record whose quoted field
+    is still open, is left for the next sync, since it may still be being
+    written. If a source was truncated or rewritten the cache is rebuilt
+    from scratch.
+    """
+
+    def __init__(self, cache_dir: str, chunk_rows: int = CHUNK_ROWS):
+        self.cache_dir = cache_dir
+        self.chunk_rows = chunk_rows
+        os.makedirs(cache_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+        self._group_codes = {g: i for i, g in enumerate(self.manifest["groups"])}
+        self._region_codes = {r: i for i, r in enumerate(self.manifest["regions"])}
+
+    @property
+    def rows(self) -> int:
+        return sum(chunk["rows"] for chunk in self.manifest["chunks"])
+
+    def sync(self, path: str) -> int:
+        """Append the records added to path since the last sync; returns how many."""
+        key = os.path.abspath(path)
+        source = self.manifest["sources"].get(key)
+        size = os.path.getsize(path)
+        if source is not None and (size < source["offset"] or _head_digest(path, source["offset"]) != source["head"]):
+            print(f"⚠️ {path} was rewritten, rebuilding the history cache")
+            self.clear()
+            source = None
+        if source is None:
+            source = {"offset": 0, "head": "", "header": None}
+
+        added = 0
+        for records, offset, header in self._read_new_records(path, source):
+            if records:
+                self._write_chunk(records)
+                added += len(records)
+            source = {"offset": offset, "head": _head_digest(path, offset), "header": header}
+            self.manifest["sources"][key] = source
+            self._save_manifest()
+        return added
+
+    def clear(self) -> None:
+        for chunk in self.manifest["chunks"]:
+            try:
+                os.remove(os.path.join(self.cache_dir, chunk["file"]))
+            except OSError:
+                pass
+        self.manifest = _empty_manifest()
+        self._group_codes = {}
+        self._region_codes = {}
+        self._save_manifest()
+
+    def iter_chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield the cached records one chunk of column arrays at a time."""
+        for chunk in self.manifest["chunks"]:
+            with np.load(os.path.join(self.cache_dir, chunk["file"])) as data:
+                yield {name: data[name] for name in data.files}
+
+    def _read_new_records(self, path, source) -> Iterator[tuple]:
+        ndjson = path.lower().endswith((".ndjson", ".jsonl"))
+        header = source["header"]
+        with open(path, "rb") as f:
+            f.seek(source["offset"])
+            lines = _SourceLines(f, source["offset"])
+            # End of the last whole record read: where the next sync starts
+            offset = source["offset"]
+            records = []
+            skipped = 0
+            if ndjson:
+                rows = ((line, None) for line in lines)
+            else:
+                rows = iter_csv_rows(lines)
+            for row, error in rows:
+                if error == INCOMPLETE_RECORD:
+                    # Its closing quote may not have been written yet
+                    break
+                offset = lines.offset
+                if error:
+                    skipped += 1
+                    continue
+                if ndjson:
+                    if not row.strip():
+                        continue
+                    try:
+                        records.append(json.loads(row))
+                    except ValueError:
+                        skipped += 1
+                    continue
+                if header is None:
+                    header = [h.strip() for h in row]
+                    continue
+                records.append(dict(zip(header, row)))
+                if len(records) >= self.chunk_rows:
+                    yield records, offset, header
+                    records = []
+            if skipped:
+                print(f"⚠️ {path}: skipped {skipped} unreadable records")
+            yield records, offset, header
+
+    def _write_chunk(self, records: List[Dict]) -> None:
+        groups, regions, repaid, periods, amounts = [], [], [], [], []
+        # Dates and repaid flags repeat heavily, so parse each distinct value once
+        period_of, repaid_of = {}, {}
+        for r in records:
+            groups.append(_code(self._group_codes, self.manifest["groups"], str(r.get("group_id", "")).strip()))
+            regions.append(_code(self._region_codes, self.manifest["regions"], str(r.get("region", "")).strip()))
+            flag = r.get("repaid")
+            if flag not in repaid_of:
+                repaid_of[flag] = str(flag).strip().lower() in REPAID_VALUES
+            repaid.append(repaid_of[flag])
+            date = r.get("date")
+            if date not in period_of:
+                period_of[date] = parse_period(date)
+            periods.append(period_of[date])
+            try:
+                amounts.append(float(r.get("loan_amount")))
+            except (TypeError, ValueError):
+                amounts.append(np.nan)
+
+        period = np.array(periods, dtype=np.int32)
+        dated = period[period >= 0]
+        name = f"chunk_{len(self.manifest['chunks']):06d}.npz"
+        np.savez(
+            os.path.join(self.cache_dir, name),
+            group=np.array(groups, dtype=np.int32),
+            region=np.array(regions, dtype=np.int32),
+            repaid=np.array(repaid, dtype=np.bool_),
+            period=period,
+            loan_amount=np.array(amounts, dtype=np.float64),
+        )
+        self.manifest["chunks"].append({
+            "file": name,
+            "rows": len(records),
+            "min_period": int(dated.min()) if dated.size else None,
+            "max_period": int(dated.max()) if dated.size else None,
+        })
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(os.path.join(self.cache_dir, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("format") == CACHE_FORMAT:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return _empty_manifest()
+
+    def _save_manifest(self) -> None:
+        # Chunks are written before the manifest that references them, so a crash leaves the old state
+        path = os.path.join(self.cache_dir, "manifest.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(path + ".tmp", path)
+
+
+def _empty_manifest() -> Dict:
+    return {"format": CACHE_FORMAT, "sources": {}, "groups": [], "regions": [], "chunks": []}
+
+
+class _SourceLines:
+    """Decoded lines of a source read from its current position, up to the last complete line."""
+
+    def __init__(self, f, offset: int):
+        self._f = f
+        self.offset = offset
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self._f.readline()
+        if not line.endswith(b"\n"):
+            # End of file, or a line still being written
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode("utf-8")
+
+
+def _code(codes: Dict[str, int], names: List[str], name: str) -> int:
+    code = codes.get(name)
+    if code is None:
+        code = codes[name] = len(names)
+        names.append(name)
+    return code
+
+
+def _head_digest(path: str, offset: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(min(offset, HEAD_BYTES))).hexdigest()
+
+
+def _rate(defaults: np.ndarray, loans: np.ndarray) -> np.ndarray:
+    return np.divide(defaults, loans, out=np.zeros(len(loans)), where=loans > 0)
+
+
+def analyze_group_history(cache: GroupHistoryCache, window: int = 3, min_loans: int = 5,
+                          default_threshold: float = 0.3, trend_delta: float = 0.1) -> Dict:
+    """
+    Per-group and per-region repayment/default rates, monthly default rates
+    with a rolling window of `window` months, and group risk signals.
+
+    Runs one vectorized pass over the cached chunks; memory grows with the
+    number of groups and months, not records. A group is flagged
+    high_default_rate when it has at least min_loans loans and a default rate
+    of default_threshold or more, and worsening when its default rate over the
+    last `window` months exceeds its earlier rate by trend_delta or more.
+    """
+    manifest = cache.manifest
+    n_groups, n_regions = len(manifest["groups"]), len(manifest["regions"])
+    dated = [c for c in manifest["chunks"] if c["min_period"] is not None]
+    first = min((c["min_period"] for c in dated), default=0)
+    last = max((c["max_period"] for c in dated), default=-1)
+    n_periods = last - first + 1
+    recent_from = last - window + 1
+
+    group_loans = np.zeros(n_groups)
+    group_defaults = np.zeros(n_groups)
+    group_recent_loans = np.zeros(n_groups)
+    group_recent_defaults = np.zeros(n_groups)
+    group_region = np.zeros(n_groups, dtype=np.int32)
+    group_amount = np.zeros(n_groups)
+    region_loans = np.zeros(n_regions)
+    region_defaults = np.zeros(n_regions)
+    period_loans = np.zeros(n_periods)
+    period_defaults = np.zeros(n_periods)
+
+    for chunk in cache.iter_chunks():
+        group, region, period = chunk["group"], chunk["region"], chunk["period"]
+        defaulted = (~chunk["repaid"]).astype(np.float64)
+
+        group_loans += np.bincount(group, minlength=n_groups)
+        group_defaults += np.bincount(group, weights=defaulted, minlength=n_groups)
+        group_amount += np.bincount(group, weights=np.nan_to_num(chunk["loan_amount"]), minlength=n_groups)
+        region_loans += np.bincount(region, minlength=n_regions)
+        region_defaults += np.bincount(region, weights=defaulted, minlength=n_regions)
+        # A group's region is the one on its most recent record
+        group_region[group] = region
+
+        has_period = period >= 0
+        index = period[has_period] - first
+        period_loans += np.bincount(index, minlength=n_periods)
+        period_defaults += np.bincount(index, weights=defaulted[has_period], minlength=n_periods)
+
+        recent = has_period & (period >= recent_from)
+        group_recent_loans += np.bincount(group[recent], minlength=n_groups)
+        group_recent_defaults += np.bincount(group[recent], weights=defaulted[recent], minlength=n_groups)
+
+    group_rate = _rate(group_defaults, group_loans)
+    recent_rate = _rate(group_recent_defaults, group_recent_loans)
+    earlier_rate = _rate(group_defaults - group_recent_defaults, group_loans - group_recent_loans)
+
+    high_default = (group_loans >= min_loans) & (group_rate >= default_threshold)
+    worsening = (
+        (group_recent_loans > 0) & (group_loans - group_recent_loans > 0)
+        & (recent_rate - earlier_rate >= trend_delta)
+    )
+
+    # Trailing sums over the last `window` months
+    rolling_loans = np.cumsum(period_loans)
+    rolling_loans[window:] -= np.cumsum(period_loans)[:-window]
+    rolling_defaults = np.cumsum(period_defaults)
+    rolling_defaults[window:] -= np.cumsum(period_defaults)[:-window]
+    rolling_rate = _rate(rolling_defaults, rolling_loans)
+
+    groups, regions = manifest["groups"], manifest["regions"]
+    group_metrics = [
+        {
+            "group_id": groups[g],
+            "region": regions[group_region[g]],
+            "loans": int(group_loans[g]),
+            "defaults": int(group_defaults[g]),
+            "default_rate": float(group_rate[g]),
+            "recent_default_rate": float(recent_rate[g]) if group_recent_loans[g] else None,
+            "total_loan_amount": float(group_amount[g]),
+            "signals": [name for name, flagged in (("high_default_rate", high_default[g]),
+                                                    ("worsening", worsening[g])) if flagged],
+        }
+        for g in range(n_groups)
+    ]
+    total_loans = int(group_loans.sum())
+    total_defaults = int(group_defaults.sum())
+
+    return {
+        "total_loans": total_loans,
+        "successful_repayments": total_loans - total_defaults,
+        "default_rate": total_defaults / total_loans if total_loans else 0,
+        "regions": [
+            {
+                "region": regions[r],
+                "loans": int(region_loans[r]),
+                "defaults": int(region_defaults[r]),
+                "default_rate": float(_rate(region_defaults[r:r + 1], region_loans[r:r + 1])[0]),
+            }
+            for r in range(n_regions)
+        ],
+        "trend": [
+            {
+                "period": format_period(first + p),
+                "loans": int(period_loans[p]),
+                "defaults": int(period_defaults[p]),
+                "default_rate": float(_rate(period_defaults[p:p + 1], period_loans[p:p + 1])[0]),
+                "rolling_default_rate": float(rolling_rate[p]),
+            }
+            for p in range(n_periods)
+        ],
+        "groups": group_metrics,
+        "flagged_groups": [m for m in group_metrics if m["signals"]],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Group lending history analytics.")
+    parser.add_argument("paths", nargs="+", help="history files (.csv or .ndjson)")
+    parser.add_argument("--cache-dir", default="group_history_cache", help="columnar cache directory")
+    parser.add_argument("--window", type=int, default=3, help="rolling window in months")
+    parser.add_argument("--top", type=int, default=20, help="flagged groups to print")
+    args = parser.parse_args()
+
+    cache = GroupHistoryCache(args.cache_dir)
+    for path in args.paths:
+        added = cache.sync(path)
+        print(f"📥 {path}: {added} new records ({cache.rows} cached)")
+
+    result = analyze_group_history(cache, window=args.window)
+    flagged = sorted(result["flagged_groups"], key=lambda m: m["default_rate"], reverse=True)
+    print(json.dumps({
+        "total_loans": result["total_loans"],
+        "default_rate": result["default_rate"],
+        "regions": result["regions"],
+        "trend": result["trend"][-args.window * 4:],
+        "flagged_groups": flagged[:args.top],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,21 @@
+import hashlib
 import json
+import os
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from LLMs.scoring_engine import RegionTable, build_region_table
+
+# Stats used for regions that are missing from the regional data file
+DEFAULT_REGION_STATS = {"unemployment_rate": 0.15, "avg_income": 175}
+
+# Used when the regional data file cannot be read at startup
+FALLBACK_REGIONAL_DATA = {
+    "Montserrado": {"unemployment_rate": 0.12, "avg_income": 200},
+    "Bong": {"unemployment_rate": 0.18, "avg_income": 150},
+    "Nimba": {"unemployment_rate": 0.15, "avg_income": 180}
+}
 
 def load_regional_data(file_path: str) -> dict:
     """Load static regional economic data from a JSON file."""
@@ -8,3 +25,101 @@ def load_regional_data(file_path: str) -> dict:
 def get_region_stats(region: str, data: dict) -> dict:
     """Retrieve economic stats for a given region."""
     return data.get(region, {})
+
+
+class RegionalSnapshot(NamedTuple):
+    """One immutable load of the regional data file."""
+    version: int
+    digest: str
+    data: dict
+    table: RegionTable
+
+    def stats(self, region: str) -> dict:
+        """Stats for a region, or DEFAULT_REGION_STATS when it is unknown."""
+        return self.data.get(region) or DEFAULT_REGION_STATS
+
+
+class RegionalDataStore:
+    """
+    Shared, hot-reloaded view of the regional data file.
+
+    Readers get the current immutable snapshot without taking a lock. At most
+    once per check interval a reader also looks at the file's mtime; if it
+    changed, the file is reloaded and the snapshot reference swapped. version
+    increases on every reload; digest identifies the content itself, so it is
+    stable across restarts.
+    """
+
+    def __init__(self, path: str, check_interval_sec: float = 1.0):
+        self.path = path
+        self.check_interval_sec = check_interval_sec
+        self._reload_lock = threading.Lock()
+        self._mtime_ns = None
+        self._next_check = 0.0
+        self._snapshot = None
+        self.reload(force=True)
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def snapshot(self) -> RegionalSnapshot:
+        if time.monotonic() >= self._next_check:
+            self.reload()
+        return self._snapshot
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Reload the file if its mtime changed (or always with force). Returns
+        True when a new snapshot was installed. Concurrent callers never wait:
+        if a reload is already running they keep the current snapshot.
+        """
+        if not self._reload_lock.acquire(blocking=force):
+            return False
+        try:
+            self._next_check = time.monotonic() + self.check_interval_sec
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if not force and mtime_ns == self._mtime_ns:
+                return False
+
+            try:
+                with open(self.path, 'rb') as f:
+                    raw = f.read()
+                data = json.loads(raw)
+            except (OSError, ValueError) as e:
+                if self._snapshot is not None:
+                    print(f"⚠️ Keeping regional data version {self.version}, reload failed: {e}")
+                    self._mtime_ns = mtime_ns
+                    return False
+                print(f"⚠️ Could not load {self.path} ({e}), using fallback regional data")
+                data = FALLBACK_REGIONAL_DATA
+                raw = json.dumps(data, sort_keys=True).encode("utf-8")
+
+            version = self._snapshot.version + 1 if self._snapshot else 1
+            self._snapshot = RegionalSnapshot(
+                version=version,
+                digest=hashlib.sha1(raw).hexdigest(),
+                data=data,
+                table=build_region_table(data, DEFAULT_REGION_STATS),
+            )
+            self._mtime_ns = mtime_ns
+            return True
+        finally:
+            self._reload_lock.release()
+
+
+_store: Optional[RegionalDataStore] = None
+_store_lock = threading.Lock()
+
+def get_regional_store() -> RegionalDataStore:
+    """Process-wide store for REGIONAL_DATA_PATH (default Data/regional_data.json)."""
+    global _store
+    if _store is not None:
+        return _store
+    with _store_lock:
+        if _store is None:
+            _store = RegionalDataStore(os.getenv("REGIONAL_DATA_PATH", "Data/regional_data.json"))
+        return _store
@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Optional
+
+# In-memory tier size (entries)
+MEMORY_ENTRIES = 1024
+
+# On-disk tier size (entries) and entry lifetime
+DISK_ENTRIES = 100_000
+TTL_SEC = 7 * 24 * 3600
+
+# Disk eviction runs once every this many writes
+EVICT_EVERY = 100
+
+
+def make_cache_key(inputs: dict, model: str) -> str:
+    """Hash the normalized explanation inputs together with the model name."""
+    normalized = {
+        k: (round(v, 6) if isinstance(v, float) else v.strip() if isinstance(v, str) else v)
+        for k, v in inputs.items()
+    }
+    payload = json.dumps({"model": model, "inputs": normalized}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExplanationCache:
+    """
+    Two-tier cache for LLM explanations: an LRU dict in front of a SQLite file.
+
+    Concurrent get_or_compute calls for the same key share one upstream call.
+    Entries belong to a generation (scoring formula + regional data version);
+    switching generations drops every entry.
+    """
+
+    def __init__(self, path: str, memory_entries: int = MEMORY_ENTRIES,
+                 disk_entries: int = DISK_ENTRIES, ttl_sec: float = TTL_SEC):
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl_sec = ttl_sec
+        self._memory = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._async_inflight: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self._generation = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS explanations (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_explanations_last_used ON explanations (last_used_at)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+
+    def set_generation(self, generation: str) -> None:
+        """Drop all entries if they were produced under a different generation."""
+        if generation == self._generation:
+            return
+        with self._db_lock:
+            row = self._conn.execute("SELECT value FROM cache_meta WHERE key='generation'").fetchone()
+            if row is None or row[0] != generation:
+                self._conn.execute("DELETE FROM explanations")
+                self._conn.execute("INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('generation', ?)", (generation,))
+                self._conn.commit()
+        with self._lock:
+            self._memory.clear()
+            self._generation = generation
+
+    def invalidate(self) -> None:
+        """Drop every cached explanation."""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            self._conn.execute("DELETE FROM explanations")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at < self.ttl_sec:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+        with self._db_lock:
+            row = self._conn.execute("SELECT value, created_at FROM explanations WHERE key=?", (key,)).fetchone()
+            if row is not None and now - row[1] >= self.ttl_sec:
+                self._conn.execute("DELETE FROM explanations WHERE key=?", (key,))
+                self._conn.commit()
+                row = None
+            elif row is not None:
+                self._conn.execute("UPDATE explanations SET last_used_at=? WHERE key=?", (now, key))
+                self._conn.commit()
+
+        with self._lock:
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(key, row[0], row[1])
+        return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO explanations (key, value, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self._evict(now)
+            self._conn.commit()
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        """
+        Return the cached value or compute it once. Callers arriving while the
+        value is being computed wait for that result instead of recomputing.
+        Failures are not cached and are raised to every waiting caller.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """
+        Async get_or_compute for use on the event loop. Disk access runs in a
+        worker thread; concurrent awaiters of the same key share one compute.
+        The compute runs in its own task, so a caller being cancelled (e.g. a
+        client disconnecting) neither cancels it nor fails the other awaiters.
+        """
+        value = await asyncio.to_thread(self.get, key)
+        if value is not None:
+            return value
+
+        task = self._async_inflight.get(key)
+        if task is not None:
+            with self._lock:
+                self._stats["coalesced"] += 1
+        else:
+            async def run() -> str:
+                value = await compute()
+                await asyncio.to_thread(self.put, key, value)
+                return value
+
+            def finished(done: asyncio.Task) -> None:
+                if self._async_inflight.get(key) is done:
+                    del self._async_inflight[key]
+                # Retrieve the exception so one nobody awaited any more is not logged
+                if not done.cancelled():
+                    done.exception()
+
+            task = asyncio.ensure_future(run())
+            self._async_inflight[key] = task
+            task.add_done_callback(finished)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats, memory_entries=len(self._memory))
+        with self._db_lock:
+            stats["disk_entries"] = self._conn.execute("SELECT COUNT(*) FROM explanations").fetchone()[0]
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        # Caller holds self._lock
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float) -> None:
+        # Caller holds self._db_lock: drop expired rows, then the least recently used overflow
+        c = self._conn.cursor()
+        c.execute("DELETE FROM explanations WHERE created_at <= ?", (now - self.ttl_sec,))
+        evicted = c.rowcount
+        c.execute("""
+            DELETE FROM explanations WHERE key IN (
+                SELECT key FROM explanations ORDER BY last_used_at
+                LIMIT MAX((SELECT COUNT(*) FROM explanations) - ?, 0)
+            )
+        """, (self.disk_entries,))
+        evicted += c.rowcount
+        with self._lock:
+            self._stats["evictions"] += evicted
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_explanation_cache() -> ExplanationCache:
+    """Process-wide explanation cache, stored at LLM_CACHE_PATH."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExplanationCache(os.getenv("LLM_CACHE_PATH", "explanation_cache.db"))
+        return _cache
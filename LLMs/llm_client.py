@@ -0,0 +1,124 @@
+import asyncio
+import os
+import random
+from typing import Optional
+
+import httpx
+
+from LLMs.llm_inferace import LLM_API_URL, LLM_MODEL, LLM_TIMEOUT_SEC
+
+# Upstream statuses worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """The LLM endpoint failed or returned an unusable response."""
+
+
+class LLMClient:
+    """
+    Async chat-completions client with a pooled connection, per-call timeouts,
+    a concurrency cap and jittered exponential backoff on 429/5xx.
+    """
+
+    def __init__(self, url: str, model: str, timeout_sec: float = 20.0, max_concurrency: int = 8,
+                 max_retries: int = 3, backoff_base_sec: float = 0.5, backoff_max_sec: float = 8.0):
+        self.url = url
+        self.model = model
+        self.timeout_sec = timeout_sec
+        self.max_retries = max_retries
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout_sec),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+
+    async def complete(self, prompt: str, api_key: str, timeout_sec: Optional[float] = None) -> str:
+        """Send one prompt and return the assistant's reply."""
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "You are a helpful assistant that assesses loan risks."},
+                {"role": "user", "content": prompt}
+            ]
+        }
+        timeout = httpx.Timeout(timeout_sec or self.timeout_sec)
+
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    response = await self._client.post(self.url, headers=headers, json=payload, timeout=timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json()["choices"][0]["message"]["content"]
+                error = LLMError(f"LLM endpoint returned {response.status_code}")
+                retry_after = response.headers.get("retry-after")
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                error = LLMError(f"LLM request failed: {e!r}")
+            except (httpx.HTTPStatusError, KeyError, IndexError, ValueError) as e:
+                raise LLMError(f"Unusable LLM response: {e!r}") from e
+
+            if attempt >= self.max_retries:
+                raise error
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+            attempt += 1
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max_sec)
+            except ValueError:
+                pass
+        # Full jitter keeps retrying callers from hitting the endpoint in lockstep
+        return random.uniform(0, min(self.backoff_max_sec, self.backoff_base_sec * 2 ** attempt))
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_clients = {}
+
+
+def get_llm_client() -> LLMClient:
+    """
+    Shared client for the running event loop. Uses the same endpoint, model
+    and timeout settings as llm_inferace, plus LLM_MAX_CONCURRENCY and
+    LLM_MAX_RETRIES.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = LLMClient(
+            url=LLM_API_URL,
+            model=LLM_MODEL,
+            timeout_sec=LLM_TIMEOUT_SEC,
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+        )
+        # Clients belong to the loop that created them; forget closed loops
+        for stale in [l for l in _clients if l.is_closed()]:
+            del _clients[stale]
+        _clients[loop] = client
+    return client
+
+
+async def get_llm_response(prompt: str, api_key: str) -> str:
+    """
+    Async counterpart of LLMs.llm_inferace.get_llm_response.
+    """
+    return await get_llm_client().complete(prompt, api_key)
+
+
+async def close_llm_clients() -> None:
+    """Close the client owned by the running loop (call on shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -6,24 +6,29 @@ load_dotenv()
 
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+LLM_MODEL = os.getenv("LLM_MODEL", "llama3-8b-8192")
+LLM_API_URL = os.getenv("LLM_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+LLM_TIMEOUT_SEC = float(os.getenv("LLM_TIMEOUT_SEC", "20"))
+
+# Reuses connections across calls
+_session = requests.Session()
 
 
 def get_llm_response(prompt: str, api_key: str) -> str:
     """
     Send a prompt to the LLM (e.g., Groq's LLaMA) and return the response.
     """
-    url = "https://api.groq.com/openai/v1/chat/completions"
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json"
     }
     payload = {
-        "model": "llama3-8b-8192",
+        "model": LLM_MODEL,
         "messages": [
             {"role": "system", "content": "You are a helpful assistant that assesses loan risks."},
             {"role": "user", "content": prompt}
         ]
     }
 
-    response = requests.post(url, headers=headers, json=payload)
+    response = _session.post(LLM_API_URL, headers=headers, json=payload, timeout=LLM_TIMEOUT_SEC)
     return response.json()["choices"][0]["message"]["content"]
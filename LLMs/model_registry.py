@@ -0,0 +1,332 @@
+import abc
+import argparse
+import csv
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from Data.group_lending_history import REPAID_VALUES
+from LLMs.scoring_engine import SCORING_VERSION, RegionTable, calculate_risk_scores, encode_regions
+
+# Directory scanned at startup for fitted model artifacts (*.json)
+DEFAULT_MODEL_DIR = "models"
+
+# Features fitted models may use, gathered per borrower from the base score and region
+FEATURES = ("base_score", "unemployment_rate", "avg_income")
+
+
+class FeatureBatch:
+    """
+    Model inputs for a batch of borrowers: base scores and each borrower's
+    slot in a region table. Feature columns are gathered on first use and
+    kept, so a shadow model scoring the same batch reuses them.
+    """
+
+    def __init__(self, base_scores, region_index, table: RegionTable):
+        self.base_scores = np.asarray(base_scores, dtype=np.float64)
+        self.region_index = np.asarray(region_index, dtype=np.intp)
+        self.table = table
+        self._columns = {"base_score": self.base_scores}
+
+    @classmethod
+    def from_rows(cls, base_scores, regions: Sequence[str], table: RegionTable) -> "FeatureBatch":
+        return cls(base_scores, encode_regions(regions, table), table)
+
+    def __len__(self) -> int:
+        return len(self.base_scores)
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            if name == "unemployment_rate":
+                self._columns[name] = self.table.unemployment_rates[self.region_index]
+            elif name == "avg_income":
+                self._columns[name] = self.table.avg_incomes[self.region_index]
+            else:
+                raise KeyError(f"Unknown feature: {name}")
+        return self._columns[name]
+
+
+class ScoringModel(abc.ABC):
+    """A versioned risk model: predict maps a FeatureBatch to risk scores in [0, 1]."""
+
+    kind = "base"
+
+    def __init__(self, version: str):
+        self.version = version
+
+    @abc.abstractmethod
+    def predict(self, features: FeatureBatch) -> np.ndarray:
+        """Risk scores for every borrower in the batch."""
+
+    def score(self, base_score: float, region: str, table: RegionTable) -> float:
+        """Score a single borrower."""
+        return float(self.predict(FeatureBatch.from_rows([base_score], [region], table))[0])
+
+    def describe(self) -> Dict:
+        return {"version": self.version, "kind": self.kind}
+
+
+class LinearRiskModel(ScoringModel):
+    """The built-in formula of LLMs.scoring_engine.calculate_risk_score."""
+
+    kind = "linear"
+
+    def __init__(self):
+        super().__init__(f"linear-{SCORING_VERSION}")
+
+    def predict(self, features: FeatureBatch) -> np.ndarray:
+        return calculate_risk_scores(features.base_scores, features.region_index, features.table)
+
+
+class LogisticRiskModel(ScoringModel):
+    """
+    Logistic model of the probability of default, fitted on repayment
+    history. Features are standardized with the means and scales found
+    when fitting.
+    """
+
+    kind = "logistic"
+
+    def __init__(self, version: str, intercept: float, coefficients: Dict[str, float],
+                 means: Optional[Dict[str, float]] = None, scales: Optional[Dict[str, float]] = None):
+        super().__init__(version)
+        unknown = set(coefficients) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown features in model {version}: {', '.join(sorted(unknown))}")
+        self.intercept = float(intercept)
+        self.coefficients = {name: float(value) for name, value in coefficients.items()}
+        self.means = {name: float((means or {}).get(name, 0.0)) for name in self.coefficients}
+        self.scales = {name: float((scales or {}).get(name, 1.0)) or 1.0 for name in self.coefficients}
+
+    def predict(self, features: FeatureBatch) -> np.ndarray:
+        z = np.full(len(features), self.intercept)
+        for name, weight in self.coefficients.items():
+            z += weight * (features.column(name) - self.means[name]) / self.scales[name]
+        return 1.0 / (1.0 + np.exp(-np.clip(z, -500.0, 500.0)))
+
+    def describe(self) -> Dict:
+        return {**super().describe(), "features": list(self.coefficients)}
+
+    def to_artifact(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "version": self.version,
+            "intercept": self.intercept,
+            "coefficients": self.coefficients,
+            "means": self.means,
+            "scales": self.scales,
+        }
+
+    @classmethod
+    def from_artifact(cls, artifact: Dict) -> "LogisticRiskModel":
+        return cls(artifact["version"], artifact["intercept"], artifact["coefficients"],
+                   artifact.get("means"), artifact.get("scales"))
+
+    @classmethod
+    def fit(cls, version: str, features: FeatureBatch, defaulted, names: Sequence[str] = FEATURES,
+            l2: float = 1e-3, iterations: int = 50) -> "LogisticRiskModel":
+        """Fit by Newton's method on standardized features with a small L2 penalty."""
+        y = np.asarray(defaulted, dtype=np.float64)
+        columns = [features.column(name) for name in names]
+        means = [float(col.mean()) for col in columns]
+        scales = [float(col.std()) or 1.0 for col in columns]
+        x = np.column_stack([np.ones(len(y))] + [(col - m) / s for col, m, s in zip(columns, means, scales)])
+
+        weights = np.zeros(x.shape[1])
+        penalty = np.full(x.shape[1], l2)
+        penalty[0] = 0.0
+        for _ in range(iterations):
+            p = 1.0 / (1.0 + np.exp(-np.clip(x @ weights, -500.0, 500.0)))
+            gradient = x.T @ (p - y) + penalty * weights
+            hessian = (x * (p * (1.0 - p))[:, None]).T @ x + np.diag(penalty)
+            step = np.linalg.solve(hessian, gradient)
+            weights -= step
+            if np.max(np.abs(step)) < 1e-8:
+                break
+        return cls(version, weights[0], dict(zip(names, weights[1:])), dict(zip(names, means)), dict(zip(names, scales)))
+
+
+# Fitted model kinds that can be loaded from an artifact file
+MODEL_KINDS = {"logistic": LogisticRiskModel}
+
+
+def load_model_artifact(path: str) -> ScoringModel:
+    """Load a fitted model from a JSON artifact written by save_model_artifact."""
+    with open(path, "r", encoding="utf-8") as f:
+        artifact = json.load(f)
+    kind = artifact.get("kind")
+    if kind not in MODEL_KINDS:
+        raise ValueError(f"Unsupported model kind: {kind}")
+    return MODEL_KINDS[kind].from_artifact(artifact)
+
+
+def save_model_artifact(model: ScoringModel, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(model.to_artifact(), f, indent=2, sort_keys=True)
+
+
+class ShadowStats:
+    """
+    How far a shadow model's scores are from the live model's over the
+    borrowers of a pass. Plain sums, so shard results can be combined.
+    """
+
+    def __init__(self, rows: int = 0, delta_sum: float = 0.0, abs_delta_sum: float = 0.0,
+                 max_abs_delta: float = 0.0, risk_changes: int = 0):
+        self.rows = rows
+        self.delta_sum = delta_sum
+        self.abs_delta_sum = abs_delta_sum
+        self.max_abs_delta = max_abs_delta
+        self.risk_changes = risk_changes
+
+    def add(self, live_scores: np.ndarray, shadow_scores: np.ndarray, live_risks: np.ndarray,
+            shadow_risks: np.ndarray) -> None:
+        if not len(live_scores):
+            return
+        delta = shadow_scores - live_scores
+        abs_delta = np.abs(delta)
+        self.rows += len(delta)
+        self.delta_sum += float(delta.sum())
+        self.abs_delta_sum += float(abs_delta.sum())
+        self.max_abs_delta = max(self.max_abs_delta, float(abs_delta.max()))
+        self.risk_changes += int(np.count_nonzero(live_risks != shadow_risks))
+
+    def as_dict(self) -> Dict:
+        return {
+            "rows": self.rows,
+            "delta_sum": self.delta_sum,
+            "abs_delta_sum": self.abs_delta_sum,
+            "max_abs_delta": self.max_abs_delta,
+            "risk_changes": self.risk_changes,
+        }
+
+    @classmethod
+    def combine(cls, parts: Iterable[Dict]) -> "ShadowStats":
+        total = cls()
+        for part in parts:
+            total.rows += part["rows"]
+            total.delta_sum += part["delta_sum"]
+            total.abs_delta_sum += part["abs_delta_sum"]
+            total.max_abs_delta = max(total.max_abs_delta, part["max_abs_delta"])
+            total.risk_changes += part["risk_changes"]
+        return total
+
+    def summary(self) -> Dict:
+        return {
+            "rows": self.rows,
+            "mean_delta": round(self.delta_sum / self.rows, 6) if self.rows else None,
+            "mean_abs_delta": round(self.abs_delta_sum / self.rows, 6) if self.rows else None,
+            "max_abs_delta": round(self.max_abs_delta, 6),
+            "risk_changes": self.risk_changes,
+        }
+
+
+class ModelRegistry:
+    """
+    Scoring models by version, loaded once: the built-in linear model plus
+    every fitted artifact in model_dir. The live model scores borrowers;
+    the shadow model, if any, is only scored next to it during rescoring
+    so its results can be compared before it goes live.
+    """
+
+    def __init__(self, model_dir: Optional[str] = DEFAULT_MODEL_DIR, live_version: Optional[str] = None,
+                 shadow_version: Optional[str] = None):
+        self.model_dir = model_dir
+        self.models: Dict[str, ScoringModel] = {}
+        self.register(LinearRiskModel())
+        if model_dir and os.path.isdir(model_dir):
+            for name in sorted(os.listdir(model_dir)):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(model_dir, name)
+                try:
+                    self.register(load_model_artifact(path))
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"⚠️ Skipping model artifact {path}: {e}")
+
+        self.live = self.get(live_version or LinearRiskModel().version)
+        self.shadow = self.get(shadow_version) if shadow_version else None
+        if self.shadow is self.live:
+            raise ValueError(f"Shadow model {shadow_version} is already the live model")
+
+    @classmethod
+    def from_env(cls) -> "ModelRegistry":
+        """Registry configured from SCORING_MODEL_DIR, SCORING_MODEL and SHADOW_SCORING_MODEL."""
+        return cls(
+            model_dir=os.getenv("SCORING_MODEL_DIR", DEFAULT_MODEL_DIR),
+            live_version=os.getenv("SCORING_MODEL") or None,
+            shadow_version=os.getenv("SHADOW_SCORING_MODEL") or None,
+        )
+
+    def register(self, model: ScoringModel) -> None:
+        if model.version in self.models:
+            raise ValueError(f"Duplicate scoring model version: {model.version}")
+        self.models[model.version] = model
+
+    def get(self, version: str) -> ScoringModel:
+        try:
+            return self.models[version]
+        except KeyError:
+            raise ValueError(f"Unknown scoring model: {version} (have {', '.join(self.models)})")
+
+    def describe(self) -> Dict:
+        return {
+            "live": self.live.version,
+            "shadow": self.shadow.version if self.shadow else None,
+            "models": [model.describe() for model in self.models.values()],
+        }
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide model registry."""
+    global _registry
+    if _registry is not None:
+        return _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry.from_env()
+        return _registry
+
+
+def read_history(path: str) -> List[Dict]:
+    """Rows of a CSV repayment history with base_score, region and repaid columns."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            {"base_score": float(r["base_score"]), "region": r["region"],
+             "defaulted": r["repaid"].strip().lower() not in REPAID_VALUES}
+            for r in csv.DictReader(f)
+        ]
+
+
+def main() -> None:
+    from Data.regional_data import get_regional_store
+
+    parser = argparse.ArgumentParser(description="Fit a logistic risk model on repayment history.")
+    parser.add_argument("path", help="CSV with base_score, region and repaid columns")
+    parser.add_argument("--version", required=True, help="model version, e.g. logistic-2026-10")
+    parser.add_argument("--output", help=f"artifact path (default {DEFAULT_MODEL_DIR}/<version>.json)")
+    args = parser.parse_args()
+
+    history = read_history(args.path)
+    if not history:
+        raise SystemExit("❌ No history rows to fit on")
+    features = FeatureBatch.from_rows([h["base_score"] for h in history], [h["region"] for h in history],
+                                      get_regional_store().snapshot().table)
+    defaulted = [h["defaulted"] for h in history]
+    model = LogisticRiskModel.fit(args.version, features, defaulted)
+
+    output = args.output or os.path.join(DEFAULT_MODEL_DIR, f"{args.version}.json")
+    save_model_artifact(model, output)
+    print(f"✅ Fitted {args.version} on {len(history)} loans ({sum(defaulted)} defaults), saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+import numpy as np
+
+RISK_LEVELS = ("Low", "Medium", "High")
+RISK_THRESHOLDS = (0.4, 0.7)
+
+
 def classify_risk(score: float) -> str:
     """
     Classify risk score into Low, Medium, or High.
@@ -8,3 +14,11 @@ def classify_risk(score: float) -> str:
         return "Medium"
     else:
         return "High"
+
+
+def classify_risks(scores) -> np.ndarray:
+    """
+    Batch version of classify_risk. Returns an object array of risk labels.
+    """
+    codes = np.digitize(np.asarray(scores, dtype=np.float64), RISK_THRESHOLDS)
+    return np.array(RISK_LEVELS, dtype=object)[codes]
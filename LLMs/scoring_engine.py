@@ -1,3 +1,12 @@
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Bump whenever the scoring formula changes; rescoring and cached
+# explanations are keyed on it
+SCORING_VERSION = "1"
+
+
 def calculate_risk_score(borrower: dict, region_data: dict) -> float:
     """
     Calculate a base risk score using borrower info and regional economic data.
@@ -9,3 +18,66 @@ def calculate_risk_score(borrower: dict, region_data: dict) -> float:
     # Simple scoring model: higher unemployment increases risk, higher income reduces it
     adjusted_score = base + (unemployment * 0.4) - (income / 1000.0)
     return min(max(adjusted_score, 0.0), 1.0)
+
+
+class RegionTable(NamedTuple):
+    """
+    Per-region scoring terms laid out for batch scoring.
+
+    Slot i holds the terms for regions[i]; the extra last slot holds the
+    terms for the fallback stats used for unknown regions. The raw stats
+    are kept alongside for models that weigh them differently.
+    """
+    regions: list
+    positions: Dict[str, int]
+    unemployment_terms: np.ndarray
+    income_terms: np.ndarray
+    unemployment_rates: np.ndarray
+    avg_incomes: np.ndarray
+
+    @property
+    def default_index(self) -> int:
+        return len(self.regions)
+
+
+def build_region_table(regional_data: dict, default_stats: Optional[dict] = None) -> RegionTable:
+    """
+    Precompute the unemployment and income terms of calculate_risk_score for every region.
+    """
+    regions = list(regional_data)
+    unemployment_rates = np.empty(len(regions) + 1, dtype=np.float64)
+    avg_incomes = np.empty(len(regions) + 1, dtype=np.float64)
+
+    for i, stats in enumerate([regional_data[r] or default_stats or {} for r in regions] + [default_stats or {}]):
+        unemployment_rates[i] = stats.get("unemployment_rate", 0.1)
+        avg_incomes[i] = stats.get("avg_income", 200)
+
+    # Same expressions as the scalar model so results match bit for bit
+    unemployment_terms = unemployment_rates * 0.4
+    income_terms = avg_incomes / 1000.0
+
+    positions = {region: i for i, region in enumerate(regions)}
+    return RegionTable(regions, positions, unemployment_terms, income_terms, unemployment_rates, avg_incomes)
+
+
+def encode_regions(region_names: Sequence[str], table: RegionTable) -> np.ndarray:
+    """
+    Map region names to their slot in the region table (unknown regions use the default slot).
+    """
+    default = table.default_index
+    positions = table.positions
+    return np.fromiter((positions.get(r, default) for r in region_names), dtype=np.intp, count=len(region_names))
+
+
+def calculate_risk_scores(base_scores, region_index, table: RegionTable) -> np.ndarray:
+    """
+    Batch version of calculate_risk_score over columnar inputs.
+
+    base_scores and region_index are parallel arrays; region_index holds slots
+    from encode_regions. Returns the same values the scalar function would.
+    """
+    base = np.asarray(base_scores, dtype=np.float64)
+    idx = np.asarray(region_index, dtype=np.intp)
+
+    adjusted_scores = base + table.unemployment_terms[idx] - table.income_terms[idx]
+    return np.minimum(np.maximum(adjusted_scores, 0.0), 1.0)
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Sequence, List
 
 def approve_loan(risk_level: str, policy: Dict[str, bool]) -> bool:
     """
@@ -6,6 +6,23 @@ def approve_loan(risk_level: str, policy: Dict[str, bool]) -> bool:
     """
     return policy.get(risk_level, False)
 
+def decide_loan(risk_level: str, policy: Dict[str, bool]) -> str:
+    """
+    Turn a risk level into the decision stored on the borrower row.
+    """
+    is_approved = approve_loan(risk_level, policy)
+    decision = "Approved" if is_approved else "Rejected"
+    if risk_level == "Medium" and is_approved:
+        decision = "Conditional"
+    return decision
+
+def decide_loans(risk_levels: Sequence[str], policy: Dict[str, bool]) -> List[str]:
+    """
+    Batch version of decide_loan; the decision is looked up once per risk level.
+    """
+    decisions = {level: decide_loan(level, policy) for level in set(risk_levels)}
+    return [decisions[level] for level in risk_levels]
+
 def override_decision(borrower_id: str, current_status: bool, reason: str) -> dict:
     """
     Log override decision for auditing.
@@ -0,0 +1,211 @@
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from backend.database import connect_db, get_connection
+from backend.metrics import (AUDIT_QUEUE_DEPTH, AUDIT_ENTRIES_WRITTEN, AUDIT_BATCH_SECONDS, AUDIT_WRITE_ERRORS,
+                             DB_LOCK_WAIT_SECONDS)
+
+# Most entries committed in one transaction
+AUDIT_BATCH_SIZE = 1000
+
+# How long the writer lets entries accumulate before committing them
+AUDIT_FLUSH_INTERVAL_SEC = 0.2
+
+AUDIT_COLUMNS = ("seq", "borrower_id", "action", "previous_decision", "decision", "officer", "reason", "created_at")
+
+_INSERT_COLUMNS = AUDIT_COLUMNS[1:]
+
+
+class AuditLog:
+    """
+    Write-behind queue for the decision audit log.
+
+    record() only enqueues, so auditing never adds a commit to the request
+    that made the decision. A writer thread group-commits queued entries in
+    batches of up to batch_size every flush_interval_sec on its own
+    synchronous=FULL connection; a failed commit keeps its batch and is
+    retried. stop() drains the queue and returns only once every accepted
+    entry is committed.
+    """
+
+    def __init__(self, batch_size: int = AUDIT_BATCH_SIZE, flush_interval_sec: float = AUDIT_FLUSH_INTERVAL_SEC):
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        self._queue = queue.Queue()
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._loop, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def record(self, borrower_id: str, action: str, decision: Optional[str] = None,
+               previous_decision: Optional[str] = None, officer: Optional[str] = None,
+               reason: Optional[str] = None) -> None:
+        """Queue one audit entry, timestamped now."""
+        self._queue.put((borrower_id, action, previous_decision, decision, officer, reason, time.time()))
+        AUDIT_QUEUE_DEPTH.inc()
+        if not self._stopping.is_set() and (self._thread is None or not self._thread.is_alive()):
+            self.start()
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every entry queued so far is committed; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """Commit everything queued, then stop the writer. False if entries are still pending."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        # Entries queued after the writer exited are committed here
+        if self._queue.unfinished_tasks:
+            self._drain_all()
+        return not self._queue.unfinished_tasks
+
+    def _take_batch(self, block: bool) -> List[Tuple]:
+        batch = []
+        try:
+            batch.append(self._queue.get(block=block, timeout=self.flush_interval_sec if block else None))
+            # Let concurrent decisions pile up so one commit covers them all
+            deadline = time.monotonic() + self.flush_interval_sec
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopping.is_set():
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+        except queue.Empty:
+            pass
+        return batch
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = connect_db(check_same_thread=False)
+        # The shared connections run synchronous=NORMAL; a committed audit entry must survive power loss
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    def _write(self, conn: sqlite3.Connection, batch: List[Tuple]) -> None:
+        with AUDIT_BATCH_SECONDS.time():
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            DB_LOCK_WAIT_SECONDS.observe(time.perf_counter() - started)
+            with conn:
+                conn.executemany(f"""
+                    INSERT INTO decision_audit ({', '.join(_INSERT_COLUMNS)})
+                    VALUES ({', '.join('?' * len(_INSERT_COLUMNS))})
+                """, batch)
+        AUDIT_ENTRIES_WRITTEN.inc(len(batch))
+        AUDIT_QUEUE_DEPTH.dec(len(batch))
+        for _ in batch:
+            self._queue.task_done()
+
+    def _drain_all(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                batch = self._take_batch(block=False)
+                if not batch:
+                    return
+                self._write(conn, batch)
+        finally:
+            conn.close()
+
+    def _loop(self) -> None:
+        conn = None
+        batch = []
+        try:
+            while True:
+                if not batch:
+                    if self._stopping.is_set() and not self._queue.unfinished_tasks:
+                        return
+                    batch = self._take_batch(block=True)
+                    if not batch:
+                        continue
+                try:
+                    if conn is None:
+                        conn = self._connect()
+                    self._write(conn, batch)
+                    batch = []
+                except Exception as e:
+                    AUDIT_WRITE_ERRORS.inc()
+                    print(f"❌ Error writing decision audit log, retrying: {e}")
+                    time.sleep(min(1.0, self.flush_interval_sec * 5))
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+_audit_log: Optional[AuditLog] = None
+_audit_lock = threading.Lock()
+
+
+def get_audit_log() -> AuditLog:
+    """Process-wide audit log writer."""
+    global _audit_log
+    if _audit_log is not None:
+        return _audit_log
+    with _audit_lock:
+        if _audit_log is None:
+            _audit_log = AuditLog()
+        return _audit_log
+
+
+def query_audit_log(
+    borrower_id: Optional[str] = None,
+    officer: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    before: Optional[Tuple[float, int]] = None,
+    limit: int = 100,
+) -> Tuple[List[Dict], Optional[Tuple[float, int]]]:
+    """
+    Audit entries newest first, filtered by borrower, officer, action and
+    created_at range [since, until). before is the (created_at, seq) of the
+    last entry already returned. Returns the page and the position to pass
+    as before for the next one, or None when there are no more entries.
+    """
+    where, params = [], []
+    for column, value in (("borrower_id", borrower_id), ("officer", officer), ("action", action)):
+        if value is not None:
+            where.append(f"{column} = ?")
+            params.append(value)
+    if since is not None:
+        where.append("created_at >= ?")
+        params.append(since)
+    if until is not None:
+        where.append("created_at < ?")
+        params.append(until)
+    if before is not None:
+        where.append("(created_at, seq) < (?, ?)")
+        params.extend(before)
+
+    sql = f"SELECT {', '.join(AUDIT_COLUMNS)} FROM decision_audit"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at DESC, seq DESC LIMIT ?"
+    params.append(limit + 1)
+
+    c = get_connection().cursor()
+    c.execute(sql, params)
+    rows = [dict(zip(AUDIT_COLUMNS, r)) for r in c.fetchall()]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1]["created_at"], rows[-1]["seq"])
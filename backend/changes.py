@@ -0,0 +1,110 @@
+import os
+import time
+from typing import Dict, Optional
+
+from backend.database import BORROWER_COLUMNS, get_connection, transaction
+
+# Most changed borrowers returned by one delta request
+DEFAULT_CHANGE_PAGE_SIZE = 500
+MAX_CHANGE_PAGE_SIZE = 5000
+
+# How long change log entries are kept for clients that are behind
+DEFAULT_RETENTION_SEC = 86400
+
+
+class ChangeLogCompacted(Exception):
+    """The requested version is older than the oldest change still in the log."""
+
+    def __init__(self, since: int, floor: int):
+        super().__init__(f"Changes since version {since} were compacted (the log starts after version {floor}); reload everything")
+        self.since = since
+        self.floor = floor
+
+
+def _get_floor(c) -> int:
+    c.execute("SELECT value FROM score_state WHERE key='changes_floor'")
+    row = c.fetchone()
+    return int(row[0]) if row else 0
+
+
+def get_change_version(conn=None) -> int:
+    """Version of the latest change to the borrowers table (0 before any)."""
+    c = (conn or get_connection()).cursor()
+    c.execute("SELECT COALESCE(MAX(version), 0) FROM borrower_changes")
+    return max(c.fetchone()[0], _get_floor(c))
+
+
+def get_changes(since: int, limit: int = DEFAULT_CHANGE_PAGE_SIZE) -> Dict:
+    """
+    Borrowers changed after version since, oldest change first: each entry is
+    the borrower's current row (op "upsert") or op "delete" if it is gone,
+    so a borrower changed many times appears once. Pass the returned version
+    back as since; has_more means another page is already waiting. Raises
+    ChangeLogCompacted if since is older than the log reaches back.
+    """
+    columns = ", ".join(f"b.{column}" for column in BORROWER_COLUMNS)
+    conn = get_connection()
+    with conn:
+        # One read transaction, so the rows match the versions they are reported at
+        conn.execute("BEGIN")
+        c = conn.cursor()
+        floor = _get_floor(c)
+        if since < floor:
+            raise ChangeLogCompacted(since, floor)
+        head = get_change_version(conn)
+        c.execute(f"""
+            SELECT ch.borrower_id, ch.version, {columns}
+            FROM (
+                SELECT borrower_id, MAX(version) AS version FROM borrower_changes
+                WHERE version > ?
+                GROUP BY borrower_id
+                ORDER BY version LIMIT ?
+            ) ch
+            LEFT JOIN borrowers b ON b.id = ch.borrower_id
+            ORDER BY ch.version
+        """, (since, limit))
+        rows = c.fetchall()
+
+    changes = [
+        {"id": r[0], "version": r[1], "op": "delete", "borrower": None} if r[2] is None
+        else {"id": r[0], "version": r[1], "op": "upsert", "borrower": dict(zip(BORROWER_COLUMNS, r[2:]))}
+        for r in rows
+    ]
+    # A full page may stop short of head; the next page starts after its last change
+    has_more = len(rows) == limit
+    return {
+        "version": rows[-1][1] if has_more else max(head, since),
+        "changes": changes,
+        "has_more": has_more,
+    }
+
+
+def compact_change_log(retention_sec: Optional[float] = None) -> Dict:
+    """
+    Drop change log entries superseded by a later change to the same
+    borrower (always safe: deltas only report the latest one), and entries
+    older than retention_sec (CHANGE_LOG_RETENTION_SEC). The latter raises
+    the floor below which clients have to reload everything.
+    """
+    if retention_sec is None:
+        retention_sec = float(os.getenv("CHANGE_LOG_RETENTION_SEC", str(DEFAULT_RETENTION_SEC)))
+    with transaction() as conn:
+        c = conn.cursor()
+        c.execute("""
+            DELETE FROM borrower_changes
+            WHERE version < (SELECT MAX(version) FROM borrower_changes later
+                             WHERE later.borrower_id = borrower_changes.borrower_id)
+        """)
+        superseded = c.rowcount
+
+        c.execute("SELECT MAX(version) FROM borrower_changes WHERE changed_at < ?", (time.time() - retention_sec,))
+        expired_to = c.fetchone()[0]
+        expired = 0
+        if expired_to is not None:
+            c.execute("DELETE FROM borrower_changes WHERE version <= ?", (expired_to,))
+            expired = c.rowcount
+            c.execute("""
+                INSERT INTO score_state (key, value) VALUES ('changes_floor', ?)
+                ON CONFLICT (key) DO UPDATE SET value = MAX(CAST(value AS INTEGER), CAST(excluded.value AS INTEGER))
+            """, (expired_to,))
+    return {"superseded": superseded, "expired": expired, "floor": _get_floor(get_connection().cursor())}
@@ -1,11 +1,99 @@
+import os
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Sequence, Tuple
 
-def connect_db():
-    return sqlite3.connect("microloan.db")
+from backend.metrics import DB_CONNECTIONS_OPENED, DB_LOCK_WAIT_SECONDS, DB_LOCK_ERRORS
+
+# Columns returned to API clients, in table order
+BORROWER_COLUMNS = ("id", "name", "region", "loan_amount", "base_score", "adjusted_score", "risk", "decision",
+                    "model_version")
+
+# Columns the list endpoint can sort on (always with id as tie-breaker)
+SORT_COLUMNS = ("id", "name", "region", "loan_amount", "adjusted_score")
+
+# Prepared statements kept per connection by the sqlite3 module
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+
+def get_db_path() -> str:
+    """Database file, overridable with MICROLOAN_DB_PATH."""
+    return os.getenv("MICROLOAN_DB_PATH", "microloan.db")
+
+def _busy_timeout_ms() -> int:
+    return int(os.getenv("MICROLOAN_DB_BUSY_TIMEOUT_MS", "5000"))
+
+def connect_db(check_same_thread: bool = True) -> sqlite3.Connection:
+    """
+    Open a new tuned connection. The caller owns it and must close it;
+    request handlers should use get_connection() instead.
+    """
+    busy_timeout = _busy_timeout_ms()
+    conn = sqlite3.connect(
+        get_db_path(),
+        timeout=busy_timeout / 1000.0,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=check_same_thread,
+    )
+    # WAL lets readers proceed while the updater holds a write transaction
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA busy_timeout={busy_timeout}")
+    DB_CONNECTIONS_OPENED.inc()
+    return conn
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Return the calling thread's shared connection, opening it on first use.
+    Connections inherited across a fork are never reused.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        conn = connect_db()
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+def close_connection() -> None:
+    """Close the calling thread's shared connection, if any."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        conn.close()
+    _local.conn = None
+
+@contextmanager
+def transaction():
+    """
+    Yield the thread's connection inside a write transaction; commit on
+    success, roll back on error. The write lock is taken up front (BEGIN
+    IMMEDIATE), so reads inside the block see no concurrent writes and the
+    wait for the lock is measured.
+    """
+    conn = get_connection()
+    if not conn.in_transaction:
+        started = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e):
+                DB_LOCK_ERRORS.inc()
+            raise
+        finally:
+            DB_LOCK_WAIT_SECONDS.observe(time.perf_counter() - started)
+    with conn:
+        yield conn
 
 def init_db():
     conn = connect_db()
     c = conn.cursor()
+    # Workers starting together migrate one at a time; the rest then find everything in place
+    c.execute('BEGIN IMMEDIATE')
     c.execute('''
         CREATE TABLE IF NOT EXISTS borrowers (
             id TEXT PRIMARY KEY,
@@ -18,8 +106,288 @@ def init_db():
             decision TEXT
         )
     ''')
-    
-    
+
+    # Accumulated repayment feedback, added to base_score when scoring
+    c.execute('PRAGMA table_info(borrowers)')
+    columns = {r[1] for r in c.fetchall()}
+    if 'feedback_score' not in columns:
+        c.execute('ALTER TABLE borrowers ADD COLUMN feedback_score REAL NOT NULL DEFAULT 0')
+    # Decision set by a loan officer; rescoring keeps it instead of the policy decision
+    if 'decision_override' not in columns:
+        c.execute('ALTER TABLE borrowers ADD COLUMN decision_override TEXT')
+    # Version of the scoring model (LLMs.model_registry) behind adjusted_score
+    if 'model_version' not in columns:
+        c.execute('ALTER TABLE borrowers ADD COLUMN model_version TEXT')
+
+    # Indexes backing the list endpoint's filters and keyset sort orders
+    c.execute('CREATE INDEX IF NOT EXISTS idx_borrowers_region ON borrowers (region, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_borrowers_risk ON borrowers (risk, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_borrowers_decision ON borrowers (decision, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_borrowers_score ON borrowers (adjusted_score, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_borrowers_loan ON borrowers (loan_amount, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_borrowers_name ON borrowers (name, id)')
+
+    # Change tracking for the periodic rescoring pass: the triggers queue
+    # borrowers whose scoring inputs changed, score_state remembers which
+    # regional stats / policy version the table was last scored against
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS rescore_queue (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            borrower_id TEXT NOT NULL
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_rescore_queue_borrower ON rescore_queue (borrower_id)')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS score_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS borrowers_rescore_insert AFTER INSERT ON borrowers
+        BEGIN
+            INSERT INTO rescore_queue (borrower_id) VALUES (NEW.id);
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS borrowers_rescore_update AFTER UPDATE OF base_score, region ON borrowers
+        WHEN OLD.base_score IS NOT NEW.base_score OR OLD.region IS NOT NEW.region
+        BEGIN
+            INSERT INTO rescore_queue (borrower_id) VALUES (NEW.id);
+        END
+    ''')
+
+    # Portfolio aggregates by region x risk x decision, kept current by
+    # triggers so every write path (API, bulk import, rescoring) updates them
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS portfolio_summary (
+            region TEXT NOT NULL,
+            risk TEXT NOT NULL,
+            decision TEXT NOT NULL,
+            borrower_count INTEGER NOT NULL DEFAULT 0,
+            total_loan REAL NOT NULL DEFAULT 0,
+            scored_count INTEGER NOT NULL DEFAULT 0,
+            score_sum REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (region, risk, decision)
+        )
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS borrowers_summary_insert AFTER INSERT ON borrowers
+        BEGIN
+            INSERT INTO portfolio_summary (region, risk, decision, borrower_count, total_loan, scored_count, score_sum)
+            VALUES (IFNULL(NEW.region, ''), IFNULL(NEW.risk, ''), IFNULL(NEW.decision, ''), 1,
+                    IFNULL(NEW.loan_amount, 0), NEW.adjusted_score IS NOT NULL, IFNULL(NEW.adjusted_score, 0))
+            ON CONFLICT (region, risk, decision) DO UPDATE SET
+                borrower_count = borrower_count + 1,
+                total_loan = total_loan + excluded.total_loan,
+                scored_count = scored_count + excluded.scored_count,
+                score_sum = score_sum + excluded.score_sum;
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS borrowers_summary_delete AFTER DELETE ON borrowers
+        BEGIN
+            UPDATE portfolio_summary SET
+                borrower_count = borrower_count - 1,
+                total_loan = total_loan - IFNULL(OLD.loan_amount, 0),
+                scored_count = scored_count - (OLD.adjusted_score IS NOT NULL),
+                score_sum = score_sum - IFNULL(OLD.adjusted_score, 0)
+            WHERE region = IFNULL(OLD.region, '') AND risk = IFNULL(OLD.risk, '') AND decision = IFNULL(OLD.decision, '');
+            DELETE FROM portfolio_summary
+            WHERE borrower_count <= 0
+              AND region = IFNULL(OLD.region, '') AND risk = IFNULL(OLD.risk, '') AND decision = IFNULL(OLD.decision, '');
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS borrowers_summary_update
+        AFTER UPDATE OF region, risk, decision, loan_amount, adjusted_score ON borrowers
+        WHEN OLD.region IS NOT NEW.region OR OLD.risk IS NOT NEW.risk OR OLD.decision IS NOT NEW.decision
+          OR OLD.loan_amount IS NOT NEW.loan_amount OR OLD.adjusted_score IS NOT NEW.adjusted_score
+        BEGIN
+            UPDATE portfolio_summary SET
+                borrower_count = borrower_count - 1,
+                total_loan = total_loan - IFNULL(OLD.loan_amount, 0),
+                scored_count = scored_count - (OLD.adjusted_score IS NOT NULL),
+                score_sum = score_sum - IFNULL(OLD.adjusted_score, 0)
+            WHERE region = IFNULL(OLD.region, '') AND risk = IFNULL(OLD.risk, '') AND decision = IFNULL(OLD.decision, '');
+            DELETE FROM portfolio_summary
+            WHERE borrower_count <= 0
+              AND region = IFNULL(OLD.region, '') AND risk = IFNULL(OLD.risk, '') AND decision = IFNULL(OLD.decision, '');
+            INSERT INTO portfolio_summary (region, risk, decision, borrower_count, total_loan, scored_count, score_sum)
+            VALUES (IFNULL(NEW.region, ''), IFNULL(NEW.risk, ''), IFNULL(NEW.decision, ''), 1,
+                    IFNULL(NEW.loan_amount, 0), NEW.adjusted_score IS NOT NULL, IFNULL(NEW.adjusted_score, 0))
+            ON CONFLICT (region, risk, decision) DO UPDATE SET
+                borrower_count = borrower_count + 1,
+                total_loan = total_loan + excluded.total_loan,
+                scored_count = scored_count + excluded.scored_count,
+                score_sum = score_sum + excluded.score_sum;
+        END
+    ''')
+    # Write version of the borrowers table, bumped by every row change, so
+    # in-memory copies can tell cheaply whether they are stale
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    c.execute("INSERT OR IGNORE INTO table_versions (name, version) VALUES ('borrowers', 0)")
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS borrowers_version_{event.lower()} AFTER {event} ON borrowers
+            BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE name = 'borrowers';
+            END
+        ''')
+
+    # Databases created before the summary table existed start from a full rebuild
+    c.execute('SELECT NOT EXISTS (SELECT 1 FROM portfolio_summary) AND EXISTS (SELECT 1 FROM borrowers)')
+    if c.fetchone()[0]:
+        rebuild_portfolio_summary(c)
+
+    # Run history of the rescoring scheduler
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS rescore_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            trigger TEXT,
+            mode TEXT,
+            started_at REAL,
+            duration_sec REAL,
+            rows_scanned INTEGER,
+            rows_updated INTEGER,
+            rows_per_sec REAL,
+            shard_count INTEGER,
+            failed_shards INTEGER,
+            status TEXT
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS rescore_shard_runs (
+            run_id INTEGER NOT NULL REFERENCES rescore_runs (id),
+            lo TEXT,
+            hi TEXT,
+            rows_scanned INTEGER,
+            rows_updated INTEGER,
+            duration_sec REAL,
+            error TEXT
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_rescore_shard_runs_run ON rescore_shard_runs (run_id)')
+    # Shadow model compared against the live one during a pass, and how far apart they were
+    c.execute('PRAGMA table_info(rescore_runs)')
+    if 'shadow_model' not in {r[1] for r in c.fetchall()}:
+        c.execute('ALTER TABLE rescore_runs ADD COLUMN shadow_model TEXT')
+        c.execute('ALTER TABLE rescore_runs ADD COLUMN shadow_stats TEXT')
+
+    # Append-only log of repayment events; event_id makes resubmission a no-op
+    # and applied_at marks events already folded into feedback_score
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS repayment_events (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id TEXT NOT NULL UNIQUE,
+            borrower_id TEXT NOT NULL,
+            feedback REAL NOT NULL,
+            occurred_at TEXT,
+            received_at REAL NOT NULL,
+            applied_at REAL
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_repayment_events_pending ON repayment_events (seq) WHERE applied_at IS NULL')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_repayment_events_borrower ON repayment_events (borrower_id, seq)')
+
+    # Append-only audit trail of loan decisions and officer overrides, written
+    # behind the request by backend.audit
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS decision_audit (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            borrower_id TEXT NOT NULL,
+            action TEXT NOT NULL,
+            previous_decision TEXT,
+            decision TEXT,
+            officer TEXT,
+            reason TEXT,
+            created_at REAL NOT NULL
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_decision_audit_borrower ON decision_audit (borrower_id, created_at)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_decision_audit_officer ON decision_audit (officer, created_at)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_decision_audit_time ON decision_audit (created_at)')
+
+    # Time-limited leadership leases (backend.leader), e.g. the one rescoring scheduler
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS leader_leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            acquired_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    ''')
+
+    # Versioned log of borrower changes that clients can apply as deltas
+    # (backend.changes); AUTOINCREMENT keeps versions monotonic across compaction
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS borrower_changes (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            borrower_id TEXT NOT NULL,
+            changed_at REAL NOT NULL
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_borrower_changes_borrower ON borrower_changes (borrower_id, version)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_borrower_changes_time ON borrower_changes (changed_at)')
+    # Only changes to columns clients see are logged (not e.g. feedback_score alone)
+    visible_changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in BORROWER_COLUMNS)
+    for event, row, when in (
+        ('INSERT', 'NEW', ''),
+        ('UPDATE', 'NEW', f'WHEN {visible_changed}'),
+        ('DELETE', 'OLD', ''),
+    ):
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS borrowers_changes_{event.lower()} AFTER {event} ON borrowers
+            {when}
+            BEGIN
+                INSERT INTO borrower_changes (borrower_id, changed_at)
+                VALUES ({row}.id, (julianday('now') - 2440587.5) * 86400.0);
+            END
+        ''')
+
+    # Borrower search (backend.search): case-insensitive name lookups, and a
+    # trigram full-text index over name and region for substring and fuzzy
+    # matches. The index stores no text of its own (content='borrowers') and
+    # is kept in step by the triggers below.
+    c.execute('CREATE INDEX IF NOT EXISTS idx_borrowers_name_nocase ON borrowers (name COLLATE NOCASE, id)')
+    c.execute("SELECT 1 FROM sqlite_master WHERE name = 'borrowers_fts'")
+    search_index_existed = c.fetchone() is not None
+    c.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS borrowers_fts USING fts5(
+            name, region, content='borrowers', content_rowid='rowid', tokenize='trigram'
+        )
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS borrowers_fts_insert AFTER INSERT ON borrowers
+        BEGIN
+            INSERT INTO borrowers_fts (rowid, name, region) VALUES (NEW.rowid, NEW.name, NEW.region);
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS borrowers_fts_delete AFTER DELETE ON borrowers
+        BEGIN
+            INSERT INTO borrowers_fts (borrowers_fts, rowid, name, region) VALUES ('delete', OLD.rowid, OLD.name, OLD.region);
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER IF NOT EXISTS borrowers_fts_update AFTER UPDATE OF name, region ON borrowers
+        WHEN OLD.name IS NOT NEW.name OR OLD.region IS NOT NEW.region
+        BEGIN
+            INSERT INTO borrowers_fts (borrowers_fts, rowid, name, region) VALUES ('delete', OLD.rowid, OLD.name, OLD.region);
+            INSERT INTO borrowers_fts (rowid, name, region) VALUES (NEW.rowid, NEW.name, NEW.region);
+        END
+    ''')
+    # Databases created before search existed index their borrowers once
+    if not search_index_existed:
+        c.execute('SELECT COUNT(*) FROM borrowers')
+        if c.fetchone()[0]:
+            rebuild_search_index(c)
+
     c.execute('SELECT COUNT(*) FROM borrowers')
     if c.fetchone()[0] == 0:
         sample_data = [
@@ -35,21 +403,136 @@ def init_db():
     conn.commit()
     conn.close()
 
+# Recomputes portfolio_summary from scratch; used to seed and to repair it
+SUMMARY_REBUILD_SQL = '''
+    SELECT IFNULL(region, ''), IFNULL(risk, ''), IFNULL(decision, ''), COUNT(*),
+           TOTAL(loan_amount), COUNT(adjusted_score), TOTAL(adjusted_score)
+    FROM borrowers
+    GROUP BY 1, 2, 3
+'''
+
+def rebuild_portfolio_summary(c) -> None:
+    """Replace portfolio_summary with aggregates computed from the borrowers table."""
+    c.execute('DELETE FROM portfolio_summary')
+    c.execute(f'''
+        INSERT INTO portfolio_summary (region, risk, decision, borrower_count, total_loan, scored_count, score_sum)
+        {SUMMARY_REBUILD_SQL}
+    ''')
+
+def rebuild_search_index(c) -> None:
+    """
+    Re-index every borrower in borrowers_fts. The index refers to rows by
+    rowid, which VACUUM may renumber, so run this after a VACUUM.
+    """
+    c.execute("INSERT INTO borrowers_fts (borrowers_fts) VALUES ('rebuild')")
+
+def get_table_version(name: str = "borrowers", conn: Optional[sqlite3.Connection] = None) -> int:
+    """Write version of a table; changes whenever a committed write touched it."""
+    c = (conn or get_connection()).cursor()
+    c.execute("SELECT version FROM table_versions WHERE name=?", (name,))
+    row = c.fetchone()
+    return row[0] if row else 0
+
 def get_all_borrowers():
-    conn = connect_db()
-    c = conn.cursor()
-    c.execute("SELECT * FROM borrowers")
+    c = get_connection().cursor()
+    c.execute(f"SELECT {', '.join(BORROWER_COLUMNS)} FROM borrowers")
     rows = c.fetchall()
-    conn.close()
-    return [
-        {
-            "id": r[0],
-            "name": r[1],
-            "region": r[2],
-            "loan_amount": r[3],
-            "base_score": r[4],
-            "adjusted_score": r[5],
-            "risk": r[6],
-            "decision": r[7]
-        } for r in rows
-    ]
+    return [dict(zip(BORROWER_COLUMNS, r)) for r in rows]
+
+def build_borrower_query(
+    region: Optional[Sequence[str]] = None,
+    risk: Optional[Sequence[str]] = None,
+    decision: Optional[Sequence[str]] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    sort: str = "id",
+    descending: bool = False,
+    after: Optional[Tuple] = None,
+    limit: Optional[int] = None,
+) -> Tuple[str, list]:
+    """
+    Build a filtered, keyset-paginated SELECT over borrowers.
+
+    after is the (sort value, id) of the last row already returned. NULL sort
+    values come first in ascending order and last in descending order.
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Unsupported sort column: {sort}")
+
+    where, params = [], []
+    for column, values in (("region", region), ("risk", risk), ("decision", decision)):
+        if values:
+            where.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    if min_score is not None:
+        where.append("adjusted_score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        where.append("adjusted_score <= ?")
+        params.append(max_score)
+
+    if after is not None:
+        value, last_id = after
+        if sort == "id":
+            where.append("id < ?" if descending else "id > ?")
+            params.append(last_id)
+        elif value is None and descending:
+            where.append(f"{sort} IS NULL AND id < ?")
+            params.append(last_id)
+        elif value is None:
+            where.append(f"({sort} IS NULL AND id > ?) OR {sort} IS NOT NULL")
+            params.append(last_id)
+        elif descending:
+            where.append(f"({sort}, id) < (?, ?) OR {sort} IS NULL")
+            params.extend([value, last_id])
+        else:
+            where.append(f"({sort}, id) > (?, ?)")
+            params.extend([value, last_id])
+
+    direction = "DESC" if descending else "ASC"
+    sql = f"SELECT {', '.join(BORROWER_COLUMNS)} FROM borrowers"
+    if where:
+        sql += " WHERE " + " AND ".join(f"({w})" for w in where)
+    sql += f" ORDER BY {sort} {direction}"
+    if sort != "id":
+        sql += f", id {direction}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+def get_borrowers_page(limit: int, **query) -> Tuple[List[dict], Optional[Tuple]]:
+    """
+    Return one page of borrowers and the keyset position (sort value, id) of
+    its last row, or None when there are no more rows.
+    """
+    sort = query.get("sort", "id")
+    sql, params = build_borrower_query(limit=limit + 1, **query)
+    c = get_connection().cursor()
+    c.execute(sql, params)
+    rows = [dict(zip(BORROWER_COLUMNS, r)) for r in c.fetchall()]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][sort], rows[-1]["id"])
+
+def iter_borrowers(chunk_size: int = 1000, **query) -> Iterator[dict]:
+    """
+    Stream borrowers matching build_borrower_query straight from a cursor.
+
+    Uses a dedicated connection so the generator can be resumed from any
+    thread (StreamingResponse iterates it in the threadpool).
+    """
+    sql, params = build_borrower_query(**query)
+    conn = connect_db(check_same_thread=False)
+    try:
+        c = conn.cursor()
+        c.execute(sql, params)
+        while True:
+            rows = c.fetchmany(chunk_size)
+            if not rows:
+                break
+            for r in rows:
+                yield dict(zip(BORROWER_COLUMNS, r))
+    finally:
+        conn.close()
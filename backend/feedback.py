@@ -0,0 +1,269 @@
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError, field_validator
+
+from backend.database import get_connection, transaction, init_db
+from backend.metrics import FEEDBACK_EVENTS_APPLIED, FEEDBACK_ERRORS
+from backend.rescoring import ROW_COLUMNS, load_scoring_inputs, rescore_rows
+
+# Events inserted per transaction by the file loader
+APPEND_BATCH_SIZE = 5000
+
+# Pending events folded into borrower scores per transaction
+APPLY_BATCH_SIZE = 5000
+
+# Cap on the number of row errors the file loader reports
+MAX_REPORTED_ERRORS = 1000
+
+
+class RepaymentEvent(BaseModel):
+    """
+    One repayment observation. feedback is added to the borrower's base score
+    (like Data.repayment_feedback); event_id makes resubmitting it a no-op.
+    """
+    event_id: str
+    borrower_id: str
+    feedback: float
+    occurred_at: Optional[str] = None
+
+    @field_validator("event_id", "borrower_id")
+    @classmethod
+    def not_blank(cls, value: str) -> str:
+        value = value.strip()
+        if not value:
+            raise ValueError("must not be empty")
+        return value
+
+
+def append_events(events: List[RepaymentEvent]) -> Dict:
+    """Append events to the log in one transaction, skipping event ids already logged."""
+    received_at = time.time()
+    with transaction() as conn:
+        before = conn.total_changes
+        conn.executemany("""
+            INSERT INTO repayment_events (event_id, borrower_id, feedback, occurred_at, received_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (event_id) DO NOTHING
+        """, [(e.event_id, e.borrower_id, e.feedback, e.occurred_at, received_at) for e in events])
+        appended = conn.total_changes - before
+    return {"received": len(events), "appended": appended, "duplicates": len(events) - appended}
+
+
+def apply_pending_batch(batch_size: int = APPLY_BATCH_SIZE) -> Dict:
+    """
+    Fold the oldest pending events into feedback_score and rescore the
+    borrowers they touched, all in one transaction.
+
+    Marking the events applied commits together with the score change, so a
+    crash or retry can neither lose nor double-apply an event. Borrowers
+    whose events net to zero are left untouched. Events for borrower ids not
+    (yet) in the table stay pending until the borrower is added, e.g. by a
+    later bulk import.
+    """
+    regional, policy = load_scoring_inputs()
+    conn = get_connection()
+    with conn:
+        c = conn.cursor()
+        # Take the write lock before choosing the batch so concurrent appliers never pick the same events
+        c.execute("BEGIN IMMEDIATE")
+        c.execute("""
+            SELECT MAX(seq) FROM (
+                SELECT seq FROM repayment_events e
+                WHERE applied_at IS NULL AND EXISTS (SELECT 1 FROM borrowers b WHERE b.id = e.borrower_id)
+                ORDER BY seq LIMIT ?
+            )
+        """, (batch_size,))
+        high_seq = c.fetchone()[0]
+        if high_seq is None:
+            return {"events": 0, "borrowers": 0, "rescored": 0}
+
+        c.execute(f"""
+            UPDATE borrowers SET feedback_score = feedback_score + batch.delta
+            FROM (
+                SELECT borrower_id, SUM(feedback) AS delta FROM repayment_events
+                WHERE applied_at IS NULL AND seq <= ?
+                GROUP BY borrower_id
+            ) AS batch
+            WHERE borrowers.id = batch.borrower_id AND batch.delta != 0
+            RETURNING {ROW_COLUMNS}
+        """, (high_seq,))
+        rows = c.fetchall()
+        rescored = rescore_rows(c, rows, regional.table, policy)
+
+        c.execute("""
+            UPDATE repayment_events SET applied_at = ?
+            WHERE applied_at IS NULL AND seq <= ?
+              AND EXISTS (SELECT 1 FROM borrowers b WHERE b.id = repayment_events.borrower_id)
+        """, (time.time(), high_seq))
+        events = c.rowcount
+    return {"events": events, "borrowers": len(rows), "rescored": rescored}
+
+
+def apply_pending_events(batch_size: int = APPLY_BATCH_SIZE) -> Dict:
+    """Apply every pending event, one batch per transaction."""
+    totals = {"events": 0, "borrowers": 0, "rescored": 0}
+    while True:
+        result = apply_pending_batch(batch_size)
+        if not result["events"]:
+            return totals
+        FEEDBACK_EVENTS_APPLIED.inc(result["events"])
+        for key in totals:
+            totals[key] += result[key]
+
+
+def get_feedback_status() -> Dict:
+    c = get_connection().cursor()
+    c.execute("SELECT COUNT(*), MIN(received_at) FROM repayment_events WHERE applied_at IS NULL")
+    pending, oldest = c.fetchone()
+    c.execute("""
+        SELECT COUNT(*) FROM repayment_events e
+        WHERE applied_at IS NULL AND NOT EXISTS (SELECT 1 FROM borrowers b WHERE b.id = e.borrower_id)
+    """)
+    unknown = c.fetchone()[0]
+    c.execute("SELECT COALESCE(MAX(seq), 0) FROM repayment_events")
+    return {
+        "pending_events": pending,
+        # Included in pending_events: waiting for their borrower to be added
+        "unknown_borrower_events": unknown,
+        "oldest_pending_age_sec": round(time.time() - oldest, 3) if oldest else None,
+        "last_seq": c.fetchone()[0],
+    }
+
+
+def iter_event_file(path: str) -> Iterator[Tuple[int, Optional[RepaymentEvent], Optional[str]]]:
+    """
+    Yield (row number, event, error) for each row of a CSV or NDJSON event
+    file. Rows without an event_id get one derived from the file name and row
+    number, so loading the same file twice appends nothing the second time.
+    """
+    ndjson = path.lower().endswith((".ndjson", ".jsonl"))
+    name = os.path.basename(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if ndjson:
+            records = (line for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        for row_number, record in enumerate(records, start=1):
+            try:
+                if ndjson:
+                    record = json.loads(record)
+                    if not isinstance(record, dict):
+                        raise ValueError("each line must be a JSON object")
+                if not record.get("event_id"):
+                    record["event_id"] = f"{name}:{row_number}"
+                yield row_number, RepaymentEvent.model_validate(record), None
+            except ValidationError as e:
+                yield row_number, None, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            except ValueError as e:
+                yield row_number, None, str(e)
+
+
+def load_event_file(path: str, batch_size: int = APPEND_BATCH_SIZE) -> Dict:
+    """Append the events in a CSV/NDJSON file to the event log in batches."""
+    totals = {"received": 0, "appended": 0, "duplicates": 0, "failed": 0}
+    errors = []
+    batch = []
+
+    def flush() -> None:
+        result = append_events(batch)
+        for key in ("received", "appended", "duplicates"):
+            totals[key] += result[key]
+        batch.clear()
+
+    for row_number, event, error in iter_event_file(path):
+        if error:
+            totals["failed"] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "error": error})
+            continue
+        batch.append(event)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return {**totals, "errors": errors}
+
+
+class FeedbackApplier:
+    """Background thread that applies pending repayment events every interval_sec or when triggered."""
+
+    def __init__(self, interval_sec: float = 5.0, batch_size: int = APPLY_BATCH_SIZE):
+        self.interval_sec = interval_sec
+        self.batch_size = batch_size
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls) -> "FeedbackApplier":
+        """Applier configured from FEEDBACK_APPLY_INTERVAL_SEC."""
+        return cls(interval_sec=float(os.getenv("FEEDBACK_APPLY_INTERVAL_SEC", "5")))
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name="feedback-applier", daemon=True)
+        self._thread.start()
+        print(f"🚀 Repayment feedback applier started (every {self.interval_sec:g}s)")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def trigger(self) -> None:
+        """Apply pending events now instead of waiting for the next interval."""
+        self._wakeup.set()
+
+    def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                result = apply_pending_events(self.batch_size)
+                if result["events"]:
+                    print(
+                        f"✅ Applied {result['events']} repayment events to {result['borrowers']} borrowers, "
+                        f"{result['rescored']} rescored"
+                    )
+            except Exception as e:
+                FEEDBACK_ERRORS.inc()
+                print(f"❌ Error applying repayment feedback: {e}")
+            self._wakeup.wait(self.interval_sec)
+            self._wakeup.clear()
+
+
+_applier: Optional[FeedbackApplier] = None
+
+
+def get_feedback_applier() -> FeedbackApplier:
+    global _applier
+    if _applier is None:
+        _applier = FeedbackApplier.from_env()
+    return _applier
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Append repayment events from a CSV/NDJSON file to the event log.")
+    parser.add_argument("path", help="event file (event_id, borrower_id, feedback, occurred_at)")
+    parser.add_argument("--apply", action="store_true", help="apply pending events after loading")
+    args = parser.parse_args()
+
+    init_db()
+    result = load_event_file(args.path)
+    print(f"📥 {result['appended']} events appended, {result['duplicates']} already logged, {result['failed']} invalid")
+    for error in result["errors"]:
+        print(f"❌ row {error['row']}: {error['error']}")
+    if args.apply:
+        applied = apply_pending_events()
+        print(f"✅ Applied {applied['events']} events to {applied['borrowers']} borrowers, {applied['rescored']} rescored")
+
+
+if __name__ == "__main__":
+    main()
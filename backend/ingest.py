@@ -0,0 +1,270 @@
+import asyncio
+import codecs
+import itertools
+import json
+import uuid
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError, field_validator
+from starlette.concurrency import run_in_threadpool
+
+from backend.audit import get_audit_log
+from backend.database import transaction
+from backend.metrics import observe_stage
+from Data.csv_records import iter_csv_rows
+from LLMs.model_registry import FeatureBatch, ScoringModel
+from LLMs.risk_classifier import classify_risks
+from application_layer.loan_decision_interface import decide_loans
+
+# Rows scored and inserted per transaction
+BATCH_SIZE = 1000
+
+# Parsed CSV records handed from the parsing thread to the event loop at a time
+CSV_RECORDS_PER_HOP = 1000
+
+# Cap on the number of row errors echoed back to the client
+MAX_REPORTED_ERRORS = 1000
+
+
+class BulkBorrowerRow(BaseModel):
+    """One borrower from an upload, same columns as Data/borrowers.csv."""
+    id: Optional[str] = None
+    name: str
+    region: str
+    loan_amount: float
+    base_score: float
+
+    @field_validator("name", "region")
+    @classmethod
+    def not_blank(cls, value: str) -> str:
+        value = value.strip()
+        if not value:
+            raise ValueError("must not be empty")
+        return value
+
+    @field_validator("id")
+    @classmethod
+    def blank_id_is_none(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        return value.strip() or None
+
+    @field_validator("loan_amount")
+    @classmethod
+    def non_negative(cls, value: float) -> float:
+        if value < 0:
+            raise ValueError("must not be negative")
+        return value
+
+
+async def iter_text(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Decode a streamed UTF-8 body chunk by chunk without buffering the whole
+    body. A leading byte order mark (Excel's default for CSV) is dropped.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a streamed UTF-8 body into lines, without line endings."""
+    pending = ""
+    async for text in iter_text(chunks):
+        pending += text
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def _blocking_lines(texts: AsyncIterator[str], loop: asyncio.AbstractEventLoop) -> Iterator[str]:
+    # Runs in a worker thread: fetches decoded text from the event loop, yields lines with their endings
+    pending = ""
+    while True:
+        try:
+            text = asyncio.run_coroutine_threadsafe(texts.__anext__(), loop).result()
+        except StopAsyncIteration:
+            break
+        pending += text
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    if pending:
+        yield pending
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[Optional[List[str]], Optional[str]]]:
+    """
+    Parse a streamed CSV body with one csv.reader, yielding (values, error)
+    per record as Data.csv_records.iter_csv_rows does. The reader needs a
+    blocking line iterator, so it runs in a worker thread that pulls the
+    decoded body from the event loop; records come back CSV_RECORDS_PER_HOP
+    at a time so the hand-off is not paid per row.
+    """
+    loop = asyncio.get_running_loop()
+    rows = iter_csv_rows(_blocking_lines(iter_text(chunks), loop))
+    while True:
+        batch = await run_in_threadpool(lambda: list(itertools.islice(rows, CSV_RECORDS_PER_HOP)))
+        if not batch:
+            return
+        for row in batch:
+            yield row
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Yield (row number, raw record, parse error) for each data row of a CSV or
+    NDJSON upload. Row numbers count data rows from 1; blank lines are skipped.
+    """
+    if fmt == "csv":
+        records = iter_csv_records(chunks)
+    else:
+        records = ((line, None) async for line in iter_lines(chunks) if line.strip())
+
+    header = None
+    row_number = 0
+    async for raw, parse_error in records:
+        if fmt == "csv" and header is None and parse_error is None:
+            header = [h.strip() for h in raw]
+            continue
+
+        row_number += 1
+        try:
+            if parse_error:
+                raise ValueError(parse_error)
+            if fmt == "csv":
+                if len(raw) != len(header):
+                    raise ValueError(f"expected {len(header)} columns, got {len(raw)}")
+                record = dict(zip(header, raw))
+            else:
+                record = json.loads(raw)
+                if not isinstance(record, dict):
+                    raise ValueError("each line must be a JSON object")
+        except ValueError as e:
+            yield row_number, None, str(e)
+            continue
+
+        # The single-row API calls the base score repayment_rate
+        if "base_score" not in record and "repayment_rate" in record:
+            record["base_score"] = record.pop("repayment_rate")
+        yield row_number, record, None
+
+
+def validate_record(record: dict) -> Tuple[Optional[BulkBorrowerRow], Optional[str]]:
+    """Validate one raw record, returning the parsed row or a readable error."""
+    try:
+        return BulkBorrowerRow.model_validate(record), None
+    except ValidationError as e:
+        return None, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+def insert_batch(batch: List[Tuple[int, BulkBorrowerRow]], region_table, policy: dict,
+                 model: ScoringModel) -> Tuple[int, List[Dict]]:
+    """
+    Score a batch of validated rows and insert them in one transaction,
+    then audit each insert as the single-row API does. Rows whose id already
+    exists are reported instead of inserted.
+    """
+    errors = []
+    with observe_stage("db_write"), transaction() as conn:
+        c = conn.cursor()
+        ids = [row.id for _, row in batch]
+        c.execute(f"SELECT id FROM borrowers WHERE id IN ({','.join('?' * len(ids))})", ids)
+        existing = {r[0] for r in c.fetchall()}
+        if existing:
+            errors = [
+                {"row": n, "id": row.id, "error": "borrower id already exists"}
+                for n, row in batch if row.id in existing
+            ]
+            batch = [(n, row) for n, row in batch if row.id not in existing]
+        if not batch:
+            return 0, errors
+
+        rows = [row for _, row in batch]
+        with observe_stage("scoring"):
+            features = FeatureBatch.from_rows([r.base_score for r in rows], [r.region for r in rows], region_table)
+            scores = model.predict(features).tolist()
+            risks = classify_risks(scores).tolist()
+            decisions = decide_loans(risks, policy)
+
+        c.executemany("""
+            INSERT INTO borrowers (id, name, region, loan_amount, base_score, adjusted_score, risk, decision, model_version)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (r.id, r.name, r.region, r.loan_amount, r.base_score, score, risk, decision, model.version)
+            for r, score, risk, decision in zip(rows, scores, risks, decisions)
+        ])
+    audit_log = get_audit_log()
+    for r, decision in zip(rows, decisions):
+        audit_log.record(r.id, "create", decision, reason="bulk upload")
+    return len(batch), errors
+
+
+def assign_id(row: BulkBorrowerRow) -> BulkBorrowerRow:
+    """Give rows uploaded without an id the same kind of id the single-row API generates."""
+    if row.id is None:
+        row.id = str(uuid.uuid4())[:8]
+    return row
+
+
+async def ingest_upload(chunks: AsyncIterator[bytes], fmt: str, region_table, policy: dict,
+                        model: ScoringModel) -> Dict:
+    """
+    Validate, score and insert a streamed CSV/NDJSON upload batch by batch.
+    Database work runs in the threadpool so the event loop keeps serving.
+    """
+    received = inserted = failed = 0
+    errors = []
+    seen_ids = set()
+    batch = []
+
+    def report(error: Dict) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(error)
+
+    async def flush() -> None:
+        nonlocal inserted
+        count, batch_errors = await run_in_threadpool(insert_batch, batch, region_table, policy, model)
+        inserted += count
+        for error in batch_errors:
+            report(error)
+        batch.clear()
+
+    async for row_number, record, parse_error in iter_records(chunks, fmt):
+        received += 1
+        if parse_error:
+            report({"row": row_number, "id": None, "error": parse_error})
+            continue
+        row, error = validate_record(record)
+        if error:
+            report({"row": row_number, "id": record.get("id"), "error": error})
+            continue
+        row = assign_id(row)
+        if row.id in seen_ids:
+            report({"row": row_number, "id": row.id, "error": "duplicate id in upload"})
+            continue
+        seen_ids.add(row.id)
+
+        batch.append((row_number, row))
+        if len(batch) >= BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    errors.sort(key=lambda e: e["row"])
+    return {
+        "received": received,
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors)
+    }
@@ -0,0 +1,131 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+from backend.database import get_connection, transaction
+
+# How long a lease stays valid without renewal; a dead leader is replaced after at most this long
+DEFAULT_LEASE_TTL_SEC = 30.0
+
+
+class LeaderLease:
+    """
+    Time-limited lease on a named role, stored as a row in leader_leases.
+
+    Whoever holds an unexpired lease is the leader. The holder renews it
+    well before it expires; any other process may take it over once it
+    has expired, so a crashed leader is replaced within ttl_sec.
+    """
+
+    def __init__(self, name: str, ttl_sec: float = DEFAULT_LEASE_TTL_SEC, holder: Optional[str] = None):
+        self.name = name
+        self.ttl_sec = ttl_sec
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.expires_at = 0.0
+
+    def try_acquire(self) -> bool:
+        """Take or renew the lease; True if this holder has it now."""
+        now = time.time()
+        with transaction() as conn:
+            conn.execute("""
+                INSERT INTO leader_leases (name, holder, acquired_at, expires_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    holder = excluded.holder,
+                    acquired_at = CASE WHEN leader_leases.holder = excluded.holder
+                                       THEN leader_leases.acquired_at ELSE excluded.acquired_at END,
+                    expires_at = excluded.expires_at
+                WHERE leader_leases.holder = excluded.holder OR leader_leases.expires_at < excluded.acquired_at
+            """, (self.name, self.holder, now, now + self.ttl_sec))
+            holder = conn.execute("SELECT holder FROM leader_leases WHERE name=?", (self.name,)).fetchone()[0]
+        if holder == self.holder:
+            self.expires_at = now + self.ttl_sec
+            return True
+        return False
+
+    def release(self) -> None:
+        """Give the lease up so another process can take over right away."""
+        with transaction() as conn:
+            conn.execute("DELETE FROM leader_leases WHERE name=? AND holder=?", (self.name, self.holder))
+        self.expires_at = 0.0
+
+    @property
+    def held(self) -> bool:
+        return time.time() < self.expires_at
+
+
+def get_lease_status(name: str) -> Optional[Dict]:
+    """Current holder of a lease and seconds until it expires (negative once expired)."""
+    c = get_connection().cursor()
+    c.execute("SELECT holder, acquired_at, expires_at FROM leader_leases WHERE name=?", (name,))
+    row = c.fetchone()
+    if row is None:
+        return None
+    return {
+        "holder": row[0],
+        "held_for_sec": round(time.time() - row[1], 3),
+        "expires_in_sec": round(row[2] - time.time(), 3),
+    }
+
+
+class LeaderElector:
+    """
+    Background thread that competes for a lease every ttl_sec / 3 and calls
+    on_elected when this process wins it and on_demoted when it loses it or
+    stops. Failing to renew (e.g. the database is locked) only demotes once
+    the lease this process already holds has run out.
+    """
+
+    def __init__(self, lease: LeaderLease, on_elected: Callable[[], None], on_demoted: Callable[[], None]):
+        self.lease = lease
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.is_leader = False
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name=f"leader-{self.lease.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop competing; if leader, step down and release the lease."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                acquired = self.lease.try_acquire()
+            except Exception as e:
+                print(f"⚠️ Could not renew {self.lease.name} lease: {e}")
+                acquired = self.lease.held
+            if acquired and not self.is_leader:
+                self.is_leader = True
+                print(f"👑 {self.lease.holder} is now {self.lease.name} leader")
+                self._call(self.on_elected)
+            elif not acquired and self.is_leader:
+                self.is_leader = False
+                print(f"⚠️ {self.lease.holder} lost {self.lease.name} leadership")
+                self._call(self.on_demoted)
+            self._stopping.wait(self.lease.ttl_sec / 3)
+
+        if self.is_leader:
+            self.is_leader = False
+            self._call(self.on_demoted)
+            try:
+                self.lease.release()
+            except Exception as e:
+                print(f"⚠️ Could not release {self.lease.name} lease: {e}")
+
+    def _call(self, callback: Callable[[], None]) -> None:
+        try:
+            callback()
+        except Exception as e:
+            print(f"❌ Error in {self.lease.name} leadership change: {e}")
@@ -1,22 +1,72 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from backend.routes import borrowers
-from backend.database import init_db
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from backend.routes import borrowers, admin, portfolio, feedback, audit, export
+from backend.database import init_db, get_connection
+from backend.scheduler import update_scores_periodically, stop_score_updates, get_scheduler, get_scheduler_status
+from backend.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_PROGRESS, render_metrics
+from backend.feedback import get_feedback_applier
+from backend.audit import get_audit_log
+from backend.writer import get_borrower_writer
+from LLMs.model_registry import get_model_registry
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-import threading
-import time
 import os
 import sys
+import time
 
 
 load_dotenv()
 
-app = FastAPI(title="Liberia Microloan Risk Assessment Tool")
+# Longest shutdown waits for a running rescoring pass to finish its current chunks
+SHUTDOWN_TIMEOUT_SEC = 30
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per-worker startup and shutdown. Every worker serves requests and
+    applies feedback; only the holder of the scheduler lease rescores.
+    """
+    # Initialize database
+    init_db()
+
+    # Load the scoring models once; a misconfigured live or shadow model fails startup
+    registry = get_model_registry()
+    shadow = f", shadow {registry.shadow.version}" if registry.shadow else ""
+    print(f"✅ Scoring with model {registry.live.version}{shadow}")
 
-# Initialize database
-init_db()
+    # Compete for the rescoring scheduler lease
+    update_scores_periodically()
+
+    # Apply logged repayment events in the background
+    get_feedback_applier().start()
+
+    # Group-commit borrower writes from the API
+    get_borrower_writer().start()
+
+    # Write decision audit entries behind the requests that make them
+    get_audit_log().start()
+
+    yield
+
+    get_borrower_writer().stop(SHUTDOWN_TIMEOUT_SEC)
+    stop_score_updates(SHUTDOWN_TIMEOUT_SEC)
+    get_feedback_applier().stop(SHUTDOWN_TIMEOUT_SEC)
+    # Commit every queued audit entry before the process exits
+    if get_audit_log().stop(timeout=SHUTDOWN_TIMEOUT_SEC):
+        print("✅ Decision audit log flushed")
+    else:
+        print(f"❌ {get_audit_log().pending()} decision audit entries could not be written")
+    # Close the pooled LLM connections of this worker's event loop; the client
+    # is only imported once an explanation was requested
+    if "LLMs.llm_client" in sys.modules:
+        from LLMs.llm_client import close_llm_clients
+        await close_llm_clients()
+
+
+app = FastAPI(title="Liberia Microloan Risk Assessment Tool", lifespan=lifespan)
 
 
 app.add_middleware(
@@ -28,87 +78,49 @@ app.add_middleware(
 )
 
 
+def _route_template(request: Request) -> str:
+    """Full route template (e.g. /api/borrowers/{borrower_id}) so metric labels stay low-cardinality"""
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = getattr(route, "path_format", route.path)
+    # Routes of included routers only know their path relative to the router prefix
+    try:
+        rendered = template.format(**{k: str(v) for k, v in request.path_params.items()})
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = request.url.path
+    return path[:len(path) - len(rendered)] + template if path.endswith(rendered) else template
+
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    """Record the latency of every request by method, route template and status"""
+    started = time.perf_counter()
+    HTTP_REQUESTS_IN_PROGRESS.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUESTS_IN_PROGRESS.dec()
+        HTTP_REQUEST_SECONDS.labels(
+            method=request.method, route=_route_template(request), status=status
+        ).observe(time.perf_counter() - started)
+
+
 app.include_router(borrowers.router, prefix="/api/borrowers", tags=["Borrowers"])
+app.include_router(portfolio.router, prefix="/api/portfolio", tags=["Portfolio"])
+app.include_router(feedback.router, prefix="/api/feedback", tags=["Feedback"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+app.include_router(audit.router, prefix="/api/audit", tags=["Audit"])
+app.include_router(export.router, prefix="/api/export", tags=["Export"])
 
 # Serve static files (frontend)
 if os.path.exists("frontend"):
     app.mount("/static", StaticFiles(directory="frontend"), name="static")
 
-# Scheduler function for periodic score updates
-def update_scores_periodically():
-    """
-    Background task to periodically update borrower risk scores
-    """
-    def score_updater():
-        while True:
-            try:
-                from backend.database import get_all_borrowers, connect_db
-                from LLMs.scoring_engine import calculate_risk_score
-                from LLMs.risk_classifier import classify_risk
-                from Data.regional_data import load_regional_data, get_region_stats
-                from application_layer.loan_decision_interface import approve_loan
-                from application_layer.policy_settings import get_default_policy
-                
-                print("🔄 Running periodic score update...")
-                
-                # Load regional data
-                try:
-                    regional_data = load_regional_data("intelligence_layer/regional_data.json")
-                except:
-                    regional_data = {
-                        "Montserrado": {"unemployment_rate": 0.12, "avg_income": 200},
-                        "Bong": {"unemployment_rate": 0.18, "avg_income": 150},
-                        "Nimba": {"unemployment_rate": 0.15, "avg_income": 180}
-                    }
-                
-                # Get all borrowers
-                borrowers = get_all_borrowers()
-                policy = get_default_policy()
-                
-                # Update each borrower's score
-                conn = connect_db()
-                c = conn.cursor()
-                
-                for borrower in borrowers:
-                    if borrower.get('base_score') is not None:
-                        region_data = get_region_stats(borrower['region'], regional_data)
-                        if not region_data:
-                            region_data = {"unemployment_rate": 0.15, "avg_income": 175}
-                        
-                        # Recalculate risk score
-                        new_score = calculate_risk_score(borrower, region_data)
-                        new_risk = classify_risk(new_score)
-                        
-                        # Update decision
-                        is_approved = approve_loan(new_risk, policy)
-                        decision = "Approved" if is_approved else "Rejected"
-                        if new_risk == "Medium" and is_approved:
-                            decision = "Conditional"
-                        
-                        # Update database
-                        c.execute("""
-                            UPDATE borrowers SET adjusted_score=?, risk=?, decision=?
-                            WHERE id=?
-                        """, (new_score, new_risk, decision, borrower['id']))
-                
-                conn.commit()
-                conn.close()
-                print("✅ Score update completed successfully")
-                
-            except Exception as e:
-                print(f"❌ Error in score update: {e}")
-            
-            # Wait 30 minutes before next update
-            time.sleep(1800)
-    
-    # Start the scheduler in a separate thread
-    scheduler_thread = threading.Thread(target=score_updater, daemon=True)
-    scheduler_thread.start()
-    print("🚀 Periodic score updater started")
-
-# Start the scheduler
-update_scores_periodically()
-
 @app.get("/")
 def root():
     """Root endpoint - serve frontend or API info"""
@@ -132,18 +144,45 @@ def dashboard():
         return FileResponse("frontend/index.html")
     else:
         from application_layer.dashboard import render_dashboard
-        from backend.database import get_all_borrowers
+        from backend.portfolio_snapshot import get_portfolio_store
         
-        borrowers = get_all_borrowers()
+        # Shared read-only snapshot instead of one dict per borrower
+        borrowers = get_portfolio_store().snapshot()
         render_dashboard(borrowers)
         return {"message": "Dashboard rendered in console"}
 
+@app.get("/metrics")
+def metrics():
+    """Request, stage, scheduler and database metrics in Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "database": "connected",
+    """Health check endpoint: probes the database and reports rescoring lag"""
+    healthy = True
+    started = time.perf_counter()
+    try:
+        get_connection().execute("SELECT COUNT(*) FROM score_state").fetchone()
+        database = {"status": "connected", "latency_ms": round((time.perf_counter() - started) * 1000, 3)}
+    except Exception as e:
+        healthy = False
+        database = {"status": "error", "error": str(e)}
+
+    try:
+        scheduler = get_scheduler_status(get_scheduler())
+        # No live lease, a dead leader thread or a missed interval means scores are going stale
+        lease = scheduler["lease"]
+        if (lease is None or lease["expires_in_sec"] < 0 or (scheduler["leader"] and not scheduler["alive"])
+                or (scheduler["lag_sec"] or 0) > scheduler["interval_sec"]):
+            healthy = False
+    except Exception as e:
+        healthy = False
+        scheduler = {"error": str(e)}
+
+    return JSONResponse(status_code=200 if healthy else 503, content={
+        "status": "healthy" if healthy else "degraded",
+        "database": database,
+        "scheduler": scheduler,
         "intelligence_layer": "active",
         "application_layer": "active"
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -0,0 +1,252 @@
+import abc
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Unlabelled metrics are exported as 0 before their first update
+            self.labels()
+        REGISTRY.register(self)
+
+    def labels(self, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        # Unlabelled metrics have a single child
+        return self.labels()
+
+    @abc.abstractmethod
+    def _new_child(self):
+        """Per-label-set state, created on first use of those labels."""
+
+    @abc.abstractmethod
+    def samples(self) -> Iterator[str]:
+        """Exposition lines for every child."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self.lock:
+            self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonic counter, e.g. rows rescored or errors."""
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def samples(self) -> Iterator[str]:
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class Gauge(_Metric):
+    """Point-in-time value; with a callback it is computed at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().inc(-amount)
+
+    def samples(self) -> Iterator[str]:
+        if self.callback is not None:
+            try:
+                yield f"{self.name} {_format_value(self.callback())}"
+            except Exception:
+                pass
+            return
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    """Bucketed latency distribution with Prometheus cumulative buckets."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def samples(self) -> Iterator[str]:
+        for key, child in list(self._children.items()):
+            with child.lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, (("le", _format_value(bound)),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics)
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP layer
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to produce the response headers", ("method", "route", "status"))
+HTTP_REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "Requests being handled")
+
+# Stages inside the borrower routes: scoring, db_read, db_write, llm_call, serialization
+STAGE_SECONDS = Histogram("borrower_stage_duration_seconds", "Time spent per request stage", ("stage",))
+
+# Rescoring scheduler
+RESCORE_PASS_SECONDS = Histogram(
+    "rescore_pass_duration_seconds", "Duration of rescoring passes", ("mode",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800))
+RESCORE_ROWS_SCANNED = Counter("rescore_rows_scanned_total", "Borrowers rescored by the scheduler")
+RESCORE_ROWS_UPDATED = Counter("rescore_rows_updated_total", "Borrowers whose score, risk or decision changed")
+RESCORE_FAILED_SHARDS = Counter("rescore_failed_shards_total", "Rescoring shards that raised")
+RESCORE_ERRORS = Counter("rescore_pass_errors_total", "Rescoring passes that failed outright")
+RESCORE_LAST_SUCCESS = Gauge("rescore_last_success_timestamp_seconds", "Unix time the last pass finished without errors")
+SHADOW_ROWS_SCORED = Counter("shadow_model_rows_scored_total", "Borrowers scored by the shadow model during rescoring")
+SHADOW_RISK_CHANGES = Counter("shadow_model_risk_changes_total", "Shadow-scored borrowers whose risk class differs from the live model's")
+SHADOW_MEAN_ABS_DELTA = Gauge("shadow_model_mean_abs_delta", "Mean absolute shadow minus live score in the last pass")
+
+# Repayment feedback applier
+FEEDBACK_EVENTS_APPLIED = Counter("feedback_events_applied_total", "Repayment events applied to scores")
+FEEDBACK_ERRORS = Counter("feedback_apply_errors_total", "Failed repayment feedback apply runs")
+
+# Borrower write queue
+WRITER_QUEUE_DEPTH = Gauge("borrower_writer_queue_depth", "Borrower writes waiting for the writer thread")
+WRITER_BATCH_OPS = Histogram(
+    "borrower_writer_batch_ops", "Borrower writes committed together in one transaction",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512))
+WRITER_COMMIT_SECONDS = Histogram("borrower_writer_commit_seconds", "Time to apply and commit one batch of writes")
+WRITER_OP_ERRORS = Counter("borrower_writer_op_errors_total", "Borrower writes rolled back individually")
+
+# Decision audit log
+AUDIT_QUEUE_DEPTH = Gauge("audit_queue_depth", "Audit entries accepted but not yet committed")
+AUDIT_ENTRIES_WRITTEN = Counter("audit_entries_written_total", "Decision audit entries committed")
+AUDIT_BATCH_SECONDS = Histogram("audit_batch_commit_seconds", "Time to commit one batch of audit entries")
+AUDIT_WRITE_ERRORS = Counter("audit_write_errors_total", "Audit batch commits that failed and were retried")
+
+# SQLite
+DB_CONNECTIONS_OPENED = Counter("db_connections_opened_total", "SQLite connections opened")
+DB_LOCK_WAIT_SECONDS = Histogram(
+    "db_lock_wait_seconds", "Time waiting for the SQLite write lock at the start of a write transaction")
+DB_LOCK_ERRORS = Counter("db_lock_errors_total", "Write transactions that gave up on a locked database")
+
+
+def observe_stage(stage: str):
+    """Context manager timing one stage of a borrower request."""
+    return STAGE_SECONDS.labels(stage=stage).time()
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,218 @@
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from backend.database import connect_db, get_table_version
+
+# Rows fetched per round trip while building a snapshot
+FETCH_SIZE = 10_000
+
+_NUMERIC_COLUMNS = ("loan_amount", "base_score", "feedback_score", "adjusted_score")
+_CATEGORICAL_COLUMNS = ("region", "risk", "decision")
+
+
+class BorrowerRecord:
+    """
+    Read-only view of one snapshot row. Supports attribute access and the
+    dict-style b["risk"] / b.get("risk") used by code written for row dicts.
+    """
+    __slots__ = ("_snapshot", "_row")
+
+    def __init__(self, snapshot: "PortfolioSnapshot", row: int):
+        self._snapshot = snapshot
+        self._row = row
+
+    def __getattr__(self, column: str):
+        if column.startswith("_"):
+            raise AttributeError(column)
+        try:
+            return self._snapshot.value(column, self._row)
+        except KeyError:
+            raise AttributeError(column) from None
+
+    def __getitem__(self, column: str):
+        return self._snapshot.value(column, self._row)
+
+    def get(self, column: str, default=None):
+        try:
+            value = self._snapshot.value(column, self._row)
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def as_dict(self) -> Dict:
+        return {column: self._snapshot.value(column, self._row) for column in PortfolioSnapshot.COLUMNS}
+
+    def __repr__(self) -> str:
+        return f"BorrowerRecord({self.as_dict()!r})"
+
+
+class PortfolioSnapshot:
+    """
+    Immutable, column-oriented copy of the borrowers table.
+
+    Numeric columns are float64 arrays (NaN for NULL), region/risk/decision
+    are int16 codes into small label tuples, and ids map to row positions
+    through a dict. version is the borrowers table write version it was
+    read at.
+    """
+    COLUMNS = ("id", "name", "region", "loan_amount", "base_score", "feedback_score",
+               "adjusted_score", "risk", "decision")
+
+    def __init__(self, version: int, ids: List[str], names: List[str],
+                 numeric: Dict[str, np.ndarray], codes: Dict[str, np.ndarray], labels: Dict[str, tuple]):
+        self.version = version
+        self.built_at = time.time()
+        self.ids = ids
+        self.names = names
+        self.numeric = numeric
+        self.codes = codes
+        self.labels = labels
+        self.index = {borrower_id: row for row, borrower_id in enumerate(ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[BorrowerRecord]:
+        return (BorrowerRecord(self, row) for row in range(len(self.ids)))
+
+    def get(self, borrower_id: str) -> Optional[BorrowerRecord]:
+        row = self.index.get(borrower_id)
+        return BorrowerRecord(self, row) if row is not None else None
+
+    def value(self, column: str, row: int):
+        if column == "id":
+            return self.ids[row]
+        if column == "name":
+            return self.names[row]
+        if column in self.numeric:
+            value = self.numeric[column][row]
+            return None if np.isnan(value) else float(value)
+        if column in self.codes:
+            return self.labels[column][self.codes[column][row]]
+        raise KeyError(column)
+
+    def mask(self, region: Optional[Sequence[str]] = None, risk: Optional[Sequence[str]] = None,
+             decision: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Boolean row mask for the given categorical filters, computed on the codes."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        for column, values in (("region", region), ("risk", risk), ("decision", decision)):
+            if values:
+                values = set(values)
+                wanted = [i for i, label in enumerate(self.labels[column]) if label in values]
+                mask &= np.isin(self.codes[column], wanted)
+        return mask
+
+    def memory_bytes(self) -> int:
+        """Approximate footprint of the arrays, strings and index."""
+        arrays = sum(a.nbytes for a in self.numeric.values()) + sum(a.nbytes for a in self.codes.values())
+        strings = sum(sys.getsizeof(s) for s in self.ids) + sum(sys.getsizeof(s) for s in self.names)
+        containers = sys.getsizeof(self.ids) + sys.getsizeof(self.names) + sys.getsizeof(self.index)
+        return arrays + strings + containers
+
+
+def load_portfolio_snapshot() -> PortfolioSnapshot:
+    """Read the borrowers table into a new snapshot inside one read transaction."""
+    conn = connect_db()
+    try:
+        c = conn.cursor()
+        # One read transaction so the version matches the rows read
+        c.execute("BEGIN")
+        version = get_table_version("borrowers", conn)
+        count = c.execute("SELECT COUNT(*) FROM borrowers").fetchone()[0]
+
+        ids, names = [], []
+        numeric = {column: np.empty(count, dtype=np.float64) for column in _NUMERIC_COLUMNS}
+        codes = {column: np.empty(count, dtype=np.int16) for column in _CATEGORICAL_COLUMNS}
+        lookups = {column: {} for column in _CATEGORICAL_COLUMNS}
+
+        c.execute(f"SELECT id, name, {', '.join(_NUMERIC_COLUMNS + _CATEGORICAL_COLUMNS)} FROM borrowers ORDER BY id")
+        row = 0
+        while True:
+            rows = c.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            end = row + len(rows)
+            columns = list(zip(*rows))
+            ids.extend(columns[0])
+            names.extend(columns[1])
+            for i, column in enumerate(_NUMERIC_COLUMNS, start=2):
+                numeric[column][row:end] = np.array(columns[i], dtype=np.float64)
+            for i, column in enumerate(_CATEGORICAL_COLUMNS, start=2 + len(_NUMERIC_COLUMNS)):
+                lookup = lookups[column]
+                codes[column][row:end] = [lookup.setdefault(v, len(lookup)) for v in columns[i]]
+            row = end
+        conn.commit()
+    finally:
+        conn.close()
+
+    labels = {column: tuple(lookups[column]) for column in _CATEGORICAL_COLUMNS}
+    return PortfolioSnapshot(version, ids, names, numeric, codes, labels)
+
+
+class PortfolioSnapshotStore:
+    """
+    Shared, read-only portfolio snapshot refreshed copy-on-write.
+
+    Readers get the current snapshot reference without locking. At most once
+    per check interval a reader compares its version with the borrowers
+    table write version; when a commit changed the table, a new snapshot is
+    built in a background thread and swapped in when done. Readers keep the
+    previous snapshot meanwhile.
+    """
+
+    def __init__(self, check_interval_sec: float = 1.0):
+        self.check_interval_sec = check_interval_sec
+        self._refresh_lock = threading.Lock()
+        self._next_check = 0.0
+        self._snapshot: Optional[PortfolioSnapshot] = None
+
+    def snapshot(self) -> PortfolioSnapshot:
+        if self._snapshot is None:
+            self.refresh(wait=True)
+        elif time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.check_interval_sec
+            if get_table_version("borrowers") != self._snapshot.version:
+                self.refresh(wait=False)
+        return self._snapshot
+
+    def refresh(self, wait: bool = True) -> None:
+        """
+        Rebuild the snapshot. With wait=False the rebuild runs in a background
+        thread, and is skipped if one is already running.
+        """
+        if not self._refresh_lock.acquire(blocking=wait):
+            return
+        if wait:
+            self._rebuild()
+        else:
+            threading.Thread(target=self._rebuild, name="portfolio-snapshot", daemon=True).start()
+
+    def _rebuild(self) -> None:
+        # Runs holding _refresh_lock, which it releases
+        try:
+            self._snapshot = load_portfolio_snapshot()
+        except Exception as e:
+            print(f"❌ Error refreshing portfolio snapshot: {e}")
+            if self._snapshot is None:
+                raise
+        finally:
+            self._refresh_lock.release()
+
+
+_store: Optional[PortfolioSnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_portfolio_store() -> PortfolioSnapshotStore:
+    """Process-wide portfolio snapshot store."""
+    global _store
+    if _store is not None:
+        return _store
+    with _store_lock:
+        if _store is None:
+            _store = PortfolioSnapshotStore()
+        return _store
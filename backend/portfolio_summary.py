@@ -0,0 +1,104 @@
+import argparse
+from typing import Dict, List, Optional, Sequence
+
+from backend.database import get_connection, transaction, init_db, rebuild_portfolio_summary, SUMMARY_REBUILD_SQL
+
+GROUP_COLUMNS = ("region", "risk", "decision")
+
+# Allowed float drift between the maintained and the recomputed sums
+SUM_TOLERANCE = 1e-6
+
+
+def get_portfolio_summary(group_by: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Borrower counts, loan exposure and mean score per group, read from the
+    trigger-maintained portfolio_summary table (cost grows with the number of
+    groups, not borrowers). group_by picks a subset of region/risk/decision.
+    """
+    group_by = [g for g in GROUP_COLUMNS if g in (group_by or GROUP_COLUMNS)]
+    select = ", ".join(group_by + [
+        "SUM(borrower_count)", "SUM(total_loan)", "SUM(scored_count)", "SUM(score_sum)"
+    ])
+    sql = f"SELECT {select} FROM portfolio_summary"
+    if group_by:
+        sql += f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}"
+
+    c = get_connection().cursor()
+    c.execute(sql)
+    groups = []
+    for row in c.fetchall():
+        count, total_loan, scored, score_sum = row[len(group_by):]
+        if not count:
+            continue
+        group = dict(zip(group_by, row[:len(group_by)]))
+        group.update({
+            "borrowers": count,
+            "total_loan": total_loan,
+            "mean_score": score_sum / scored if scored else None,
+        })
+        groups.append(group)
+
+    return {
+        "group_by": group_by,
+        "groups": groups,
+        "totals": {
+            "borrowers": sum(g["borrowers"] for g in groups),
+            "total_loan": sum(g["total_loan"] for g in groups),
+        }
+    }
+
+
+def check_portfolio_summary(repair: bool = False) -> List[Dict]:
+    """
+    Recompute the summary from the borrowers table and report every group
+    whose maintained values drifted. With repair the table is rebuilt.
+    """
+    with transaction() as conn:
+        c = conn.cursor()
+        c.execute(SUMMARY_REBUILD_SQL)
+        expected = {tuple(r[:3]): r[3:] for r in c.fetchall()}
+        c.execute("""
+            SELECT region, risk, decision, borrower_count, total_loan, scored_count, score_sum
+            FROM portfolio_summary
+        """)
+        actual = {tuple(r[:3]): r[3:] for r in c.fetchall()}
+
+        drift = []
+        for key in sorted(set(expected) | set(actual)):
+            want = expected.get(key, (0, 0.0, 0, 0.0))
+            have = actual.get(key, (0, 0.0, 0, 0.0))
+            counts_match = want[0] == have[0] and want[2] == have[2]
+            sums_match = all(
+                abs(w - h) <= SUM_TOLERANCE * max(1.0, abs(w))
+                for w, h in ((want[1], have[1]), (want[3], have[3]))
+            )
+            if not (counts_match and sums_match):
+                drift.append({
+                    **dict(zip(GROUP_COLUMNS, key)),
+                    "expected": dict(zip(("borrowers", "total_loan", "scored", "score_sum"), want)),
+                    "actual": dict(zip(("borrowers", "total_loan", "scored", "score_sum"), have)),
+                })
+
+        if repair:
+            rebuild_portfolio_summary(c)
+    return drift
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the portfolio summary table against the borrowers table.")
+    parser.add_argument("--repair", action="store_true", help="rebuild the summary from scratch")
+    args = parser.parse_args()
+
+    init_db()
+    drift = check_portfolio_summary(repair=args.repair)
+    if not drift:
+        print("✅ Portfolio summary is consistent")
+    for d in drift:
+        print(f"❌ {d['region']} / {d['risk']} / {d['decision']}: expected {d['expected']}, found {d['actual']}")
+    if drift and args.repair:
+        print("🔧 Portfolio summary rebuilt")
+    raise SystemExit(1 if drift and not args.repair else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from backend.database import get_connection, transaction
+from LLMs.scoring_engine import build_region_table
+from LLMs.model_registry import FeatureBatch, ScoringModel, ShadowStats, get_model_registry
+from LLMs.risk_classifier import classify_risks
+from Data.regional_data import DEFAULT_REGION_STATS, RegionalSnapshot, get_regional_store
+from application_layer.loan_decision_interface import decide_loans
+from application_layer.policy_settings import get_default_policy
+
+# Rows read, scored and written per batch
+CHUNK_SIZE = 1000
+
+# Borrower columns a shard reads to rescore a row; repayment feedback shifts the base score
+ROW_COLUMNS = "id, region, base_score + feedback_score, adjusted_score, risk, decision, decision_override, model_version"
+
+
+def _upper_bound(column: str, hi: Optional[str]) -> Tuple[str, tuple]:
+    # Spelled out rather than "(? IS NULL OR col <= ?)" so SQLite can use it as an index range bound
+    return (f"AND {column} <= ?", (hi,)) if hi is not None else ("", ())
+
+
+class RescorePlan(NamedTuple):
+    """What one pass rescores and which inputs it scores against (picklable for worker processes)."""
+    full: bool
+    high_seq: int
+    regional_data: dict
+    regional_version: str
+    policy: dict
+    policy_version: str
+    model: ScoringModel
+    shadow: Optional[ScoringModel] = None
+
+
+def fingerprint(data) -> str:
+    """Stable content hash used to version regional stats and policies."""
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_scoring_inputs() -> Tuple[RegionalSnapshot, dict]:
+    """Current regional data snapshot and policy the updater scores against."""
+    return get_regional_store().snapshot(), get_default_policy()
+
+
+def _get_state(c, key: str):
+    c.execute("SELECT value FROM score_state WHERE key=?", (key,))
+    row = c.fetchone()
+    return row[0] if row else None
+
+
+def _set_state(c, key: str, value: str) -> None:
+    c.execute("INSERT OR REPLACE INTO score_state (key, value) VALUES (?, ?)", (key, value))
+
+
+def rescore_rows(c, rows: List[tuple], region_table, policy: dict, model: Optional[ScoringModel] = None,
+                 shadow: Optional[ScoringModel] = None, shadow_stats: Optional[ShadowStats] = None) -> int:
+    """
+    Rescore (id, region, base_score, adjusted_score, risk, decision,
+    decision_override, model_version) rows with model (default: the live
+    model) and write back only the ones whose score, risk, decision or model
+    changed. Officer overrides win over the policy decision. A shadow model
+    is scored on the same features and only compared, into shadow_stats.
+    """
+    rows = [r for r in rows if r[2] is not None]
+    if not rows:
+        return 0
+    model = model or get_model_registry().live
+
+    features = FeatureBatch.from_rows([r[2] for r in rows], [r[1] for r in rows], region_table)
+    scores = model.predict(features)
+    risks = classify_risks(scores)
+    if shadow is not None and shadow_stats is not None:
+        shadow_scores = shadow.predict(features)
+        shadow_stats.add(scores, shadow_scores, risks, classify_risks(shadow_scores))
+
+    new_scores = scores.tolist()
+    new_risks = risks.tolist()
+    decisions = [row[6] or decision for row, decision in zip(rows, decide_loans(new_risks, policy))]
+
+    changed = [
+        (score, risk, decision, model.version, row[0])
+        for row, score, risk, decision in zip(rows, new_scores, new_risks, decisions)
+        if (score, risk, decision, model.version) != (row[3], row[4], row[5], row[7])
+    ]
+    if changed:
+        c.executemany("""
+            UPDATE borrowers SET adjusted_score=?, risk=?, decision=?, model_version=?
+            WHERE id=?
+        """, changed)
+    return len(changed)
+
+
+def plan_pass(force_full: bool = False) -> RescorePlan:
+    """
+    Decide between a full and an incremental pass.
+
+    Only borrowers queued by the rescore triggers (new rows, changed base_score
+    or region) are rescored, unless the live scoring model, the regional stats
+    or the policy changed since the last pass, in which case the whole table
+    is. Queue entries added after planning are left for the next pass.
+    """
+    regional, policy = load_scoring_inputs()
+    policy_version = fingerprint(policy)
+    registry = get_model_registry()
+
+    c = get_connection().cursor()
+    c.execute("SELECT COALESCE(MAX(seq), 0) FROM rescore_queue")
+    high_seq = c.fetchone()[0]
+    full = (
+        force_full
+        or _get_state(c, "scoring_version") != registry.live.version
+        or _get_state(c, "regional_version") != regional.digest
+        or _get_state(c, "policy_version") != policy_version
+    )
+    return RescorePlan(full, high_seq, regional.data, regional.digest, policy, policy_version,
+                       registry.live, registry.shadow)
+
+
+def plan_shards(plan: RescorePlan, shard_rows: int) -> List[Tuple[str, Optional[str]]]:
+    """
+    Split the pass into id ranges of about shard_rows borrowers each.
+    A range (lo, hi) covers lo < id <= hi; hi None means unbounded.
+    """
+    c = get_connection().cursor()
+    if plan.full:
+        c.execute("""
+            SELECT id FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY id) AS rn FROM borrowers)
+            WHERE rn % ? = 0
+        """, (shard_rows,))
+    else:
+        c.execute("""
+            SELECT borrower_id FROM (
+                SELECT borrower_id, ROW_NUMBER() OVER (ORDER BY borrower_id) AS rn
+                FROM (SELECT DISTINCT borrower_id FROM rescore_queue WHERE seq <= ?)
+            )
+            WHERE rn % ? = 0
+        """, (plan.high_seq, shard_rows))
+    bounds = [r[0] for r in c.fetchall()]
+    lows = [""] + bounds
+    return list(zip(lows, bounds + [None]))
+
+
+def rescore_shard(plan: RescorePlan, lo: str, hi: Optional[str], chunk_size: int = CHUNK_SIZE,
+                  should_stop: Optional[Callable[[], bool]] = None) -> Dict:
+    """
+    Rescore one id range a chunk at a time, each chunk read and written in
+    its own write transaction so API writes are never blocked for longer
+    than one chunk. Safe to run in a worker process.
+    If should_stop returns True between chunks the shard ends early and its
+    result is marked interrupted. With a shadow model in the plan the result
+    also carries its ShadowStats sums.
+    """
+    started = time.perf_counter()
+    region_table = build_region_table(plan.regional_data, DEFAULT_REGION_STATS)
+    shadow_stats = ShadowStats() if plan.shadow is not None else None
+    c = get_connection().cursor()
+
+    id_bound, id_hi = _upper_bound("id", hi)
+    queue_bound, queue_hi = _upper_bound("borrower_id", hi)
+
+    scanned = updated = 0
+    last_key = lo
+    interrupted = False
+    while True:
+        if should_stop is not None and should_stop():
+            interrupted = True
+            break
+        # Each chunk is read and rewritten under the write lock, so an override or
+        # edit committed meanwhile cannot be overwritten from a stale read. Chunks
+        # already committed stay valid if a later one fails; the rest is retried next pass
+        with transaction():
+            if plan.full:
+                c.execute(f"""
+                    SELECT {ROW_COLUMNS} FROM borrowers
+                    WHERE id > ? {id_bound}
+                    ORDER BY id LIMIT ?
+                """, (last_key, *id_hi, chunk_size))
+                rows = c.fetchall()
+                keys = [r[0] for r in rows]
+            else:
+                c.execute(f"""
+                    SELECT DISTINCT borrower_id FROM rescore_queue
+                    WHERE seq <= ? AND borrower_id > ? {queue_bound}
+                    ORDER BY borrower_id LIMIT ?
+                """, (plan.high_seq, last_key, *queue_hi, chunk_size))
+                keys = [r[0] for r in c.fetchall()]
+                if not keys:
+                    break
+                # Deleted borrowers may still be queued; they simply match no row
+                c.execute(f"""
+                    SELECT {ROW_COLUMNS} FROM borrowers
+                    WHERE id IN ({",".join("?" * len(keys))})
+                """, keys)
+                rows = c.fetchall()
+            if not keys:
+                break
+
+            scanned += len(rows)
+            updated += rescore_rows(c, rows, region_table, plan.policy, plan.model, plan.shadow, shadow_stats)
+        last_key = keys[-1]
+
+    return {
+        "lo": lo,
+        "hi": hi,
+        "rows_scanned": scanned,
+        "rows_updated": updated,
+        "duration_sec": round(time.perf_counter() - started, 3),
+        "interrupted": interrupted,
+        "shadow": shadow_stats.as_dict() if shadow_stats is not None else None,
+    }
+
+
+def finish_pass(plan: RescorePlan, completed_shards: List[Tuple[str, Optional[str]]], all_succeeded: bool) -> None:
+    """
+    Drop the queue entries the completed shards covered. The scoring inputs
+    are only recorded as current once every shard succeeded, so a failed
+    full pass is retried as a full pass.
+    """
+    conn = get_connection()
+    with conn:
+        c = conn.cursor()
+        for lo, hi in completed_shards:
+            bound, bound_hi = _upper_bound("borrower_id", hi)
+            c.execute(f"""
+                DELETE FROM rescore_queue
+                WHERE seq <= ? AND borrower_id > ? {bound}
+            """, (plan.high_seq, lo, *bound_hi))
+        if all_succeeded:
+            _set_state(c, "scoring_version", plan.model.version)
+            _set_state(c, "regional_version", plan.regional_version)
+            _set_state(c, "policy_version", plan.policy_version)
+
+
+def run_score_update(chunk_size: int = CHUNK_SIZE, force_full: bool = False) -> Dict:
+    """
+    Run one rescoring pass in the calling thread and return a summary of the
+    work done. backend.scheduler runs larger passes as parallel shards.
+    """
+    started = time.perf_counter()
+    plan = plan_pass(force_full)
+    shard = rescore_shard(plan, "", None, chunk_size)
+    finish_pass(plan, [("", None)], all_succeeded=True)
+    return {
+        "mode": "full" if plan.full else "incremental",
+        "rows_scanned": shard["rows_scanned"],
+        "rows_updated": shard["rows_updated"],
+        "duration_sec": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,87 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+# Distinct list queries kept serialized in memory
+MAX_ENTRIES = 256
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+class CachedResponse(NamedTuple):
+    """A serialized response body, its gzip form (if worth it) and the strong ETag of the body."""
+    version: int
+    etag: str
+    body: bytes
+    gzip_body: Optional[bytes]
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def gzip_etag(etag: str) -> str:
+    """ETag of the gzip-encoded form of the body tagged etag."""
+    return etag[:-1] + '-gz"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True if an If-None-Match header value lists etag or its gzip form (or
+    is *). Both encodings carry the same content, so either revalidates.
+    """
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or gzip_etag(etag) in candidates
+
+
+class ResponseCache:
+    """
+    LRU of pre-serialized JSON bodies keyed by request parameters.
+
+    Each entry remembers the table write version it was built at; a lookup
+    with a different version is a miss, so any committed write (which bumps
+    the version) invalidates every entry without explicit hooks.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: int) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, version: int, body: bytes) -> CachedResponse:
+        gzip_body = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+        entry = CachedResponse(version, make_etag(body), body, gzip_body)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_list_cache = ResponseCache()
+
+
+def get_list_cache() -> ResponseCache:
+    """Cache for GET /api/borrowers/ pages."""
+    return _list_cache
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Query
+from backend.scheduler import get_scheduler, get_run_history
+from LLMs.model_registry import get_model_registry
+
+router = APIRouter()
+
+@router.post("/rescore")
+def trigger_rescore(full: bool = False):
+    """Start a rescoring pass now (full=true rescores every borrower)"""
+    scheduler = get_scheduler()
+    scheduler.trigger(full=full)
+    return {
+        "message": "Rescoring pass triggered",
+        "full": full,
+        "already_running": scheduler.running
+    }
+
+@router.get("/rescore/runs")
+def rescore_runs(limit: int = Query(20, ge=1, le=500)):
+    """Recent rescoring passes with duration, throughput and per-shard failures"""
+    return get_run_history(limit)
+
+@router.get("/models")
+def scoring_models():
+    """Loaded scoring models and which one is live or in shadow"""
+    return get_model_registry().describe()
@@ -0,0 +1,40 @@
+import base64
+import json
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from backend.audit import get_audit_log, query_audit_log
+
+router = APIRouter()
+
+# Longest a query waits for queued audit entries to be committed
+FLUSH_WAIT_SEC = 1.0
+
+@router.get("/")
+def list_audit_entries(
+    borrower_id: Optional[str] = None,
+    officer: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[float] = Query(None, description="unix time, inclusive"),
+    until: Optional[float] = Query(None, description="unix time, exclusive"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    """
+    Decision audit entries, newest first, by borrower, officer, action and
+    time range. Pass next_cursor back to get the following page.
+    """
+    before = None
+    if cursor:
+        try:
+            before = tuple(json.loads(base64.urlsafe_b64decode(cursor.encode("ascii"))))
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # Entries are written behind the requests that made them; include those still queued
+    get_audit_log().flush(FLUSH_WAIT_SEC)
+    try:
+        rows, position = query_audit_log(borrower_id, officer, action, since, until, before, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading audit log: {str(e)}")
+    next_cursor = base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii") if position else None
+    return {"items": rows, "next_cursor": next_cursor}
@@ -1,17 +1,31 @@
-from backend.database import get_all_borrowers, connect_db
-import requests
-from fastapi import APIRouter, HTTPException
-from LLMs.scoring_engine import calculate_risk_score
+from backend.database import get_borrowers_page, iter_borrowers, get_connection, get_table_version, SORT_COLUMNS
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from LLMs.model_registry import get_model_registry
 from LLMs.risk_classifier import classify_risk
-from Data.regional_data import load_regional_data, get_region_stats
-from LLMs.llm_inferace import get_llm_response
+from Data.regional_data import get_regional_store
+from LLMs.explanation_cache import get_explanation_cache, make_cache_key
 from LLMs.explainability import generate_explanation
-from application_layer.loan_decision_interface import approve_loan
+from application_layer.loan_decision_interface import decide_loan, override_decision
 from application_layer.policy_settings import get_default_policy
-from pydantic import BaseModel
+from backend.ingest import ingest_upload
+from backend.response_cache import get_list_cache, etag_matches, gzip_etag
+from backend.metrics import observe_stage
+from backend.audit import get_audit_log
+from backend.writer import get_borrower_writer
+from backend.changes import (
+    ChangeLogCompacted, DEFAULT_CHANGE_PAGE_SIZE, MAX_CHANGE_PAGE_SIZE, get_change_version, get_changes,
+)
+from backend.search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, search_borrowers
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import asyncio
+import base64
+import json
 import os
 import uuid
-import sys
+import time
 
 # Define the BorrowerInput model
 class BorrowerInput(BaseModel):
@@ -20,6 +34,12 @@ class BorrowerInput(BaseModel):
     loan_amount: float
     repayment_rate: float = 0.9
 
+class OverrideInput(BaseModel):
+    officer: str
+    reason: str
+    # Omit to flip the current approval (Approved/Conditional <-> Rejected)
+    decision: Optional[str] = Field(None, pattern="^(Approved|Conditional|Rejected)$")
+
 class ExplainInput(BaseModel):
     id: str
     name: str
@@ -29,66 +49,216 @@ class ExplainInput(BaseModel):
 
 router = APIRouter()
 
-# Load regional data once at startup
-try:
-    REGIONAL_DATA = load_regional_data("Data/regional_data.json")
-except:
-    # Fallback data if file not found
-    REGIONAL_DATA = {
-        "Montserrado": {"unemployment_rate": 0.12, "avg_income": 200},
-        "Bong": {"unemployment_rate": 0.18, "avg_income": 150},
-        "Nimba": {"unemployment_rate": 0.15, "avg_income": 180}
-    }
+
+# Page size used when the client does not pass a limit
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# How often the change stream checks for new changes, and how long it may stay silent
+CHANGE_STREAM_POLL_SEC = 1.0
+CHANGE_STREAM_HEARTBEAT_SEC = 15.0
+
+def encode_cursor(sort: str, descending: bool, position) -> str:
+    """Opaque cursor for the keyset position (sort value, id) of the last row sent."""
+    payload = json.dumps([sort, descending, position[0], position[1]])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str, sort: str, descending: bool):
+    try:
+        cursor_sort, cursor_desc, value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_sort != sort or cursor_desc != descending:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort order")
+    return value, last_id
 
 @router.get("/")
-def list_borrowers():
-    """Get all borrowers with their risk assessments"""
-    return get_all_borrowers()
+def list_borrowers(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    region: Optional[List[str]] = Query(None),
+    risk: Optional[List[str]] = Query(None),
+    decision: Optional[List[str]] = Query(None),
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    sort: str = "id",
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """
+    Get borrowers with their risk assessments, one keyset page at a time.
+
+    Pass the returned next_cursor back to get the following page. With
+    format=ndjson every matching row is streamed (limit is optional).
+    JSON pages are served from a pre-serialized cache keyed on the borrowers
+    table write version, with a strong ETag for If-None-Match revalidation.
+    """
+    if sort not in SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_COLUMNS)}")
+    descending = order == "desc"
+    query = {
+        "region": region,
+        "risk": risk,
+        "decision": decision,
+        "min_score": min_score,
+        "max_score": max_score,
+        "sort": sort,
+        "descending": descending,
+        "after": decode_cursor(cursor, sort, descending) if cursor else None,
+    }
+
+    if format == "ndjson":
+        lines = (json.dumps(row) + "\n" for row in iter_borrowers(limit=limit, **query))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    cache = get_list_cache()
+    cache_key = (
+        limit or DEFAULT_PAGE_SIZE, cursor, tuple(region or ()), tuple(risk or ()), tuple(decision or ()),
+        min_score, max_score, sort, descending
+    )
+    conn = get_connection()
+    with conn:
+        # Read the version and the page in one read transaction so they match
+        conn.execute("BEGIN")
+        version = get_table_version(conn=conn)
+        entry = cache.get(cache_key, version)
+        if entry is None:
+            with observe_stage("db_read"):
+                rows, position = get_borrowers_page(limit or DEFAULT_PAGE_SIZE, **query)
+            with observe_stage("serialization"):
+                body = json.dumps({
+                    "items": rows,
+                    "next_cursor": encode_cursor(sort, descending, position) if position else None
+                }, separators=(",", ":")).encode("utf-8")
+                entry = cache.put(cache_key, version, body)
+
+    # The gzip body is a different representation, so it gets its own ETag
+    use_gzip = entry.gzip_body is not None and "gzip" in request.headers.get("accept-encoding", "")
+    etag = gzip_etag(entry.etag) if use_gzip else entry.etag
+    # no-cache: browsers keep the body but revalidate it with If-None-Match every time
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(entry.gzip_body, media_type="application/json", headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+@router.get("/changes")
+def list_borrower_changes(
+    since: Optional[int] = Query(None, ge=0),
+    limit: int = Query(DEFAULT_CHANGE_PAGE_SIZE, ge=1, le=MAX_CHANGE_PAGE_SIZE),
+):
+    """
+    Borrowers inserted, updated, rescored or deleted after version since.
+
+    Without since only the current version is returned: load the list after
+    taking it, then poll with since=<version> (or follow /changes/stream) and
+    apply the changes in place. 410 means the log no longer reaches back to
+    since and the list has to be reloaded.
+    """
+    try:
+        if since is None:
+            return {"version": get_change_version(), "changes": [], "has_more": False}
+        return get_changes(since, limit)
+    except ChangeLogCompacted as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading borrower changes: {str(e)}")
+
+@router.get("/changes/stream")
+async def stream_borrower_changes(request: Request, since: Optional[int] = Query(None, ge=0)):
+    """
+    Server-sent events carrying the same deltas as /changes: a "changes"
+    event (id = version) whenever borrowers change, "reset" when the client
+    fell behind the compacted log. Reconnecting browsers resume from
+    Last-Event-ID.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    poll_sec = float(os.getenv("CHANGE_STREAM_POLL_SEC", str(CHANGE_STREAM_POLL_SEC)))
+
+    async def events():
+        version = since if since is not None else await run_in_threadpool(get_change_version)
+        # Tell the client where the stream starts and how long to wait before reconnecting
+        yield f"retry: 3000\nid: {version}\nevent: ready\ndata: {json.dumps({'version': version})}\n\n"
+        idle_since = time.monotonic()
+        while not await request.is_disconnected():
+            try:
+                delta = await run_in_threadpool(get_changes, version, DEFAULT_CHANGE_PAGE_SIZE)
+            except ChangeLogCompacted as e:
+                version = await run_in_threadpool(get_change_version)
+                yield f"id: {version}\nevent: reset\ndata: {json.dumps({'version': version, 'detail': str(e)})}\n\n"
+                continue
+            if delta["changes"]:
+                version = delta["version"]
+                yield f"id: {version}\nevent: changes\ndata: {json.dumps(delta, separators=(',', ':'))}\n\n"
+                idle_since = time.monotonic()
+                if delta["has_more"]:
+                    continue
+            else:
+                version = delta["version"]
+                if time.monotonic() - idle_since >= CHANGE_STREAM_HEARTBEAT_SEC:
+                    # Keeps proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                    idle_since = time.monotonic()
+            await asyncio.sleep(poll_sec)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/search")
+def search_borrower_index(
+    q: str = Query(..., min_length=1, max_length=100),
+    region: Optional[List[str]] = Query(None),
+    risk: Optional[List[str]] = Query(None),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+):
+    """
+    Borrowers whose id starts with q or whose name or region matches it,
+    best matches first; misspelled names still find close matches.
+    truncated means q matched too many borrowers to rank them all.
+    """
+    try:
+        return search_borrowers(q, region=region, risk=risk, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching borrowers: {str(e)}")
 
 @router.post("/")
-def add_borrower(borrower: BorrowerInput):
+async def add_borrower(borrower: BorrowerInput):
     """Add a new borrower and calculate their risk assessment"""
     try:
         # Generate unique ID
         borrower_id = str(uuid.uuid4())[:8]
         
-        # Get regional data
-        region_data = get_region_stats(borrower.region, REGIONAL_DATA)
-        if not region_data:
-            region_data = {"unemployment_rate": 0.15, "avg_income": 175}  # Default values
+        # Get regional data and the live scoring model
+        regional = get_regional_store().snapshot()
+        model = get_model_registry().live
         
-        # Create borrower dict for scoring
-        borrower_dict = {
-            "id": borrower_id,
-            "name": borrower.name,
-            "region": borrower.region,
-            "loan_amount": borrower.loan_amount,
-            "base_score": borrower.repayment_rate  # Use repayment rate as base score
-        }
+        with observe_stage("scoring"):
+            # Calculate risk score using intelligence layer; repayment rate is the base score
+            risk_score = model.score(borrower.repayment_rate, borrower.region, regional.table)
+            risk_classification = classify_risk(risk_score)
+            
+            # Make loan decision using application layer
+            policy = get_default_policy()
+            decision = decide_loan(risk_classification, policy)
         
-        # Calculate risk score using intelligence layer
-        risk_score = calculate_risk_score(borrower_dict, region_data)
-        risk_classification = classify_risk(risk_score)
+        def insert(conn):
+            conn.execute("""
+                INSERT INTO borrowers (id, name, region, loan_amount, base_score, adjusted_score, risk, decision, model_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                borrower_id, borrower.name, borrower.region, borrower.loan_amount,
+                borrower.repayment_rate, risk_score, risk_classification, decision, model.version
+            ))
         
-        # Make loan decision using application layer
-        policy = get_default_policy()
-        is_approved = approve_loan(risk_classification, policy)
-        decision = "Approved" if is_approved else "Rejected"
-        if risk_classification == "Medium" and is_approved:
-            decision = "Conditional"
-        
-        # Save to database
-        conn = connect_db()
-        c = conn.cursor()
-        c.execute("""
-            INSERT INTO borrowers (id, name, region, loan_amount, base_score, adjusted_score, risk, decision)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            borrower_id, borrower.name, borrower.region, borrower.loan_amount,
-            borrower.repayment_rate, risk_score, risk_classification, decision
-        ))
-        conn.commit()
-        conn.close()
+        # Save to database; returns once the writer has committed it
+        with observe_stage("db_write"):
+            await get_borrower_writer().run(insert)
+        get_audit_log().record(borrower_id, "create", decision)
         
         return {
             "message": f"Borrower {borrower.name} added successfully",
@@ -101,48 +271,67 @@ def add_borrower(borrower: BorrowerInput):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error adding borrower: {str(e)}")
 
+@router.post("/bulk")
+async def bulk_add_borrowers(request: Request, format: Optional[str] = Query(None, pattern="^(csv|ndjson)$")):
+    """
+    Add many borrowers from a streamed CSV (Data/borrowers.csv columns) or
+    NDJSON body. Rows are validated as they arrive, scored and inserted in
+    batches; invalid rows are reported back instead of failing the upload.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "json" in content_type else "csv"
+
+    region_table = get_regional_store().snapshot().table
+    try:
+        return await ingest_upload(request.stream(), format, region_table, get_default_policy(),
+                                   get_model_registry().live)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing borrowers: {str(e)}")
+
 @router.put("/{borrower_id}")
-def update_borrower(borrower_id: str, borrower: BorrowerInput):
+async def update_borrower(borrower_id: str, borrower: BorrowerInput):
     """Update an existing borrower and recalculate risk assessment"""
     try:
-        # Get regional data
-        region_data = get_region_stats(borrower.region, REGIONAL_DATA)
-        if not region_data:
-            region_data = {"unemployment_rate": 0.15, "avg_income": 175}
+        # Get regional data and the live scoring model
+        regional = get_regional_store().snapshot()
+        model = get_model_registry().live
         
-        # Create borrower dict for scoring
-        borrower_dict = {
-            "id": borrower_id,
-            "name": borrower.name,
-            "region": borrower.region,
-            "loan_amount": borrower.loan_amount,
-            "base_score": borrower.repayment_rate
-        }
+        # Loan policy
+        policy = get_default_policy()
         
-        # Recalculate risk assessment
-        risk_score = calculate_risk_score(borrower_dict, region_data)
-        risk_classification = classify_risk(risk_score)
+        # Runs on the writer, so the read and the update see no concurrent write
+        def update(conn):
+            c = conn.cursor()
+            
+            # Repayment feedback already applied to this borrower still counts,
+            # and so does an officer's override of the decision
+            c.execute("SELECT feedback_score, decision, decision_override FROM borrowers WHERE id=?", (borrower_id,))
+            row = c.fetchone()
+            feedback_score, previous_decision, decision_override = row or (0.0, None, None)
+            
+            # Recalculate risk assessment
+            with observe_stage("scoring"):
+                risk_score = model.score(borrower.repayment_rate + feedback_score, borrower.region, regional.table)
+                risk_classification = classify_risk(risk_score)
+                decision = decision_override or decide_loan(risk_classification, policy)
+            
+            c.execute("""
+                UPDATE borrowers SET
+                name=?, region=?, loan_amount=?, base_score=?, adjusted_score=?, risk=?, decision=?, model_version=?
+                WHERE id=?
+            """, (
+                borrower.name, borrower.region, borrower.loan_amount,
+                borrower.repayment_rate, risk_score, risk_classification, decision, model.version, borrower_id
+            ))
+            return row is not None, previous_decision, risk_score, risk_classification, decision
         
-        # Make loan decision
-        policy = get_default_policy()
-        is_approved = approve_loan(risk_classification, policy)
-        decision = "Approved" if is_approved else "Rejected"
-        if risk_classification == "Medium" and is_approved:
-            decision = "Conditional"
-        
-        # Update database
-        conn = connect_db()
-        c = conn.cursor()
-        c.execute("""
-            UPDATE borrowers SET
-            name=?, region=?, loan_amount=?, base_score=?, adjusted_score=?, risk=?, decision=?
-            WHERE id=?
-        """, (
-            borrower.name, borrower.region, borrower.loan_amount,
-            borrower.repayment_rate, risk_score, risk_classification, decision, borrower_id
-        ))
-        conn.commit()
-        conn.close()
+        # Update database (db_write includes the scoring done on the writer)
+        with observe_stage("db_write"):
+            existed, previous_decision, risk_score, risk_classification, decision = \
+                await get_borrower_writer().run(update)
+        if existed:
+            get_audit_log().record(borrower_id, "update", decision, previous_decision)
         
         return {
             "message": f"Borrower {borrower_id} updated successfully",
@@ -155,88 +344,197 @@ def update_borrower(borrower_id: str, borrower: BorrowerInput):
         raise HTTPException(status_code=500, detail=f"Error updating borrower: {str(e)}")
 
 @router.delete("/{borrower_id}")
-def delete_borrower(borrower_id: str):
+async def delete_borrower(borrower_id: str):
     """Delete a borrower"""
     try:
-        conn = connect_db()
-        c = conn.cursor()
-        c.execute("DELETE FROM borrowers WHERE id=?", (borrower_id,))
-        conn.commit()
-        conn.close()
+        def delete(conn):
+            return conn.execute("DELETE FROM borrowers WHERE id=? RETURNING decision", (borrower_id,)).fetchone()
+        
+        with observe_stage("db_write"):
+            deleted = await get_borrower_writer().run(delete)
+        if deleted:
+            get_audit_log().record(borrower_id, "delete", previous_decision=deleted[0])
         return {"message": f"Borrower {borrower_id} deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting borrower: {str(e)}")
 
-@router.post("/explain/")
-def explain_borrower_risk(borrower: ExplainInput):
-    """Generate an AI explanation for a borrower's risk assessment"""
+@router.post("/{borrower_id}/override")
+async def override_borrower_decision(borrower_id: str, override: OverrideInput):
+    """
+    Record a loan officer's decision for a borrower. The override sticks
+    through rescoring until cleared, and is written to the audit log.
+    """
     try:
-        # Get regional data
-        region_data = get_region_stats(borrower.region, REGIONAL_DATA)
-        if not region_data:
-            region_data = {"unemployment_rate": 0.15, "avg_income": 175}
-        
-        # Create borrower dict for analysis
-        borrower_dict = {
-            "id": borrower.id,
-            "name": borrower.name,
-            "region": borrower.region,
-            "loan_amount": borrower.loan_amount,
-            "base_score": borrower.repayment_rate
-        }
-        
+        # Runs on the writer, so the read and the update see no concurrent write
+        def apply_override(conn):
+            c = conn.cursor()
+            c.execute("SELECT decision FROM borrowers WHERE id=?", (borrower_id,))
+            row = c.fetchone()
+            if row is None:
+                return None
+            previous_decision = row[0]
+            decision = override.decision
+            if decision is None:
+                record = override_decision(borrower_id, previous_decision in ("Approved", "Conditional"), override.reason)
+                decision = "Approved" if record["override_to"] else "Rejected"
+            c.execute("UPDATE borrowers SET decision=?, decision_override=? WHERE id=?",
+                      (decision, decision, borrower_id))
+            return previous_decision, decision
+
+        with observe_stage("db_write"):
+            result = await get_borrower_writer().run(apply_override)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error overriding decision: {str(e)}")
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Borrower {borrower_id} not found")
+
+    previous_decision, decision = result
+    get_audit_log().record(borrower_id, "override", decision, previous_decision, override.officer, override.reason)
+    return {
+        "message": f"Decision for borrower {borrower_id} overridden",
+        "previous_decision": previous_decision,
+        "decision": decision
+    }
+
+@router.delete("/{borrower_id}/override")
+async def clear_borrower_override(borrower_id: str, officer: str, reason: str):
+    """Drop an officer override; the decision reverts to the loan policy's"""
+    try:
+        policy = get_default_policy()
+
+        def clear_override(conn):
+            c = conn.cursor()
+            c.execute("SELECT decision, risk FROM borrowers WHERE id=?", (borrower_id,))
+            row = c.fetchone()
+            if row is None:
+                return None
+            previous_decision, risk = row
+            decision = decide_loan(risk, policy)
+            c.execute("UPDATE borrowers SET decision=?, decision_override=NULL WHERE id=?", (decision, borrower_id))
+            return previous_decision, decision
+
+        with observe_stage("db_write"):
+            result = await get_borrower_writer().run(clear_override)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error clearing override: {str(e)}")
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Borrower {borrower_id} not found")
+
+    previous_decision, decision = result
+    get_audit_log().record(borrower_id, "clear_override", decision, previous_decision, officer, reason)
+    return {
+        "message": f"Override for borrower {borrower_id} cleared",
+        "previous_decision": previous_decision,
+        "decision": decision
+    }
+
+@router.get("/explain/cache")
+def explanation_cache_stats():
+    """Hit/miss counters and sizes of the explanation cache"""
+    return get_explanation_cache().stats()
+
+async def explain_text(borrower: ExplainInput) -> str:
+    """Score a borrower and return an AI explanation, or the basic one as fallback"""
+    # Get regional data and the live scoring model
+    regional = get_regional_store().snapshot()
+    region_data = regional.stats(borrower.region)
+    model = get_model_registry().live
+    
+    # Create borrower dict for analysis
+    borrower_dict = {
+        "id": borrower.id,
+        "name": borrower.name,
+        "region": borrower.region,
+        "loan_amount": borrower.loan_amount,
+        "base_score": borrower.repayment_rate
+    }
+    
+    with observe_stage("scoring"):
         # Calculate risk score
-        risk_score = calculate_risk_score(borrower_dict, region_data)
+        risk_score = model.score(borrower.repayment_rate, borrower.region, regional.table)
         risk_classification = classify_risk(risk_score)
         
         # Generate basic explanation
         basic_explanation = generate_explanation(borrower_dict, region_data, risk_score, risk_classification)
+    
+    # Try to get AI-enhanced explanation
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    if not groq_api_key:
+        return basic_explanation
+    try:
+        # Deferred: the HTTP client stack is only needed once an explanation is requested
+        from LLMs.llm_inferace import LLM_MODEL
+        from LLMs.llm_client import get_llm_response
         
-        # Try to get AI-enhanced explanation
-        try:
-            groq_api_key = os.getenv("GROQ_API_KEY")
-            if groq_api_key:
-                prompt = f"""
-                Explain why this microloan application received a {risk_classification} risk rating:
-                
-                Borrower: {borrower.name}
-                Region: {borrower.region}
-                Loan Amount: ${borrower.loan_amount}
-                Repayment History Score: {borrower.repayment_rate}
-                Regional Unemployment: {region_data.get('unemployment_rate', 0) * 100:.1f}%
-                Regional Average Income: ${region_data.get('avg_income', 0)}
-                
-                Calculated Risk Score: {risk_score:.3f}
-                Risk Classification: {risk_classification}
-                
-                Provide a clear, concise explanation suitable for loan officers.
-                """
-                
-                ai_explanation = get_llm_response(prompt, groq_api_key)
-                return {
-                    "choices": [{
-                        "message": {
-                            "content": ai_explanation
-                        }
-                    }]
-                }
-            else:
-                return {
-                    "choices": [{
-                        "message": {
-                            "content": basic_explanation
-                        }
-                    }]
-                }
-        except Exception as ai_error:
-            # Fallback to basic explanation if AI fails
-            return {
-                "choices": [{
-                    "message": {
-                        "content": f"{basic_explanation}\n\n(AI explanation unavailable: {str(ai_error)})"
-                    }
-                }]
-            }
-            
+        prompt = f"""
+        Explain why this microloan application received a {risk_classification} risk rating:
+        
+        Borrower: {borrower.name}
+        Region: {borrower.region}
+        Loan Amount: ${borrower.loan_amount}
+        Repayment History Score: {borrower.repayment_rate}
+        Regional Unemployment: {region_data.get('unemployment_rate', 0) * 100:.1f}%
+        Regional Average Income: ${region_data.get('avg_income', 0)}
+        
+        Calculated Risk Score: {risk_score:.3f}
+        Risk Classification: {risk_classification}
+        
+        Provide a clear, concise explanation suitable for loan officers.
+        """
+        
+        # Identical inputs give identical prompts, so reuse earlier answers
+        cache = get_explanation_cache()
+        # Cached explanations are only valid for this scoring model and regional data
+        cache.set_generation(f"{model.version}:{regional.digest}")
+        cache_key = make_cache_key({
+            "name": borrower.name,
+            "region": borrower.region,
+            "loan_amount": borrower.loan_amount,
+            "repayment_rate": borrower.repayment_rate,
+            "unemployment_rate": region_data.get('unemployment_rate', 0),
+            "avg_income": region_data.get('avg_income', 0)
+        }, LLM_MODEL)
+        with observe_stage("llm_call"):
+            return await cache.aget_or_compute(cache_key, lambda: get_llm_response(prompt, groq_api_key))
+    except Exception as ai_error:
+        # Fallback to basic explanation if AI fails
+        return f"{basic_explanation}\n\n(AI explanation unavailable: {str(ai_error)})"
+
+@router.post("/explain/")
+async def explain_borrower_risk(borrower: ExplainInput):
+    """Generate an AI explanation for a borrower's risk assessment"""
+    try:
+        content = await explain_text(borrower)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating explanation: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error generating explanation: {str(e)}")
+    return {
+        "choices": [{
+            "message": {
+                "content": content
+            }
+        }]
+    }
+
+@router.post("/explain/batch")
+async def explain_borrowers_batch(borrowers: List[ExplainInput]):
+    """
+    Explain many borrowers concurrently. Results are streamed as NDJSON lines
+    ({"id", "content"} or {"id", "error"}) in completion order.
+    """
+    async def explain_one(borrower: ExplainInput) -> dict:
+        try:
+            return {"id": borrower.id, "content": await explain_text(borrower)}
+        except Exception as e:
+            return {"id": borrower.id, "error": str(e)}
+
+    async def results():
+        tasks = [asyncio.ensure_future(explain_one(b)) for b in borrowers]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # Client went away: stop the remaining upstream calls
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
@@ -0,0 +1,34 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from frontend.export import EXPORT_FORMATS, MEDIA_TYPES, open_export
+
+router = APIRouter()
+
+# File extension per export format
+EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "columnar": "mlex"}
+
+@router.get("/")
+def export_borrowers(
+    format: str = Query("csv", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    gzip: bool = False,
+    region: Optional[List[str]] = Query(None),
+    risk: Optional[List[str]] = Query(None),
+    decision: Optional[List[str]] = Query(None),
+):
+    """
+    Download the portfolio as CSV, NDJSON or columnar binary, optionally
+    gzipped and filtered by region, risk and decision. The file is one
+    consistent snapshot; X-Change-Version is its borrower change version.
+    """
+    try:
+        version, stream = open_export(format, gzip, region=region, risk=risk, decision=decision)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting borrowers: {str(e)}")
+
+    filename = f"borrowers-{version}.{EXTENSIONS[format]}" + (".gz" if gzip else "")
+    return StreamingResponse(stream, media_type="application/gzip" if gzip else MEDIA_TYPES[format], headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Change-Version": str(version),
+        "Cache-Control": "no-store",
+    })
@@ -0,0 +1,34 @@
+from typing import List
+from fastapi import APIRouter, HTTPException
+from backend.feedback import RepaymentEvent, append_events, apply_pending_events, get_feedback_status, get_feedback_applier
+
+router = APIRouter()
+
+@router.post("/events")
+def add_repayment_events(events: List[RepaymentEvent]):
+    """
+    Append repayment events to the event log. Events whose event_id was
+    already logged are counted as duplicates, so retries are safe. Scores
+    are updated by the background applier shortly afterwards; events for a
+    borrower not added yet wait until it is.
+    """
+    try:
+        result = append_events(events)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error logging repayment events: {str(e)}")
+    if result["appended"]:
+        get_feedback_applier().trigger()
+    return result
+
+@router.post("/apply")
+def apply_repayment_events():
+    """Apply all pending repayment events now"""
+    try:
+        return apply_pending_events()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error applying repayment events: {str(e)}")
+
+@router.get("/status")
+def repayment_feedback_status():
+    """Number and age of events not yet applied"""
+    return get_feedback_status()
@@ -0,0 +1,41 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from backend.portfolio_summary import get_portfolio_summary, GROUP_COLUMNS
+from backend.portfolio_snapshot import get_portfolio_store
+from backend.simulation import SimulationRequest, run_simulation
+
+router = APIRouter()
+
+@router.get("/summary")
+def portfolio_summary(group_by: Optional[List[str]] = Query(None)):
+    """Borrower counts, loan exposure and mean score by region x risk x decision"""
+    unknown = set(group_by or []) - set(GROUP_COLUMNS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"group_by must be among {', '.join(GROUP_COLUMNS)}")
+    return get_portfolio_summary(group_by)
+
+
+@router.get("/snapshot")
+def portfolio_snapshot_info():
+    """Version, size and age of the shared in-memory portfolio snapshot"""
+    snapshot = get_portfolio_store().snapshot()
+    return {
+        "version": snapshot.version,
+        "borrowers": len(snapshot),
+        "memory_bytes": snapshot.memory_bytes(),
+        "built_at": snapshot.built_at,
+    }
+
+
+@router.post("/simulate")
+def simulate_policy(request: SimulationRequest):
+    """
+    What-if evaluation of candidate risk cutoffs and approval policies
+    against the whole portfolio. Read-only: no borrower is rescored.
+    """
+    try:
+        return run_simulation(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running simulation: {str(e)}")
@@ -1,12 +1,361 @@
+import json
+import multiprocessing
+import os
+import threading
 import time
-from threading import Thread
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
 
-def update_scores_periodically(interval_sec=3600):
-    def job():
-        while True:
-            print("⏳ Scheduled score update would run here.")
-            time.sleep(interval_sec)
-    
-    thread = Thread(target=job, daemon=True)
-    thread.start()
+from backend.changes import compact_change_log
+from backend.database import get_connection, transaction
+from backend.leader import LeaderElector, LeaderLease, DEFAULT_LEASE_TTL_SEC, get_lease_status
+from backend.metrics import (
+    RESCORE_PASS_SECONDS, RESCORE_ROWS_SCANNED, RESCORE_ROWS_UPDATED, RESCORE_FAILED_SHARDS, RESCORE_ERRORS,
+    RESCORE_LAST_SUCCESS, SHADOW_ROWS_SCORED, SHADOW_RISK_CHANGES, SHADOW_MEAN_ABS_DELTA,
+)
+from LLMs.model_registry import ShadowStats
+from backend.rescoring import CHUNK_SIZE, plan_pass, plan_shards, rescore_shard, finish_pass
 
+# Borrowers per shard; a pass that fits in one shard runs in the scheduler thread
+DEFAULT_SHARD_ROWS = 50_000
+
+# Lease that decides which worker process runs the scheduler
+SCHEDULER_LEASE = "rescore-scheduler"
+
+# How often the leader looks for passes requested by other workers
+TRIGGER_POLL_SEC = 2.0
+
+# Set in pool worker processes; tells running shards to stop after their current chunk
+_worker_stop = None
+
+
+class RescoreScheduler:
+    """
+    Owns the periodic rescoring job.
+
+    Each pass is split into id-range shards that run on a process pool and
+    commit chunk by chunk. Passes run every interval_sec or when triggered,
+    and every pass is recorded in rescore_runs / rescore_shard_runs.
+    stop() lets a running pass finish its current chunks and records it as
+    interrupted; the rest is picked up by the next pass.
+    """
+
+    def __init__(self, interval_sec: float = 1800, workers: Optional[int] = None,
+                 shard_rows: int = DEFAULT_SHARD_ROWS, chunk_size: int = CHUNK_SIZE):
+        self.interval_sec = interval_sec
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_rows = shard_rows
+        self.chunk_size = chunk_size
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._run_lock = threading.Lock()
+        self._cancel = None
+        self._thread = None
+
+    @classmethod
+    def from_env(cls) -> "RescoreScheduler":
+        """Scheduler configured from RESCORE_INTERVAL_SEC, RESCORE_WORKERS and RESCORE_SHARD_ROWS."""
+        return cls(
+            interval_sec=float(os.getenv("RESCORE_INTERVAL_SEC", "1800")),
+            workers=int(os.getenv("RESCORE_WORKERS", "0")) or None,
+            shard_rows=int(os.getenv("RESCORE_SHARD_ROWS", str(DEFAULT_SHARD_ROWS))),
+        )
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name="rescore-scheduler", daemon=True)
+        self._thread.start()
+        print(f"🚀 Periodic score updater started (every {self.interval_sec:g}s, {self.workers} workers)")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        cancel = self._cancel
+        if cancel is not None:
+            cancel.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._thread is not None and not self._thread.is_alive():
+            print("🛑 Periodic score updater stopped")
+
+    def trigger(self, full: bool = False) -> None:
+        """
+        Ask for a pass now instead of waiting for the next interval. The
+        request is recorded in the database, so it reaches the scheduler
+        whichever worker process handles it.
+        """
+        request_pass(full)
+        self._wakeup.set()
+
+    @property
+    def running(self) -> bool:
+        return self._run_lock.locked()
+
+    @property
+    def alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _loop(self) -> None:
+        trigger = _take_requested_pass() or "startup"
+        while trigger is not None:
+            try:
+                self.run_pass(trigger=trigger, force_full=trigger == "manual-full")
+            except Exception as e:
+                RESCORE_ERRORS.inc()
+                print(f"❌ Error in score update: {e}")
+            # The leader also keeps the borrower change log short
+            try:
+                compact_change_log()
+            except Exception as e:
+                print(f"⚠️ Could not compact borrower change log: {e}")
+            trigger = self._wait_for_next_pass()
+
+    def _wait_for_next_pass(self) -> Optional[str]:
+        """Block until the next pass is due or requested; None once stopping."""
+        deadline = time.monotonic() + self.interval_sec
+        while not self._stopping.is_set():
+            requested = _take_requested_pass()
+            if requested:
+                return requested
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return "schedule"
+            if self._wakeup.wait(min(remaining, TRIGGER_POLL_SEC)):
+                self._wakeup.clear()
+        return None
+
+    def run_pass(self, trigger: str = "manual", force_full: bool = False) -> Dict:
+        """Run one sharded pass now and return its run record."""
+        with self._run_lock:
+            return self._run_pass(trigger, force_full)
+
+    def _run_pass(self, trigger: str, force_full: bool) -> Dict:
+        started_at = time.time()
+        started = time.perf_counter()
+        print("🔄 Running periodic score update...")
+
+        plan = plan_pass(force_full)
+        shards = plan_shards(plan, self.shard_rows)
+        results: List[Dict] = []
+
+        if len(shards) == 1 or self.workers == 1:
+            for lo, hi in shards:
+                results.append(self._run_shard_inline(plan, lo, hi))
+        else:
+            # spawn: never fork a process that runs server threads and open connections
+            context = multiprocessing.get_context("spawn")
+            self._cancel = context.Event()
+            if self._stopping.is_set():
+                self._cancel.set()
+            try:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(shards)), mp_context=context,
+                                         initializer=_init_worker, initargs=(self._cancel,)) as pool:
+                    futures = {
+                        pool.submit(_rescore_shard_in_worker, plan, lo, hi, self.chunk_size): (lo, hi)
+                        for lo, hi in shards
+                    }
+                    for future in as_completed(futures):
+                        lo, hi = futures[future]
+                        try:
+                            results.append(future.result())
+                        except Exception as e:
+                            results.append(_failed_shard(lo, hi, e))
+            finally:
+                self._cancel = None
+
+        failed = [r for r in results if r.get("error")]
+        interrupted = [r for r in results if r.get("interrupted")]
+        completed = [(r["lo"], r["hi"]) for r in results if not r.get("error") and not r.get("interrupted")]
+        finish_pass(plan, completed, all_succeeded=not failed and not interrupted)
+
+        duration = time.perf_counter() - started
+        scanned = sum(r["rows_scanned"] for r in results)
+        run = {
+            "trigger": trigger,
+            "mode": "full" if plan.full else "incremental",
+            "started_at": started_at,
+            "duration_sec": round(duration, 3),
+            "rows_scanned": scanned,
+            "rows_updated": sum(r["rows_updated"] for r in results),
+            "rows_per_sec": round(scanned / duration, 1) if duration > 0 else 0.0,
+            "shard_count": len(shards),
+            "failed_shards": len(failed),
+            "status": (
+                "partial" if 0 < len(failed) < len(shards) else "failed" if failed
+                else "interrupted" if interrupted else "ok"
+            ),
+            "shadow_model": plan.shadow.version if plan.shadow else None,
+            "shadow_stats": None,
+        }
+        if plan.shadow is not None:
+            shadow = ShadowStats.combine(r["shadow"] for r in results if r.get("shadow"))
+            run["shadow_stats"] = shadow.summary()
+        run["id"] = _record_run(run, results)
+
+        RESCORE_PASS_SECONDS.labels(mode=run["mode"]).observe(duration)
+        RESCORE_ROWS_SCANNED.inc(run["rows_scanned"])
+        RESCORE_ROWS_UPDATED.inc(run["rows_updated"])
+        RESCORE_FAILED_SHARDS.inc(len(failed))
+        if run["status"] == "ok":
+            RESCORE_LAST_SUCCESS.set(time.time())
+        if run["shadow_stats"] is not None:
+            SHADOW_ROWS_SCORED.inc(shadow.rows)
+            SHADOW_RISK_CHANGES.inc(shadow.risk_changes)
+            if shadow.rows:
+                SHADOW_MEAN_ABS_DELTA.set(run["shadow_stats"]["mean_abs_delta"])
+
+        icon = "✅" if run["status"] == "ok" else "⚠️"
+        print(
+            f"{icon} Score update {'interrupted' if interrupted else 'completed'} ({run['mode']}): "
+            f"{run['rows_scanned']} rescored, {run['rows_updated']} rows updated in {run['duration_sec']}s "
+            f"across {len(shards)} shards, {len(failed)} failed"
+        )
+        if run["shadow_stats"] is not None:
+            stats = run["shadow_stats"]
+            print(
+                f"🔍 Shadow model {plan.shadow.version} vs {plan.model.version} on {stats['rows']} borrowers: "
+                f"mean delta {stats['mean_delta']}, mean |delta| {stats['mean_abs_delta']}, "
+                f"max |delta| {stats['max_abs_delta']}, {stats['risk_changes']} risk class changes"
+            )
+        return run
+
+    def _run_shard_inline(self, plan, lo, hi) -> Dict:
+        try:
+            return rescore_shard(plan, lo, hi, self.chunk_size, should_stop=self._stopping.is_set)
+        except Exception as e:
+            return _failed_shard(lo, hi, e)
+
+
+def _init_worker(stop_event) -> None:
+    global _worker_stop
+    _worker_stop = stop_event
+
+
+def _rescore_shard_in_worker(plan, lo: str, hi: Optional[str], chunk_size: int) -> Dict:
+    return rescore_shard(plan, lo, hi, chunk_size, should_stop=_worker_stop.is_set)
+
+
+def request_pass(full: bool = False) -> None:
+    """Record a request for a pass; a pending full request is never downgraded."""
+    with transaction() as conn:
+        conn.execute("""
+            INSERT INTO score_state (key, value) VALUES ('requested_pass', ?)
+            ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)
+        """, ("manual-full" if full else "manual",))
+
+
+def _take_requested_pass() -> Optional[str]:
+    try:
+        with transaction() as conn:
+            row = conn.execute("DELETE FROM score_state WHERE key='requested_pass' RETURNING value").fetchone()
+    except Exception as e:
+        print(f"⚠️ Could not read requested rescoring passes: {e}")
+        return None
+    return row[0] if row else None
+
+
+def _failed_shard(lo: str, hi: Optional[str], error: Exception) -> Dict:
+    return {"lo": lo, "hi": hi, "rows_scanned": 0, "rows_updated": 0, "duration_sec": 0.0, "error": repr(error)}
+
+
+def _record_run(run: Dict, shards: List[Dict]) -> int:
+    conn = get_connection()
+    with conn:
+        c = conn.cursor()
+        c.execute("""
+            INSERT INTO rescore_runs (trigger, mode, started_at, duration_sec, rows_scanned, rows_updated,
+                                      rows_per_sec, shard_count, failed_shards, status, shadow_model, shadow_stats)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            run["trigger"], run["mode"], run["started_at"], run["duration_sec"], run["rows_scanned"],
+            run["rows_updated"], run["rows_per_sec"], run["shard_count"], run["failed_shards"], run["status"],
+            run["shadow_model"], json.dumps(run["shadow_stats"]) if run["shadow_stats"] is not None else None
+        ))
+        run_id = c.lastrowid
+        c.executemany("""
+            INSERT INTO rescore_shard_runs (run_id, lo, hi, rows_scanned, rows_updated, duration_sec, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (run_id, s["lo"], s["hi"], s["rows_scanned"], s["rows_updated"], s["duration_sec"],
+             s.get("error") or ("interrupted" if s.get("interrupted") else None))
+            for s in shards
+        ])
+    return run_id
+
+
+def get_run_history(limit: int = 20) -> List[Dict]:
+    """Most recent passes first, each with its per-shard results."""
+    c = get_connection().cursor()
+    columns = ("id", "trigger", "mode", "started_at", "duration_sec", "rows_scanned", "rows_updated",
+               "rows_per_sec", "shard_count", "failed_shards", "status", "shadow_model", "shadow_stats")
+    c.execute(f"SELECT {', '.join(columns)} FROM rescore_runs ORDER BY id DESC LIMIT ?", (limit,))
+    runs = [dict(zip(columns, r)) for r in c.fetchall()]
+    for run in runs:
+        run["shadow_stats"] = json.loads(run["shadow_stats"]) if run["shadow_stats"] else None
+
+    shard_columns = ("lo", "hi", "rows_scanned", "rows_updated", "duration_sec", "error")
+    for run in runs:
+        c.execute(f"SELECT {', '.join(shard_columns)} FROM rescore_shard_runs WHERE run_id=? ORDER BY lo", (run["id"],))
+        run["shards"] = [dict(zip(shard_columns, r)) for r in c.fetchall()]
+    return runs
+
+
+def get_scheduler_status(scheduler: RescoreScheduler) -> Dict:
+    """
+    Liveness of the scheduler and how late it is: lag_sec is how long ago the
+    next pass was due (0 while on schedule), from the last recorded run.
+    leader says whether this process runs the scheduler; lease shows which
+    process does.
+    """
+    c = get_connection().cursor()
+    c.execute("SELECT started_at + duration_sec, status FROM rescore_runs ORDER BY id DESC LIMIT 1")
+    row = c.fetchone()
+    status = {
+        "leader": _elector is not None and _elector.is_leader,
+        "lease": get_lease_status(SCHEDULER_LEASE),
+        "alive": scheduler.alive,
+        "running": scheduler.running,
+        "interval_sec": scheduler.interval_sec,
+        "last_pass_status": row[1] if row else None,
+        "last_pass_age_sec": None,
+        "lag_sec": None,
+    }
+    if row and row[0] is not None:
+        age = max(time.time() - row[0], 0.0)
+        status["last_pass_age_sec"] = round(age, 3)
+        status["lag_sec"] = round(max(age - scheduler.interval_sec, 0.0), 3)
+    return status
+
+
+_scheduler: Optional[RescoreScheduler] = None
+_elector: Optional[LeaderElector] = None
+
+
+def get_scheduler() -> RescoreScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RescoreScheduler.from_env()
+    return _scheduler
+
+
+def update_scores_periodically() -> RescoreScheduler:
+    """
+    Compete for the scheduler lease; the rescoring scheduler runs in
+    whichever worker process holds it (SCHEDULER_LEASE_TTL_SEC) and moves
+    to another one if that process stops or dies.
+    """
+    global _elector
+    scheduler = get_scheduler()
+    if _elector is None:
+        lease = LeaderLease(SCHEDULER_LEASE, ttl_sec=float(os.getenv("SCHEDULER_LEASE_TTL_SEC", str(DEFAULT_LEASE_TTL_SEC))))
+        _elector = LeaderElector(lease, on_elected=scheduler.start, on_demoted=scheduler.stop)
+    _elector.start()
+    return scheduler
+
+
+def stop_score_updates(timeout: Optional[float] = None) -> None:
+    """Step down as scheduler leader, letting a running pass finish its current chunks."""
+    if _elector is not None:
+        _elector.stop(timeout)
@@ -0,0 +1,162 @@
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from backend.database import BORROWER_COLUMNS, get_connection
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 200
+
+# Substring matches fetched and ranked per search; a query matching more is too
+# broad to rank exhaustively and the response says it was truncated
+MATCH_CANDIDATES = 2000
+
+# Rows read per query trigram when looking for misspelled names, and how many of
+# the rows sharing the most trigrams are checked
+FUZZY_POSTINGS = 2000
+FUZZY_CANDIDATES = 500
+
+# Share of the query's trigrams a fuzzy match must contain
+FUZZY_MIN_SIMILARITY = 0.3
+
+_SELECT = f"SELECT {', '.join(f'b.{column}' for column in BORROWER_COLUMNS)}"
+
+
+def trigrams(text: str) -> Set[str]:
+    """Case-folded character trigrams, as the trigram tokenizer of borrowers_fts indexes them."""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _phrase(text: str) -> str:
+    # A quoted string is matched as a substring by the trigram tokenizer
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _like_prefix(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _filters(region: Optional[Sequence[str]], risk: Optional[Sequence[str]]) -> Tuple[str, list]:
+    # The unary + keeps SQLite from answering the search through the region or
+    # risk index, which would scan every borrower in that region
+    where, params = "", []
+    for column, values in (("region", region), ("risk", risk)):
+        if values:
+            where += f" AND +b.{column} IN ({', '.join('?' * len(values))})"
+            params.extend(values)
+    return where, params
+
+
+def _rows(c) -> List[Dict]:
+    return [dict(zip(BORROWER_COLUMNS, r)) for r in c.fetchall()]
+
+
+def _fuzzy_matches(c, words: List[str], filters: Tuple[str, list]) -> List[Dict]:
+    """
+    Borrowers sharing enough trigrams with the query words, best first.
+    Candidates come from the trigrams matching at most FUZZY_POSTINGS rows;
+    common trigrams only count when checking a candidate.
+    """
+    wanted = set().union(*(trigrams(word) for word in words))
+    if not wanted:
+        return []
+    postings = []
+    for trigram in wanted:
+        c.execute("SELECT rowid FROM borrowers_fts WHERE borrowers_fts MATCH ? LIMIT ?",
+                  (_phrase(trigram), FUZZY_POSTINGS + 1))
+        postings.append([r[0] for r in c.fetchall()])
+    # Trigrams found in no row say nothing about candidates
+    postings = [rowids for rowids in postings if rowids]
+    selective = [rowids for rowids in postings if len(rowids) <= FUZZY_POSTINGS] or postings
+    counts = Counter()
+    for rowids in selective:
+        counts.update(rowids[:FUZZY_POSTINGS])
+    candidates = [rowid for rowid, _ in counts.most_common(FUZZY_CANDIDATES)]
+    if not candidates:
+        return []
+
+    where, params = filters
+    c.execute(f"{_SELECT} FROM borrowers b WHERE b.rowid IN ({', '.join('?' * len(candidates))}){where}",
+              candidates + params)
+    scored = []
+    for row in _rows(c):
+        name = trigrams(row["name"] or "")
+        similarity = len(wanted & (name | trigrams(row["region"] or ""))) / len(wanted)
+        if similarity >= FUZZY_MIN_SIMILARITY:
+            # Ties go to the closer name, then the shorter one
+            scored.append((-similarity, -len(wanted & name), len(row["name"] or ""), row["id"], row))
+    scored.sort(key=lambda s: s[:4])
+    return [row for *_, row in scored]
+
+
+def search_borrowers(q: str, region: Optional[Sequence[str]] = None, risk: Optional[Sequence[str]] = None,
+                     limit: int = DEFAULT_SEARCH_LIMIT) -> Dict:
+    """
+    Find borrowers by id prefix, name or region, best matches first:
+    id prefix, exact name, name prefix, then names and regions containing
+    every query word (whole words ranked above parts of words), then fuzzy
+    matches for misspellings. Each item says which kind of match it is.
+    Every step is an index lookup (primary key, name, borrowers_fts), so
+    the cost does not grow with the size of the table.
+    """
+    q = " ".join(q.split())
+    words = q.lower().split()
+    filters = _filters(region, risk)
+    where, params = filters
+    results: Dict[str, Dict] = {}
+    truncated = False
+
+    def add(rows: List[Dict], match: str) -> None:
+        for row in rows:
+            if len(results) >= limit:
+                return
+            if row["id"] not in results:
+                results[row["id"]] = {**row, "match": match}
+
+    if not words:
+        return {"items": [], "truncated": False}
+    c = get_connection().cursor()
+
+    if len(words) == 1:
+        # Upper bound of the prefix range: the prefix with its last character incremented
+        upper = q[:-1] + chr(ord(q[-1]) + 1)
+        c.execute(f"{_SELECT} FROM borrowers b WHERE b.id >= ? AND b.id < ?{where} ORDER BY b.id LIMIT ?",
+                  [q, upper] + params + [limit])
+        add(_rows(c), "id")
+
+    c.execute(f"{_SELECT} FROM borrowers b WHERE b.name = ? COLLATE NOCASE{where} LIMIT ?", [q] + params + [limit])
+    add(_rows(c), "name")
+    c.execute(f"{_SELECT} FROM borrowers b WHERE b.name LIKE ? ESCAPE '\\'{where} ORDER BY b.name COLLATE NOCASE LIMIT ?",
+              [_like_prefix(q)] + params + [limit])
+    add(_rows(c), "prefix")
+
+    # The trigram index only matches words of three or more characters; shorter ones are checked per row
+    indexed = [word for word in words if len(word) >= 3]
+    if indexed and len(results) < limit:
+        match = " AND ".join(_phrase(word) for word in indexed)
+        if region and all(len(r) >= 3 for r in region):
+            # Narrows the index scan when the words are common outside the wanted regions
+            match += " AND (" + " OR ".join(f"region:{_phrase(r)}" for r in region) + ")"
+        # CROSS JOIN keeps the full-text index as the driving table even with filters
+        c.execute(f"""
+            {_SELECT} FROM borrowers_fts f CROSS JOIN borrowers b ON b.rowid = f.rowid
+            WHERE borrowers_fts MATCH ?{where}
+            LIMIT ?
+        """, [match] + params + [MATCH_CANDIDATES + 1])
+        rows = _rows(c)
+        truncated = len(rows) > MATCH_CANDIDATES
+
+        ranked = []
+        for row in rows[:MATCH_CANDIDATES]:
+            text = f"{row['name'] or ''} {row['region'] or ''}".lower()
+            if all(word in text for word in words):
+                text_words = text.split()
+                whole_words = all(any(w.startswith(word) for w in text_words) for word in words)
+                ranked.append((not whole_words, len(row["name"] or ""), row["name"] or "", row["id"], row))
+        ranked.sort(key=lambda r: r[:4])
+        add([row for *_, row in ranked], "contains")
+
+    if indexed and len(results) < limit:
+        add(_fuzzy_matches(c, indexed, filters), "fuzzy")
+
+    return {"items": list(results.values()), "truncated": truncated}
@@ -0,0 +1,200 @@
+import itertools
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from LLMs.risk_classifier import RISK_LEVELS, RISK_THRESHOLDS
+from application_layer.loan_decision_interface import decide_loan
+from application_layer.policy_settings import get_default_policy, adjust_thresholds
+from backend.portfolio_snapshot import PortfolioSnapshot, get_portfolio_store
+
+# Upper bound of the Low and Medium bands, as used by classify_risk
+DEFAULT_THRESHOLDS = dict(zip(RISK_LEVELS[:-1], RISK_THRESHOLDS))
+
+# Cap on scenarios evaluated by one request, sweeps included
+MAX_SCENARIOS = 10_000
+
+# Cap on the values listed per sweep dimension
+MAX_SWEEP_VALUES = 1_000
+
+
+class Scenario(BaseModel):
+    """
+    Candidate cutoffs and approval policy. thresholds holds the upper score
+    bound of the Low and Medium bands ({"Low": 0.4, "Medium": 0.7}); policy
+    maps risk levels to approval. Omitted keys keep their current values.
+    """
+    name: Optional[str] = None
+    thresholds: Dict[str, float] = Field(default_factory=dict)
+    policy: Dict[str, bool] = Field(default_factory=dict)
+
+
+class ScenarioSweep(BaseModel):
+    """Grid of scenarios: every combination of the listed Low/Medium cutoffs and policies."""
+    low: List[float] = Field(default_factory=list, max_length=MAX_SWEEP_VALUES)
+    medium: List[float] = Field(default_factory=list, max_length=MAX_SWEEP_VALUES)
+    policies: List[Dict[str, bool]] = Field(default_factory=list, max_length=MAX_SWEEP_VALUES)
+
+
+class SimulationRequest(BaseModel):
+    scenarios: List[Scenario] = Field(default_factory=list, max_length=MAX_SCENARIOS)
+    sweep: Optional[ScenarioSweep] = None
+    by_region: bool = True
+
+
+class ScoreIndex:
+    """
+    Scored borrowers sorted by adjusted_score within each region, with
+    prefix sums of loan_amount. Band counts and exposure for any cutoffs
+    are two binary searches per region, so a scenario costs
+    O(regions * log n) no matter how many borrowers there are.
+    """
+
+    def __init__(self, snapshot: PortfolioSnapshot):
+        self.version = snapshot.version
+        scores = snapshot.numeric["adjusted_score"]
+        loans = np.nan_to_num(snapshot.numeric["loan_amount"])
+        region_codes = snapshot.codes["region"]
+        scored = ~np.isnan(scores)
+        self.unscored = int((~scored).sum())
+
+        self.regions = []
+        self.scores = []
+        self.exposure = []
+        for code, region in enumerate(snapshot.labels["region"]):
+            rows = scored & (region_codes == code)
+            if not rows.any():
+                continue
+            order = np.argsort(scores[rows], kind="stable")
+            self.regions.append(region)
+            self.scores.append(scores[rows][order])
+            self.exposure.append(np.concatenate(([0.0], np.cumsum(loans[rows][order]))))
+
+    def bands(self, low: float, medium: float) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Per region: borrower count and loan exposure in each risk band."""
+        result = {}
+        for region, scores, exposure in zip(self.regions, self.scores, self.exposure):
+            # classify_risk is score < cutoff, so the cutoff itself falls in the next band
+            edges = [0, *np.searchsorted(scores, (low, medium), side="left"), len(scores)]
+            result[region] = {
+                level: {"count": int(edges[i + 1] - edges[i]),
+                        "exposure": float(exposure[edges[i + 1]] - exposure[edges[i]])}
+                for i, level in enumerate(RISK_LEVELS)
+            }
+        return result
+
+
+def resolve_scenario(scenario: Scenario) -> Dict:
+    """Merge a scenario onto the current cutoffs and policy, validating both."""
+    unknown = set(scenario.thresholds) - set(DEFAULT_THRESHOLDS)
+    if unknown:
+        raise ValueError(f"thresholds keys must be among {', '.join(DEFAULT_THRESHOLDS)}")
+    unknown = set(scenario.policy) - set(RISK_LEVELS)
+    if unknown:
+        raise ValueError(f"policy keys must be among {', '.join(RISK_LEVELS)}")
+    thresholds = adjust_thresholds(dict(DEFAULT_THRESHOLDS), scenario.thresholds)
+    if thresholds["Low"] > thresholds["Medium"]:
+        raise ValueError("Low threshold must not exceed the Medium threshold")
+    policy = {**get_default_policy(), **scenario.policy}
+    return {"name": scenario.name, "thresholds": thresholds, "policy": policy}
+
+
+def _sweep_axes(sweep: ScenarioSweep):
+    return (sweep.low or [DEFAULT_THRESHOLDS["Low"]],
+            sweep.medium or [DEFAULT_THRESHOLDS["Medium"]],
+            sweep.policies or [{}])
+
+
+def sweep_size(sweep: ScenarioSweep) -> int:
+    """Number of combinations in a sweep, inverted cutoffs included; nothing is expanded."""
+    lows, mediums, policies = _sweep_axes(sweep)
+    return len(lows) * len(mediums) * len(policies)
+
+
+def expand_sweep(sweep: ScenarioSweep) -> List[Scenario]:
+    """Every combination of the sweep's cutoffs and policies, skipping inverted cutoffs."""
+    lows, mediums, policies = _sweep_axes(sweep)
+    return [
+        Scenario(thresholds={"Low": low, "Medium": medium}, policy=policy)
+        for low, medium, policy in itertools.product(lows, mediums, policies)
+        if low <= medium
+    ]
+
+
+def evaluate_scenario(index: ScoreIndex, scenario: Dict, by_region: bool = True) -> Dict:
+    """Approvals, rejections and exposure for one resolved scenario."""
+    thresholds, policy = scenario["thresholds"], scenario["policy"]
+    decisions = {level: decide_loan(level, policy) for level in RISK_LEVELS}
+    empty = {"borrowers": 0, "approved": 0, "conditional": 0, "rejected": 0,
+             "approved_exposure": 0.0, "rejected_exposure": 0.0}
+    totals = dict(empty)
+    totals["risk"] = {level: 0 for level in RISK_LEVELS}
+    regions = {}
+    for region, bands in index.bands(thresholds["Low"], thresholds["Medium"]).items():
+        stats = dict(empty)
+        for level, band in bands.items():
+            decision = decisions[level]
+            stats["borrowers"] += band["count"]
+            stats[decision.lower()] += band["count"]
+            stats["rejected_exposure" if decision == "Rejected" else "approved_exposure"] += band["exposure"]
+            totals["risk"][level] += band["count"]
+        for key in empty:
+            totals[key] += stats[key]
+        regions[region] = _with_rates(stats)
+
+    result = {**scenario, "totals": _with_rates(totals)}
+    if by_region:
+        result["regions"] = regions
+    return result
+
+
+def _with_rates(stats: Dict) -> Dict:
+    # Conditional loans are approvals with conditions attached
+    approved = stats["approved"] + stats["conditional"]
+    stats["approval_rate"] = round(approved / stats["borrowers"], 4) if stats["borrowers"] else None
+    stats["approved_exposure"] = round(stats["approved_exposure"], 2)
+    stats["rejected_exposure"] = round(stats["rejected_exposure"], 2)
+    return stats
+
+
+_index: Optional[ScoreIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_score_index() -> ScoreIndex:
+    """Score index for the current portfolio snapshot, rebuilt when the snapshot changes."""
+    global _index
+    snapshot = get_portfolio_store().snapshot()
+    index = _index
+    if index is not None and index.version == snapshot.version:
+        return index
+    with _index_lock:
+        if _index is None or _index.version != snapshot.version:
+            _index = ScoreIndex(snapshot)
+        return _index
+
+
+def run_simulation(request: SimulationRequest) -> Dict:
+    """
+    Evaluate the requested scenarios (plus any sweep) against the whole
+    portfolio. The first result is always the current cutoffs and policy,
+    for comparison. Raises ValueError on an invalid scenario.
+    """
+    # Checked before expanding the sweep, which would otherwise build the whole grid first
+    requested = len(request.scenarios) + (sweep_size(request.sweep) if request.sweep is not None else 0)
+    if requested > MAX_SCENARIOS:
+        raise ValueError(f"at most {MAX_SCENARIOS} scenarios per request")
+    scenarios = list(request.scenarios)
+    if request.sweep is not None:
+        scenarios.extend(expand_sweep(request.sweep))
+    resolved = [resolve_scenario(Scenario(name="current"))]
+    resolved.extend(resolve_scenario(s) for s in scenarios)
+
+    index = get_score_index()
+    return {
+        "version": index.version,
+        "unscored_borrowers": index.unscored,
+        "scenarios": [evaluate_scenario(index, s, request.by_region) for s in resolved],
+    }
@@ -0,0 +1,174 @@
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+from backend.database import connect_db
+from backend.metrics import (
+    DB_LOCK_WAIT_SECONDS, WRITER_QUEUE_DEPTH, WRITER_BATCH_OPS, WRITER_COMMIT_SECONDS, WRITER_OP_ERRORS,
+)
+
+# Most writes applied in one transaction
+DEFAULT_MAX_BATCH = 256
+
+# How long the writer waits for more writes to join a batch that is not yet full. Batches
+# form anyway from writes queued during the previous commit; a small wait only pays off
+# when fsync is slow compared to the request rate
+DEFAULT_MAX_WAIT_SEC = 0.0
+
+# A write is a function run on the writer's connection inside the batch transaction
+WriteFn = Callable[[sqlite3.Connection], Any]
+
+_STOP = object()
+
+
+class BorrowerWriter:
+    """
+    Single writer thread for borrower writes, with group commit.
+
+    Route handlers submit write functions and await their result. The
+    writer takes whatever is queued (up to max_batch, waiting at most
+    max_wait_sec for more) and runs it in one transaction, each write in
+    its own savepoint: a write that raises is rolled back alone and its
+    caller gets the exception, the rest commit together. Results are only
+    delivered after the commit, which is synchronous=FULL by default on
+    this connection since one fsync now covers a whole batch.
+    """
+
+    def __init__(self, max_batch: int = DEFAULT_MAX_BATCH, max_wait_sec: float = DEFAULT_MAX_WAIT_SEC,
+                 synchronous: str = "FULL"):
+        if synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"Unsupported synchronous mode: {synchronous}")
+        self.max_batch = max_batch
+        self.max_wait_sec = max_wait_sec
+        self.synchronous = synchronous.upper()
+        self._queue = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._stopping = False
+        self._thread = None
+
+    @classmethod
+    def from_env(cls) -> "BorrowerWriter":
+        """Writer configured from WRITER_MAX_BATCH, WRITER_MAX_WAIT_MS and WRITER_SYNCHRONOUS."""
+        return cls(
+            max_batch=int(os.getenv("WRITER_MAX_BATCH", str(DEFAULT_MAX_BATCH))),
+            max_wait_sec=float(os.getenv("WRITER_MAX_WAIT_MS", str(DEFAULT_MAX_WAIT_SEC * 1000))) / 1000.0,
+            synchronous=os.getenv("WRITER_SYNCHRONOUS", "FULL"),
+        )
+
+    def start(self) -> None:
+        with self._start_lock:
+            self._stopping = False
+            self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        # Called holding _start_lock
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="borrower-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Commit every write already submitted, then stop the writer thread."""
+        with self._start_lock:
+            self._stopping = True
+            if self._thread is None:
+                return
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def submit(self, fn: WriteFn) -> Future:
+        """Queue a write; the future resolves with its return value once committed."""
+        future = Future()
+        # Under the lock so no write can be queued behind the stop marker
+        with self._start_lock:
+            if self._stopping:
+                raise RuntimeError("Borrower writer is stopped")
+            self._ensure_thread()
+            self._queue.put((fn, future))
+        WRITER_QUEUE_DEPTH.inc()
+        return future
+
+    async def run(self, fn: WriteFn) -> Any:
+        """Submit a write and wait for it to be committed without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def _take_batch(self) -> List:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_sec
+        while len(batch) < self.max_batch and batch[-1] is not _STOP:
+            try:
+                # Already-queued writes never wait; the deadline only bounds waiting for new ones
+                remaining = deadline - time.monotonic()
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        conn = connect_db(check_same_thread=False)
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        try:
+            while True:
+                batch = self._take_batch()
+                stop = batch[-1] is _STOP
+                ops = [op for op in batch if op is not _STOP]
+                if ops:
+                    WRITER_QUEUE_DEPTH.dec(len(ops))
+                    self._commit_batch(conn, ops)
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _commit_batch(self, conn: sqlite3.Connection, ops: List) -> None:
+        done = []
+        started = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            DB_LOCK_WAIT_SECONDS.observe(time.perf_counter() - started)
+            for fn, future in ops:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT borrower_write")
+                try:
+                    result = fn(conn)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO borrower_write")
+                    conn.execute("RELEASE borrower_write")
+                    WRITER_OP_ERRORS.inc()
+                    future.set_exception(e)
+                    continue
+                conn.execute("RELEASE borrower_write")
+                done.append((future, result))
+            conn.commit()
+        except Exception as e:
+            # The whole batch is lost: fail every write that had not failed on its own
+            if conn.in_transaction:
+                conn.rollback()
+            for _, future in ops:
+                if not future.done() and (future.running() or future.set_running_or_notify_cancel()):
+                    future.set_exception(e)
+            return
+        WRITER_COMMIT_SECONDS.observe(time.perf_counter() - started)
+        WRITER_BATCH_OPS.observe(len(ops))
+        for future, result in done:
+            future.set_result(result)
+
+
+_writer: Optional[BorrowerWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_borrower_writer() -> BorrowerWriter:
+    """Process-wide borrower writer."""
+    global _writer
+    if _writer is not None:
+        return _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BorrowerWriter.from_env()
+        return _writer
@@ -0,0 +1,72 @@
+import argparse
+import json
+from typing import Dict, List, Optional
+
+# Allowed slowdown before a metric counts as a regression
+DEFAULT_THRESHOLD = 0.10
+
+
+def metric_direction(name: str) -> Optional[int]:
+    """+1 if higher is better, -1 if lower is better, None if the metric is informational."""
+    if name.endswith("_per_sec"):
+        return 1
+    if name.endswith(("_ms", "_sec")):
+        return -1
+    return None
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Compare every metric present in both result files. Returns one entry per
+    compared metric with its relative change (positive = better) and whether
+    it regressed by more than threshold.
+    """
+    rows = []
+    for bench, metrics in current.get("benchmarks", {}).items():
+        base_metrics = baseline.get("benchmarks", {}).get(bench, {})
+        for name, value in metrics.items():
+            direction = metric_direction(name)
+            base = base_metrics.get(name)
+            if direction is None or not isinstance(base, (int, float)) or not isinstance(value, (int, float)) or base == 0:
+                continue
+            change = (value - base) / abs(base) * direction
+            rows.append({
+                "benchmark": bench,
+                "metric": name,
+                "baseline": base,
+                "current": value,
+                "change": round(change, 4),
+                "regression": change < -threshold,
+            })
+    return rows
+
+
+def print_comparison(rows: List[Dict], threshold: float) -> None:
+    for row in rows:
+        icon = "❌" if row["regression"] else "✅" if row["change"] > threshold else "➖"
+        print(
+            f"{icon} {row['benchmark']:<30} {row['metric']:<18} "
+            f"{row['baseline']:>12.4g} -> {row['current']:>12.4g} ({row['change']:+.1%})"
+        )
+    regressions = sum(r["regression"] for r in rows)
+    print(f"{'❌' if regressions else '✅'} {regressions} regressions over {threshold:.0%} in {len(rows)} metrics")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Flag regressions between two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    rows = compare_results(baseline, current, args.threshold)
+    print_comparison(rows, args.threshold)
+    raise SystemExit(1 if any(r["regression"] for r in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+# Path of the Groq OpenAI-compatible endpoint the stub answers on
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+
+class LLMStubServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the Groq chat-completions endpoint.
+
+    Every request sleeps latency_ms (plus up to jitter_ms) and answers with a
+    canned completion in the same JSON shape; error_rate of the requests get
+    a 429 with Retry-After instead, to exercise the client's retry path.
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 200.0,
+                 jitter_ms: float = 50.0, error_rate: float = 0.0, seed: int = 0):
+        super().__init__((host, port), _StubHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{COMPLETIONS_PATH}"
+
+    def next_response(self):
+        """(delay in seconds, fail?) for the next request."""
+        with self._lock:
+            self.requests += 1
+            fail = self.random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            delay = (self.latency_ms + self.random.uniform(0, self.jitter_ms)) / 1000.0
+        return delay, fail
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != COMPLETIONS_PATH:
+            return self._reply(404, {"error": {"message": "not found"}})
+        try:
+            payload = json.loads(body)
+            prompt = payload["messages"][-1]["content"]
+        except (ValueError, KeyError, IndexError):
+            return self._reply(400, {"error": {"message": "invalid request"}})
+
+        delay, fail = self.server.next_response()
+        time.sleep(delay)
+        if fail:
+            return self._reply(429, {"error": {"message": "rate limited"}}, {"Retry-After": "0.05"})
+        self._reply(200, {
+            "id": f"stub-{self.server.requests}",
+            "object": "chat.completion",
+            "model": payload.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": f"Stub explanation ({len(prompt)} prompt chars)."},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 8}
+        })
+
+    def _reply(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def run_llm_stub(**options) -> Iterator[LLMStubServer]:
+    """Serve an LLMStubServer on a background thread for the duration of the block."""
+    server = LLMStubServer(**options)
+    thread = threading.Thread(target=server.serve_forever, name="llm-stub", daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the Groq chat-completions endpoint.")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = LLMStubServer(port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           error_rate=args.error_rate)
+    print(f"🚀 LLM stub listening on {server.url} (set LLM_API_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+import numpy as np
+
+from benchmarks.compare import DEFAULT_THRESHOLD, compare_results, print_comparison
+from benchmarks.llm_stub import run_llm_stub
+from benchmarks.synthetic import generate_regions, generate_borrower_batches, populate_database
+
+BENCHMARKS = ("scoring", "api", "rescore")
+
+# The scalar scoring loop is slow by design; cap it so 10M-row runs stay practical
+SCALAR_MAX_ROWS = 1_000_000
+
+
+class BenchContext(NamedTuple):
+    scale: int
+    seed: int
+    workdir: str
+    regional_data: Dict
+    requests: int
+    concurrency: int
+    workers: int
+    llm_latency_ms: float
+
+
+def latency_stats(samples: List[float]) -> Dict:
+    """Latency percentiles in milliseconds from durations in seconds."""
+    if not samples:
+        return {}
+    ms = np.array(samples) * 1000.0
+    return {
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+    }
+
+
+def bench_scoring(ctx: BenchContext) -> Dict[str, Dict]:
+    """calculate_risk_score + classify_risk per row, and the batch equivalents."""
+    from Data.regional_data import DEFAULT_REGION_STATS
+    from LLMs.scoring_engine import calculate_risk_score, build_region_table, encode_regions, calculate_risk_scores
+    from LLMs.risk_classifier import classify_risk, classify_risks
+
+    regions = list(ctx.regional_data)
+    scalar_rows = min(ctx.scale, SCALAR_MAX_ROWS)
+    scalar_sec = 0.0
+    for batch in generate_borrower_batches(scalar_rows, regions, ctx.seed):
+        borrowers = [{"id": r[0], "region": r[2], "loan_amount": r[3], "base_score": r[4]} for r in batch]
+        started = time.perf_counter()
+        for b in borrowers:
+            classify_risk(calculate_risk_score(b, ctx.regional_data.get(b["region"], DEFAULT_REGION_STATS)))
+        scalar_sec += time.perf_counter() - started
+
+    table = build_region_table(ctx.regional_data, DEFAULT_REGION_STATS)
+    batch_sec = 0.0
+    for batch in generate_borrower_batches(ctx.scale, regions, ctx.seed):
+        region_names = [r[2] for r in batch]
+        base_scores = [r[4] for r in batch]
+        started = time.perf_counter()
+        classify_risks(calculate_risk_scores(base_scores, encode_regions(region_names, table), table))
+        batch_sec += time.perf_counter() - started
+
+    return {
+        "scoring.scalar": {"rows": scalar_rows, "duration_sec": round(scalar_sec, 4),
+                           "rows_per_sec": round(scalar_rows / scalar_sec, 1)},
+        "scoring.batch": {"rows": ctx.scale, "duration_sec": round(batch_sec, 4),
+                          "rows_per_sec": round(ctx.scale / batch_sec, 1)},
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _load(client, count: int, concurrency: int, make_request: Callable) -> Dict:
+    """Issue count requests with at most concurrency in flight; report throughput and latency."""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples, errors = [], 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await make_request(client, i)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    duration = time.perf_counter() - started
+    return {"requests": count, "errors": errors, "duration_sec": round(duration, 4),
+            "requests_per_sec": round(count / duration, 1), **latency_stats(samples)}
+
+
+def bench_api(ctx: BenchContext) -> Dict[str, Dict]:
+    """CRUD and explain endpoints under concurrent load against a real uvicorn server."""
+    import httpx
+    import uvicorn
+
+    with run_llm_stub(latency_ms=ctx.llm_latency_ms, seed=ctx.seed) as stub:
+        # Read at import time by the LLM modules, so set before the app is imported
+        os.environ["LLM_API_URL"] = stub.url
+        os.environ["GROQ_API_KEY"] = "benchmark"
+        from backend.main import app
+
+        port = _free_port()
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, name="bench-server", daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        regions = list(ctx.regional_data)
+        rng = random.Random(ctx.seed)
+        created: List[str] = []
+
+        def borrower(i: int) -> Dict:
+            return {"name": f"Bench {i}", "region": rng.choice(regions),
+                    "loan_amount": round(rng.uniform(50, 2000), 2), "repayment_rate": round(rng.random(), 4)}
+
+        async def create(client, i):
+            response = await client.post("/api/borrowers/", json=borrower(i))
+            if response.status_code == 200:
+                created.append(response.json()["id"])
+            return response
+
+        async def list_page(client, i):
+            return await client.get("/api/borrowers/", params={"limit": 100, "region": rng.choice(regions)})
+
+        async def update(client, i):
+            return await client.put(f"/api/borrowers/{created[i % len(created)]}", json=borrower(i))
+
+        async def explain(client, i):
+            # Unique names so every call misses the explanation cache and reaches the stub
+            return await client.post("/api/borrowers/explain/", json={"id": f"x{i}", **borrower(i)})
+
+        async def delete(client, i):
+            return await client.delete(f"/api/borrowers/{created[i]}")
+
+        async def run_phases() -> Dict[str, Dict]:
+            results = {}
+            limits = httpx.Limits(max_connections=ctx.concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+                for name, make_request in (("create", create), ("list", list_page), ("update", update),
+                                           ("explain", explain)):
+                    results[f"api.{name}"] = await _load(client, ctx.requests, ctx.concurrency, make_request)
+                results["api.delete"] = await _load(client, len(created), ctx.concurrency, delete)
+            return results
+
+        try:
+            results = asyncio.run(run_phases())
+            results["api.explain"]["llm_requests"] = stub.requests
+        finally:
+            server.should_exit = True
+            thread.join(10)
+    return results
+
+
+def bench_rescore(ctx: BenchContext) -> Dict[str, Dict]:
+    """Full rescoring passes: one with unchanged inputs, one after a regional data change."""
+    from backend.scheduler import RescoreScheduler
+    from Data.regional_data import get_regional_store
+
+    scheduler = RescoreScheduler(workers=ctx.workers)
+    results = {}
+    noop = scheduler.run_pass(trigger="benchmark", force_full=True)
+    results["rescore.full_unchanged"] = {k: noop[k] for k in ("rows_scanned", "rows_updated", "duration_sec",
+                                                               "rows_per_sec", "shard_count")}
+
+    # Shift every region's unemployment so most scores actually change
+    changed = {r: {**s, "unemployment_rate": round(s["unemployment_rate"] + 0.05, 3)}
+               for r, s in ctx.regional_data.items()}
+    with open(os.environ["REGIONAL_DATA_PATH"], "w", encoding="utf-8") as f:
+        json.dump(changed, f, indent=2)
+    get_regional_store().reload(force=True)
+    run = scheduler.run_pass(trigger="benchmark")
+    results["rescore.full_regional_change"] = {k: run[k] for k in ("rows_scanned", "rows_updated", "duration_sec",
+                                                                     "rows_per_sec", "shard_count")}
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the microloan benchmarks on a synthetic portfolio.")
+    parser.add_argument("--scale", type=int, default=10_000, help="synthetic borrowers (1k to 10M)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--regions", type=int, default=15)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--requests", type=int, default=500, help="requests per API phase")
+    parser.add_argument("--concurrency", type=int, default=32, help="API requests in flight")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="rescoring worker processes")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="latency of the LLM stub")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed relative slowdown")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary database directory")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="microloan-bench-")
+    # Everything the app reads from the environment must point at the scratch copy before backend is imported
+    os.environ.update({
+        "MICROLOAN_DB_PATH": os.path.join(workdir, "bench.db"),
+        "REGIONAL_DATA_PATH": os.path.join(workdir, "regional_data.json"),
+        "LLM_CACHE_PATH": os.path.join(workdir, "explanation_cache.db"),
+        "RESCORE_INTERVAL_SEC": "86400",
+    })
+    ctx = BenchContext(
+        scale=args.scale, seed=args.seed, workdir=workdir,
+        regional_data=generate_regions(args.regions, args.seed), requests=args.requests,
+        concurrency=args.concurrency, workers=args.workers, llm_latency_ms=args.llm_latency_ms,
+    )
+
+    try:
+        started = time.perf_counter()
+        populate_database(os.environ["MICROLOAN_DB_PATH"], os.environ["REGIONAL_DATA_PATH"],
+                          ctx.scale, ctx.regional_data, ctx.seed)
+        print(f"📦 Generated {ctx.scale} borrowers in {time.perf_counter() - started:.1f}s ({workdir})")
+
+        results = {}
+        for name in BENCHMARKS:
+            if name not in args.only:
+                continue
+            print(f"⏱️ Running {name} benchmarks...")
+            results.update({"scoring": bench_scoring, "api": bench_api, "rescore": bench_rescore}[name](ctx))
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "scale": args.scale,
+            "seed": args.seed,
+            "regions": args.regions,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "llm_latency_ms": args.llm_latency_ms,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.time(),
+        },
+        "benchmarks": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    for bench, metrics in results.items():
+        print(f"✅ {bench:<28} " + ", ".join(f"{k}={v}" for k, v in metrics.items()))
+    print(f"📝 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("scale") != args.scale:
+            print(f"⚠️ Baseline was recorded at scale {baseline.get('meta', {}).get('scale')}, not {args.scale}")
+        rows = compare_results(baseline, report, args.threshold)
+        print_comparison(rows, args.threshold)
+        raise SystemExit(1 if any(r["regression"] for r in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import csv
+import json
+import os
+import sqlite3
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+# Rows generated and inserted per batch
+BATCH_SIZE = 50_000
+
+# Real counties first so small scales look like production data
+BASE_REGIONS = ["Montserrado", "Bong", "Nimba", "Lofa", "Margibi", "Grand Bassa", "Nimba North", "Maryland"]
+
+
+def generate_regions(count: int = 15, seed: int = 0) -> Dict[str, Dict]:
+    """Regional stats in the Data/regional_data.json format."""
+    rng = np.random.default_rng(seed)
+    names = BASE_REGIONS[:count] + [f"Region {i}" for i in range(len(BASE_REGIONS), count)]
+    return {
+        name: {
+            "unemployment_rate": round(float(rng.uniform(0.05, 0.35)), 3),
+            "avg_income": int(rng.integers(100, 320)),
+        }
+        for name in names
+    }
+
+
+def generate_borrower_batches(count: int, regions: List[str], seed: int = 0,
+                              batch_size: int = BATCH_SIZE) -> Iterator[List[tuple]]:
+    """
+    Yield (id, name, region, loan_amount, base_score) rows in batches.
+    Output depends only on count, regions, seed and batch_size, so every
+    run at the same scale builds the same portfolio.
+    """
+    rng = np.random.default_rng(seed)
+    region_weights = rng.dirichlet(np.ones(len(regions)))
+    for start in range(0, count, batch_size):
+        n = min(batch_size, count - start)
+        region_index = rng.choice(len(regions), size=n, p=region_weights)
+        loan_amounts = np.round(rng.lognormal(mean=6.0, sigma=0.6, size=n), 2)
+        base_scores = np.round(rng.beta(2.0, 3.0, size=n), 4)
+        yield [
+            (f"SYN{start + i:08d}", f"Borrower {start + i}", regions[r], float(amount), float(score))
+            for i, (r, amount, score) in enumerate(zip(region_index, loan_amounts, base_scores))
+        ]
+
+
+def generate_repayment_history(count: int, regions: List[str], groups: int = 1000, seed: int = 0,
+                               batch_size: int = BATCH_SIZE) -> Iterator[List[Dict]]:
+    """
+    Yield group lending history records (group_id, region, repaid, date,
+    loan_amount) in batches, in the format Data.group_lending_history reads.
+    A tenth of the groups default noticeably more often than the rest.
+    """
+    rng = np.random.default_rng(seed + 1)
+    group_region = rng.choice(len(regions), size=groups)
+    group_default_rate = np.where(rng.random(groups) < 0.1, 0.35, 0.08)
+    for start in range(0, count, batch_size):
+        n = min(batch_size, count - start)
+        group = rng.integers(0, groups, size=n)
+        repaid = rng.random(n) >= group_default_rate[group]
+        month = rng.integers(0, 36, size=n)
+        amounts = np.round(rng.lognormal(mean=5.5, sigma=0.5, size=n), 2)
+        yield [
+            {
+                "group_id": f"G{g:05d}",
+                "region": regions[group_region[g]],
+                "repaid": "yes" if ok else "no",
+                "date": f"{2022 + m // 12}-{m % 12 + 1:02d}-15",
+                "loan_amount": float(amount),
+            }
+            for g, ok, m, amount in zip(group, repaid, month, amounts)
+        ]
+
+
+def write_borrowers_csv(path: str, count: int, regions: List[str], seed: int = 0) -> None:
+    """Write a borrowers file with the Data/borrowers.csv columns."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "region", "loan_amount", "base_score"])
+        for batch in generate_borrower_batches(count, regions, seed):
+            writer.writerows(batch)
+
+
+def write_repayment_history(path: str, count: int, regions: List[str], seed: int = 0) -> None:
+    """Write group lending history as NDJSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        for batch in generate_repayment_history(count, regions, seed=seed):
+            f.writelines(json.dumps(record) + "\n" for record in batch)
+
+
+def populate_database(db_path: str, regional_path: str, count: int, regional_data: Dict[str, Dict],
+                      seed: int = 0) -> None:
+    """
+    Write regional_data to regional_path, create the schema in db_path and
+    fill it with count borrowers scored by the same batch path as the bulk
+    import. The table is marked as scored against these inputs, so the
+    server's startup rescoring pass has nothing to do.
+    """
+    os.environ["MICROLOAN_DB_PATH"] = db_path
+    from backend.database import init_db
+    from backend.rescoring import fingerprint
+    from Data.regional_data import RegionalDataStore
+    from LLMs.model_registry import FeatureBatch, get_model_registry
+    from LLMs.risk_classifier import classify_risks
+    from application_layer.loan_decision_interface import decide_loans
+    from application_layer.policy_settings import get_default_policy
+
+    with open(regional_path, "w", encoding="utf-8") as f:
+        json.dump(regional_data, f, indent=2)
+    regional = RegionalDataStore(regional_path).snapshot()
+    policy = get_default_policy()
+    model = get_model_registry().live
+
+    init_db()
+    conn = sqlite3.connect(db_path)
+    try:
+        # The sample rows init_db adds would skew small scales
+        conn.execute("DELETE FROM borrowers")
+        for batch in generate_borrower_batches(count, list(regional_data), seed):
+            features = FeatureBatch.from_rows([r[4] for r in batch], [r[2] for r in batch], regional.table)
+            scores = model.predict(features).tolist()
+            risks = classify_risks(scores).tolist()
+            decisions = decide_loans(risks, policy)
+            conn.executemany("""
+                INSERT INTO borrowers (id, name, region, loan_amount, base_score, adjusted_score, risk, decision, model_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                row + (score, risk, decision, model.version)
+                for row, score, risk, decision in zip(batch, scores, risks, decisions)
+            ])
+            conn.commit()
+        conn.execute("DELETE FROM rescore_queue")
+        conn.executemany("INSERT OR REPLACE INTO score_state (key, value) VALUES (?, ?)", [
+            ("scoring_version", model.version),
+            ("regional_version", regional.digest),
+            ("policy_version", fingerprint(policy)),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
@@ -1,16 +1,46 @@
 // 🔹 1. API base URL
 const API_BASE = "http://127.0.0.1:8000/api/borrowers/";
 
-// 🔹 2. Load all borrowers into the table
+// 🔹 2. Load all borrowers into the table (the API returns one page at a time)
+// Rows by borrower id, so changes can be applied in place
+const borrowerRows = new Map();
+let changeStream = null;
+let summaryTimer = null;
+
 function loadBorrowers() {
-  fetch(API_BASE)
+  loadSummary();
+  if (changeStream) {
+    changeStream.close();
+  }
+  const tbody = document.querySelector("#borrowers-table tbody");
+  tbody.innerHTML = "";
+  borrowerRows.clear();
+  // Take the change version before loading, so nothing changed during the load is missed
+  fetch(API_BASE + "changes")
     .then(res => res.json())
-    .then(data => {
-      const tbody = document.querySelector("#borrowers-table tbody");
-      tbody.innerHTML = "";
-      data.forEach(b => {
-        const row = document.createElement("tr");
-        row.innerHTML = `
+    .then(head => loadBorrowerPage(tbody, null, () => followChanges(head.version)));
+}
+
+function loadBorrowerPage(tbody, cursor, done) {
+  const url = cursor ? `${API_BASE}?cursor=${encodeURIComponent(cursor)}` : API_BASE;
+  fetch(url)
+    .then(res => res.json())
+    .then(page => {
+      page.items.forEach(b => renderBorrower(tbody, b));
+      if (page.next_cursor) {
+        loadBorrowerPage(tbody, page.next_cursor, done);
+      } else {
+        done();
+      }
+    });
+}
+
+// Add a borrower's row, or update the one already shown (leaving fields being edited alone)
+function renderBorrower(tbody, b) {
+  let row = borrowerRows.get(b.id);
+  if (!row) {
+    row = document.createElement("tr");
+    row.innerHTML = `
           <td>${b.id}</td>
           <td><input value="${b.name}" data-id="${b.id}" data-field="name"></td>
           <td><input value="${b.region}" data-id="${b.id}" data-field="region"></td>
@@ -25,6 +55,96 @@ function loadBorrowers() {
 </td>
 
         `;
+    tbody.appendChild(row);
+    borrowerRows.set(b.id, row);
+    return;
+  }
+  row.querySelectorAll("input").forEach(input => {
+    if (input !== document.activeElement) {
+      input.value = b[input.dataset.field];
+    }
+  });
+  row.cells[4].textContent = b.adjusted_score ?? "N/A";
+  row.cells[5].textContent = b.risk ?? "N/A";
+  row.cells[6].textContent = b.decision ?? "N/A";
+}
+
+// 🔹 Live updates: apply borrower changes as the server streams them
+function followChanges(version) {
+  const tbody = document.querySelector("#borrowers-table tbody");
+  changeStream = new EventSource(`${API_BASE}changes/stream?since=${version}`);
+  changeStream.addEventListener("changes", e => {
+    JSON.parse(e.data).changes.forEach(change => {
+      if (change.op === "delete") {
+        const row = borrowerRows.get(change.id);
+        if (row) {
+          row.remove();
+          borrowerRows.delete(change.id);
+        }
+      } else {
+        renderBorrower(tbody, change.borrower);
+      }
+    });
+    // Refresh the summary at most once a second while changes keep coming
+    if (!summaryTimer) {
+      summaryTimer = setTimeout(() => {
+        summaryTimer = null;
+        loadSummary();
+      }, 1000);
+    }
+  });
+  // The server no longer has every change since our version
+  changeStream.addEventListener("reset", () => loadBorrowers());
+}
+
+// 🔹 Portfolio summary by region
+function loadSummary() {
+  fetch("http://127.0.0.1:8000/api/portfolio/summary?group_by=region")
+    .then(res => res.json())
+    .then(summary => {
+      const tbody = document.querySelector("#summary-table tbody");
+      tbody.innerHTML = "";
+      summary.groups.forEach(g => {
+        const row = document.createElement("tr");
+        row.innerHTML = `
+          <td>${g.region}</td>
+          <td>${g.borrowers}</td>
+          <td>${g.total_loan.toFixed(2)}</td>
+          <td>${g.mean_score === null ? "N/A" : g.mean_score.toFixed(3)}</td>
+        `;
+        tbody.appendChild(row);
+      });
+    });
+}
+
+// 🔹 Borrower search, run once typing pauses
+let searchTimer = null;
+
+document.querySelector("#search").addEventListener("input", e => {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(() => searchBorrowers(e.target.value.trim()), 250);
+});
+
+function searchBorrowers(q) {
+  const tbody = document.querySelector("#search-table tbody");
+  if (!q) {
+    tbody.innerHTML = "";
+    return;
+  }
+  fetch(`${API_BASE}search?q=${encodeURIComponent(q)}`)
+    .then(res => res.json())
+    .then(result => {
+      tbody.innerHTML = "";
+      result.items.forEach(b => {
+        const row = document.createElement("tr");
+        row.innerHTML = `
+          <td>${b.id}</td>
+          <td>${b.name}</td>
+          <td>${b.region}</td>
+          <td>${b.risk ?? "N/A"}</td>
+          <td>${b.decision ?? "N/A"}</td>
+          <td>${b.match}</td>
+        `;
         tbody.appendChild(row);
       });
     });
@@ -49,7 +169,6 @@ document.querySelector("#borrowerForm").addEventListener("submit", (e) => {
     .then(res => res.json())
     .then(data => {
       alert(`✅ Borrower added! Risk: ${data.risk}, Decision: ${data.decision}`);
-      loadBorrowers();
     })
     .catch(err => {
       console.error("Error submitting borrower:", err);
@@ -77,7 +196,6 @@ function updateBorrower(id) {
     .then(res => res.json())
     .then(() => {
       alert("✅ Borrower updated!");
-      loadBorrowers();
     });
 }
 
@@ -108,7 +226,6 @@ function deleteBorrower(id) {
       .then(res => res.json())
       .then(() => {
         alert("🗑️ Borrower deleted.");
-        loadBorrowers();
       });
   }
 }
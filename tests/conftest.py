@@ -0,0 +1,25 @@
+import pytest
+
+from backend.database import close_connection, init_db, transaction
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A migrated database in tmp_path without borrowers, used through the thread's shared connection."""
+    monkeypatch.setenv("MICROLOAN_DB_PATH", str(tmp_path / "test.db"))
+    close_connection()
+    init_db()
+    # Drop the sample borrowers init_db seeds
+    with transaction() as conn:
+        conn.execute("DELETE FROM borrowers")
+    yield
+    close_connection()
+
+
+def add_borrowers(rows):
+    """Insert (id, name, region, loan_amount, base_score, adjusted_score, risk, decision) rows."""
+    with transaction() as conn:
+        conn.executemany("""
+            INSERT INTO borrowers (id, name, region, loan_amount, base_score, adjusted_score, risk, decision)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
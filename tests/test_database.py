@@ -0,0 +1,58 @@
+import pytest
+
+from backend.database import SORT_COLUMNS, build_borrower_query, get_borrowers_page, get_connection
+from conftest import add_borrowers
+
+# Ties and NULLs in every sort column, so pages have to break on the id tie-breaker
+ROWS = [
+    (f"b{i:02d}", [None, "Ama", "Kofi"][i % 3], ["Bong", "Lofa", None][i % 3 - 1],
+     [None, 100.0, 250.0, 100.0][i % 4], 0.5, [0.2, None, 0.55, 0.2, 0.9][i % 5], "Low", "Approved")
+    for i in range(23)
+]
+
+
+def walk_pages(page_size, **query):
+    rows, after = [], None
+    while True:
+        page, after = get_borrowers_page(page_size, after=after, **query)
+        rows.extend(r["id"] for r in page)
+        if after is None:
+            return rows
+
+
+def all_in_order(**query):
+    sql, params = build_borrower_query(**query)
+    return [r[0] for r in get_connection().execute(sql, params).fetchall()]
+
+
+@pytest.mark.parametrize("sort", SORT_COLUMNS)
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("page_size", [1, 2, 3, 23, 24])
+def test_keyset_pages_cover_every_row_once_in_order(db, sort, descending, page_size):
+    add_borrowers(ROWS)
+    expected = all_in_order(sort=sort, descending=descending)
+    assert sorted(expected) == sorted(r[0] for r in ROWS)
+    assert walk_pages(page_size, sort=sort, descending=descending) == expected
+
+
+def test_nulls_sort_first_ascending_and_last_descending(db):
+    add_borrowers(ROWS)
+    ascending = all_in_order(sort="adjusted_score")
+    descending = all_in_order(sort="adjusted_score", descending=True)
+    nulls = sorted(r[0] for r in ROWS if r[5] is None)
+    assert ascending[:len(nulls)] == nulls
+    assert descending[-len(nulls):] == nulls[::-1]
+
+
+def test_keyset_pages_respect_filters(db):
+    add_borrowers(ROWS)
+    query = {"sort": "loan_amount", "region": ["Bong", "Lofa"], "min_score": 0.2}
+    expected = all_in_order(**query)
+    assert expected and len(expected) < len(ROWS)
+    assert walk_pages(2, **query) == expected
+
+
+def test_page_ending_on_the_last_row_has_no_next_position(db):
+    add_borrowers(ROWS[:4])
+    page, after = get_borrowers_page(4, sort="name")
+    assert len(page) == 4 and after is None
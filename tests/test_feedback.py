@@ -0,0 +1,46 @@
+from backend.database import get_connection
+from backend.feedback import RepaymentEvent, append_events, apply_pending_batch, apply_pending_events
+from conftest import add_borrowers
+
+
+def feedback_scores():
+    return dict(get_connection().execute("SELECT id, feedback_score FROM borrowers ORDER BY id").fetchall())
+
+
+def event(event_id, borrower_id, feedback):
+    return RepaymentEvent(event_id=event_id, borrower_id=borrower_id, feedback=feedback)
+
+
+def test_events_are_applied_once(db):
+    add_borrowers([("b1", "Ama", "Bong", 100, 0.3, None, None, None), ("b2", "Kofi", "Lofa", 100, 0.5, None, None, None)])
+    append_events([event("e1", "b1", 0.1), event("e2", "b1", 0.05), event("e3", "b2", -0.2)])
+
+    first = apply_pending_batch()
+    assert first["events"] == 3 and first["borrowers"] == 2
+    scores = feedback_scores()
+    assert round(scores["b1"], 9) == 0.15 and round(scores["b2"], 9) == -0.2
+
+    # A second run and a resubmitted event change nothing
+    assert apply_pending_batch()["events"] == 0
+    assert append_events([event("e1", "b1", 0.1)])["duplicates"] == 1
+    assert apply_pending_batch()["events"] == 0
+    assert feedback_scores() == scores
+
+
+def test_batches_do_not_overlap(db):
+    add_borrowers([("b1", "Ama", "Bong", 100, 0.3, None, None, None)])
+    append_events([event(f"e{i}", "b1", 0.01) for i in range(7)])
+
+    assert apply_pending_events(batch_size=3)["events"] == 7
+    assert round(feedback_scores()["b1"], 9) == 0.07
+
+
+def test_events_for_unknown_borrowers_wait_for_the_borrower(db):
+    add_borrowers([("b1", "Ama", "Bong", 100, 0.3, None, None, None)])
+    append_events([event("e1", "b1", 0.1), event("e2", "later", 0.2)])
+
+    assert apply_pending_batch()["events"] == 1
+    add_borrowers([("later", "Kofi", "Lofa", 100, 0.5, None, None, None)])
+    assert apply_pending_batch()["events"] == 1
+    assert round(feedback_scores()["later"], 9) == 0.2
+    assert apply_pending_batch()["events"] == 0
@@ -0,0 +1,31 @@
+from Data.group_lending_history import GroupHistoryCache
+
+HEADER = "group_id,region,repaid,date,loan_amount\n"
+
+
+def test_stray_quote_does_not_stall_later_syncs(tmp_path):
+    source = tmp_path / "history.csv"
+    source.write_text(HEADER + "g1,Bong,yes,2024-01-05,100.01\n")
+    cache = GroupHistoryCache(str(tmp_path / "cache"))
+    assert cache.sync(str(source)) == 1
+
+    with open(source, "a") as f:
+        f.write('g2,Bo"ng,no,2024-02-01,1\ng3,Nimba,yes,2024-02-02,2\n')
+    assert cache.sync(str(source)) == 2
+    with open(source, "a") as f:
+        f.write("g4,Lofa,no,2024-03-01,3\n")
+    assert cache.sync(str(source)) == 1
+    assert cache.manifest["groups"] == ["g1", "g2", "g3", "g4"]
+    assert cache.manifest["regions"] == ["Bong", 'Bo"ng', "Nimba", "Lofa"]
+
+
+def test_open_quoted_field_waits_for_the_rest_of_the_record(tmp_path):
+    source = tmp_path / "history.csv"
+    source.write_text(HEADER + 'g1,"Grand\n')
+    cache = GroupHistoryCache(str(tmp_path / "cache"))
+    assert cache.sync(str(source)) == 0
+
+    with open(source, "a") as f:
+        f.write('Bassa",yes,2024-01-05,100.01\n')
+    assert cache.sync(str(source)) == 1
+    assert cache.manifest["regions"] == ["Grand\nBassa"]
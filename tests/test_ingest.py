@@ -0,0 +1,57 @@
+import asyncio
+
+from backend.ingest import iter_records
+
+HEADER = "name,region,loan_amount,base_score\n"
+
+
+async def _chunks(body: bytes, size: int):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+def parse(body: str, fmt: str = "csv", chunk_size: int = 7):
+    async def collect():
+        return [r async for r in iter_records(_chunks(body.encode("utf-8"), chunk_size), fmt)]
+    return asyncio.run(collect())
+
+
+def test_stray_quote_in_unquoted_field_does_not_swallow_later_rows():
+    rows = parse(HEADER + 'B1,Bong,1,0.5\nMary O"Neil,Bong,2,0.5\nB3,Nimba,3,0.5\nB4,Lofa,4,0.5\n')
+    assert [(n, record["name"], error) for n, record, error in rows] == [
+        (1, "B1", None), (2, 'Mary O"Neil', None), (3, "B3", None), (4, "B4", None),
+    ]
+
+
+def test_unterminated_final_record_is_reported():
+    rows = parse(HEADER + 'B1,Bong,1,0.5\n"B2,Bong,2,0.5\n')
+    assert rows[0][1]["name"] == "B1"
+    assert rows[1] == (2, None, "unterminated quoted field at end of input")
+
+
+def test_quoted_fields_keep_embedded_quotes_commas_and_newlines():
+    body = HEADER + '"Ama ""Ma"" Kollie",Bong,1,0.5\r\n"Kofi, Jr.\nline two",Lofa,2,0.5\r\n'
+    rows = parse(body, chunk_size=3)
+    assert [(n, record["name"], error) for n, record, error in rows] == [
+        (1, 'Ama "Ma" Kollie', None), (2, "Kofi, Jr.\nline two", None),
+    ]
+
+
+def test_bom_and_final_record_without_line_ending():
+    rows = parse("\ufeff" + HEADER + "B1,Bong,1,0.5\nB2,Lofa,2,0.5")
+    assert [(n, record["name"], record["loan_amount"]) for n, record, _ in rows] == [(1, "B1", "1"), (2, "B2", "2")]
+
+
+def test_short_record_is_reported_and_parsing_continues():
+    rows = parse(HEADER + "B1,Bong\n\nB2,Lofa,2,0.5\n")
+    assert rows == [
+        (1, None, "expected 4 columns, got 2"),
+        (2, {"name": "B2", "region": "Lofa", "loan_amount": "2", "base_score": "0.5"}, None),
+    ]
+
+
+def test_ndjson_lines_split_across_chunks():
+    rows = parse('{"name": "B1", "repayment_rate": 0.5}\n\nnot json\n{"name": "B2"}', fmt="ndjson", chunk_size=5)
+    assert rows[0] == (1, {"name": "B1", "base_score": 0.5}, None)
+    assert rows[1][0] == 2 and rows[1][1] is None
+    assert rows[2] == (3, {"name": "B2"}, None)
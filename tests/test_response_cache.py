@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.response_cache import etag_matches, get_list_cache, gzip_etag
+from conftest import add_borrowers
+
+
+def test_etag_matches_either_encoding_in_a_list():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"x", "abc-gz"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abcd"', etag)
+    assert not etag_matches(None, etag)
+    assert gzip_etag(etag) == '"abc-gz"'
+
+
+@pytest.fixture
+def client(db):
+    get_list_cache().clear()
+    # Enough rows for the body to be worth gzipping
+    add_borrowers([(f"b{i:03d}", f"Borrower {i}", "Bong", 100.0, 0.5, 0.5, "Medium", "Conditional") for i in range(60)])
+    from backend.main import app
+    # Not entered as a context manager: the lifespan's background workers are not needed
+    yield TestClient(app)
+    get_list_cache().clear()
+
+
+def test_gzip_and_identity_bodies_have_their_own_etags(client):
+    identity = client.get("/api/borrowers/", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/api/borrowers/", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["etag"] == gzip_etag(identity.headers["etag"])
+    assert gzipped.json() == identity.json()
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def test_unchanged_list_revalidates_with_either_etag(client, encoding):
+    etags = [client.get("/api/borrowers/", headers={"Accept-Encoding": e}).headers["etag"] for e in ("identity", "gzip")]
+    for etag in etags:
+        response = client.get("/api/borrowers/", headers={"Accept-Encoding": encoding, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+
+def test_write_invalidates_the_etag(client):
+    etag = client.get("/api/borrowers/", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    add_borrowers([("a000", "First", "Lofa", 50.0, 0.2, 0.2, "Low", "Approved")])
+    response = client.get("/api/borrowers/", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["items"][0]["id"] == "a000"
@@ -0,0 +1,39 @@
+import numpy as np
+
+from application_layer.loan_decision_interface import decide_loan, decide_loans
+from application_layer.policy_settings import get_default_policy
+from LLMs.risk_classifier import classify_risk, classify_risks
+from LLMs.scoring_engine import build_region_table, calculate_risk_score, calculate_risk_scores, encode_regions
+
+REGIONAL_DATA = {
+    "Bong": {"unemployment_rate": 0.25, "avg_income": 150},
+    "Lofa": {"unemployment_rate": 0.05, "avg_income": 900},
+    "Nimba": {},
+}
+DEFAULT_STATS = {"unemployment_rate": 0.3, "avg_income": 120}
+
+
+def test_batch_scores_match_scalar_scores_bit_for_bit():
+    rng = np.random.default_rng(7)
+    base_scores = np.concatenate([rng.uniform(-0.2, 1.2, 500), [0.0, 1.0, 0.5]])
+    regions = rng.choice(["Bong", "Lofa", "Nimba", "Unknown"], len(base_scores)).tolist()
+    table = build_region_table(REGIONAL_DATA, DEFAULT_STATS)
+
+    batch = calculate_risk_scores(base_scores, encode_regions(regions, table), table)
+
+    scalar = [
+        calculate_risk_score({"base_score": b}, REGIONAL_DATA.get(r) or DEFAULT_STATS)
+        for b, r in zip(base_scores.tolist(), regions)
+    ]
+    assert batch.tolist() == scalar
+
+
+def test_batch_risks_match_scalar_risks_at_the_thresholds():
+    scores = [0.0, 0.3999999, 0.4, 0.4000001, 0.6999999, 0.7, 0.7000001, 1.0]
+    assert classify_risks(scores).tolist() == [classify_risk(s) for s in scores]
+
+
+def test_batch_decisions_match_scalar_decisions():
+    risks = ["Low", "High", "Medium", "Low", "Medium"]
+    for policy in (get_default_policy(), {"Low": True, "Medium": False, "High": True}, {}):
+        assert decide_loans(risks, policy) == [decide_loan(r, policy) for r in risks]
@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+from backend.database import get_connection
+from backend.writer import BorrowerWriter
+
+
+def insert(borrower_id, fail=False):
+    def write(conn):
+        conn.execute("INSERT INTO borrowers (id, name, region) VALUES (?, 'Ama', 'Bong')", (borrower_id,))
+        if fail:
+            raise ValueError(f"{borrower_id} rejected")
+        return borrower_id
+    return write
+
+
+def test_failed_write_is_rolled_back_alone(db):
+    writer = BorrowerWriter(synchronous="NORMAL")
+    release = threading.Event()
+    # Hold the writer on a first write so the three behind it commit in one batch
+    blocker = writer.submit(lambda conn: release.wait(5))
+    futures = [writer.submit(insert("b1")), writer.submit(insert("b2", fail=True)), writer.submit(insert("b3"))]
+    release.set()
+    try:
+        assert blocker.result(5)
+        assert futures[0].result(5) == "b1"
+        with pytest.raises(ValueError, match="b2 rejected"):
+            futures[1].result(5)
+        assert futures[2].result(5) == "b3"
+    finally:
+        writer.stop(5)
+
+    ids = [r[0] for r in get_connection().execute("SELECT id FROM borrowers ORDER BY id").fetchall()]
+    assert ids == ["b1", "b3"]
+
+
+def test_stopped_writer_refuses_writes(db):
+    writer = BorrowerWriter()
+    writer.start()
+    writer.stop(5)
+    with pytest.raises(RuntimeError):
+        writer.submit(insert("b1"))